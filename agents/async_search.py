@@ -0,0 +1,210 @@
+import os, sys
+import time
+import atexit
+import random
+import asyncio
+import logging
+import threading
+from typing import Optional
+
+import httpx
+
+# Setup path and import config
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import config
+import tracing
+from agents.search_cache import SearchCache, get_search_cache, normalize_query
+
+logger = logging.getLogger(__name__)
+
+# --- Search Engine Config ---
+TAVILY_SEARCH_URL = getattr(config, "TAVILY_SEARCH_URL", "https://api.tavily.com/search")
+MAX_CONCURRENCY = getattr(config, "SEARCH_MAX_CONCURRENCY", 16)
+MIN_CONCURRENCY = getattr(config, "SEARCH_MIN_CONCURRENCY", 1)
+INITIAL_CONCURRENCY = getattr(config, "SEARCH_INITIAL_CONCURRENCY", 5)
+QUERY_TIMEOUT = getattr(config, "SEARCH_QUERY_TIMEOUT", 15.0)  # seconds, per attempt
+MAX_RETRIES = getattr(config, "SEARCH_MAX_RETRIES", 3)
+TARGET_LATENCY = getattr(config, "SEARCH_TARGET_LATENCY", 5.0)  # seconds; slower responses stop growth
+BACKOFF_BASE = 0.5  # seconds
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+class RetryableSearchError(Exception):
+    pass
+
+# --- Adaptive concurrency ---
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit: grows by one after each fast success and halves on throttling
+    (429/5xx/timeouts) or slow responses, between `min_limit` and `max_limit`.
+    """
+
+    def __init__(self, initial: int = INITIAL_CONCURRENCY, min_limit: int = MIN_CONCURRENCY, max_limit: int = MAX_CONCURRENCY, target_latency: float = TARGET_LATENCY):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency
+        self.in_use = 0
+        self._condition = None
+
+    def _cond(self) -> asyncio.Condition:
+        # Created lazily so it binds to the engine's event loop
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def __aenter__(self):
+        cond = self._cond()
+        async with cond:
+            await cond.wait_for(lambda: self.in_use < int(self.limit))
+            self.in_use += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        cond = self._cond()
+        async with cond:
+            self.in_use -= 1
+            cond.notify_all()
+
+    def on_success(self, latency: float):
+        if latency > self.target_latency:
+            self.limit = max(self.min_limit, self.limit * 0.75)
+        else:
+            self.limit = min(self.max_limit, self.limit + 1)
+
+    def on_throttle(self):
+        self.limit = max(self.min_limit, self.limit / 2)
+        logger.warning(f"[SEARCH] Throttled; concurrency limit reduced to {int(self.limit)}")
+
+# --- Async search engine ---
+class AsyncSearchEngine:
+    """
+    Runs Tavily searches on a private event loop thread with one pooled HTTP client (kept-alive
+    TLS connections), an adaptive concurrency limit, per-query timeouts and jittered retries.
+    Identical queries in flight at the same time, from any caller, share one request.
+    `search_many` is synchronous so it drops into the LangChain tool unchanged.
+    """
+
+    def __init__(self, api_key: str, url: str = TAVILY_SEARCH_URL, cache: Optional[SearchCache] = None,
+                 limiter: Optional[AdaptiveLimiter] = None, timeout: float = QUERY_TIMEOUT, retries: int = MAX_RETRIES):
+        self.api_key = api_key
+        self.url = url
+        self.cache = cache
+        self.limiter = limiter or AdaptiveLimiter()
+        self.timeout = timeout
+        self.retries = retries
+        self._client = None
+        self._in_flight = {}  # normalised query -> task; only touched on the loop thread
+        self.coalesced = 0
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="async-search", daemon=True)
+        self._thread.start()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            limits = httpx.Limits(max_connections=self.limiter.max_limit, max_keepalive_connections=self.limiter.max_limit)
+            headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
+            self._client = httpx.AsyncClient(limits=limits, headers=headers, timeout=self.timeout)
+        return self._client
+
+    async def _fetch(self, query: str) -> str:
+        payload = {"query": query, "include_answer": True, "max_results": 3}
+        start = time.time()
+        async with self.limiter:
+            try:
+                response = await asyncio.wait_for(self._get_client().post(self.url, json=payload), self.timeout)
+            except (asyncio.TimeoutError, httpx.TimeoutException, httpx.TransportError) as e:
+                self.limiter.on_throttle()
+                raise RetryableSearchError(f"{type(e).__name__}: {e}") from e
+
+        if response.status_code in RETRYABLE_STATUS:
+            self.limiter.on_throttle()
+            raise RetryableSearchError(f"HTTP {response.status_code}")
+        response.raise_for_status()
+        self.limiter.on_success(time.time() - start)
+        return response.json().get("answer") or "No clear answer found."
+
+    async def _search(self, query: str, parent: Optional[tracing.Span] = None) -> str:
+        logger.info(f"[SEARCH] Querying: {query}")
+        # The event loop thread has its own context, so the caller's span is passed in explicitly
+        with tracing.span("search.query", parent=parent, backend="async", cache_hit=False, bytes=len(query.encode("utf-8"))) as span:
+            start = time.time()
+            for attempt in range(self.retries + 1):
+                span.set(attempts=attempt + 1)
+                try:
+                    answer = await self._fetch(query)
+                    break
+                except RetryableSearchError as e:
+                    if attempt == self.retries:
+                        span.record_error(e)
+                        logger.error(f"[ERROR] Search failed for '{query}' after {attempt + 1} attempts: {e}")
+                        return "Search error."
+                    delay = BACKOFF_BASE * (2 ** attempt) * random.uniform(0.5, 1.5)
+                    logger.warning(f"[SEARCH] Retry {attempt + 1} for '{query}' in {delay:.2f}s ({e})")
+                    await asyncio.sleep(delay)
+                except Exception as e:
+                    span.record_error(e)
+                    logger.error(f"[ERROR] Search failed for '{query}': {e}")
+                    return "Search error."
+
+            if self.cache is not None:
+                self.cache.set(query, answer, time.time() - start)
+            logger.info(f"[RESULT] {query} => {answer[:100]}...")
+            return answer
+
+    def _shared_search(self, query: str, parent: Optional[tracing.Span] = None) -> asyncio.Task:
+        key = normalize_query(query)
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            logger.info(f"[CACHE] Search coalesced with in-flight request: {query}")
+            return task
+        task = self._in_flight[key] = self._loop.create_task(self._search(query, parent))
+        task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return task
+
+    async def _search_many(self, queries: list[str], parent: Optional[tracing.Span] = None) -> list[str]:
+        # Shielded, so one caller giving up does not cancel a search other callers are waiting on
+        return await asyncio.gather(*(asyncio.shield(self._shared_search(q, parent)) for q in queries))
+
+    def search_many(self, queries: list[str]) -> dict[str, str]:
+        results = {}
+        pending = {}  # normalised key -> first query with that key
+        with tracing.span("search.batch", backend="async", queries=len(queries)) as batch:
+            for query in queries:
+                cached = self.cache.get(query) if self.cache is not None else None
+                if cached is not None:
+                    results[query] = cached
+                    tracing.start_span("search.query", backend="async", cache_hit=True, bytes=len(query.encode("utf-8"))).end()
+                else:
+                    pending.setdefault(normalize_query(query), query)
+
+            if pending:
+                unique = list(pending.values())
+                answers = asyncio.run_coroutine_threadsafe(self._search_many(unique, batch), self._loop).result()
+                by_key = {normalize_query(q): a for q, a in zip(unique, answers)}
+                for query in queries:
+                    if query not in results:
+                        results[query] = by_key[normalize_query(query)]
+            batch.set(fetched=len(pending))
+
+        logger.info(f"[INFO] {len(queries)} searches: {len(queries) - len(pending)} reused, {len(pending)} fetched (limit={int(self.limiter.limit)})")
+        return {q: results[q] for q in queries}
+
+    def close(self):
+        if self._client is not None:
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop).result()
+            self._client = None
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_search_engine(api_key: str) -> AsyncSearchEngine:
+    """Process-wide engine, so the HTTP connection pool and concurrency limit are shared."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = AsyncSearchEngine(api_key, cache=get_search_cache())
+            atexit.register(_engine.close)
+        return _engine
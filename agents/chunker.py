@@ -0,0 +1,156 @@
+import os, sys
+import re
+import logging
+import threading
+from typing import Callable, List
+
+# Setup path and import config
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import config
+
+logger = logging.getLogger(__name__)
+
+# --- Chunking Config ---
+DEFAULT_MODEL = "command-light"
+CHUNK_TOKENS = getattr(config, "SUMMARIZER_CHUNK_TOKENS", 1200)
+CHUNK_OVERLAP_TOKENS = getattr(config, "SUMMARIZER_CHUNK_OVERLAP_TOKENS", 0)
+
+# Local tokenizer.json files (or Hugging Face repos) per target model. Cohere does not publish an
+# offline tokenizer for command-light, so it falls back to the approximate counter unless configured.
+TOKENIZER_SOURCES = getattr(config, "TOKENIZER_SOURCES", {
+    "command-r": "CohereForAI/c4ai-command-r-v01",
+})
+
+# Split on the whitespace after a full stop and any closing quotes/brackets (up to two, since
+# lookbehinds are fixed-width), so the closers stay with their sentence.
+SENTENCE_END = re.compile(r"(?:(?<=[.!?])|(?<=[.!?][\"')\]])|(?<=[.!?][\"')\]]{2}))\s+")
+WORD_PIECE = re.compile(r"\w+|[^\w\s]")
+MAX_CHARS_PER_TOKEN = 6
+
+# --- Token counting ---
+def approx_token_count(text: str) -> int:
+    # Subword tokenizers average ~1.3 tokens per English word
+    words = WORD_PIECE.findall(text)
+    return int(len(words) * 1.3) + 1 if words else 0
+
+_counters = {}
+_counters_lock = threading.Lock()
+
+def get_token_counter(model: str = DEFAULT_MODEL) -> Callable[[List[str]], List[int]]:
+    """
+    Return a batch token counter for `model`, loading its tokenizer once per process. Falls back to
+    an approximate word-based count when no tokenizer is available (e.g. offline).
+    """
+    with _counters_lock:
+        if model in _counters:
+            return _counters[model]
+
+        source = TOKENIZER_SOURCES.get(model, model if "/" in model else None)
+        counter = None
+        if source:
+            try:
+                from tokenizers import Tokenizer
+                tokenizer = Tokenizer.from_file(source) if os.path.exists(source) else Tokenizer.from_pretrained(source)
+                counter = lambda texts: [len(enc.ids) for enc in tokenizer.encode_batch(texts, add_special_tokens=False)]
+                logger.info(f"[INFO] Loaded tokenizer for `{model}` from {source}")
+            except Exception as e:
+                logger.warning(f"[WARNING] Could not load tokenizer for `{model}` ({e}); using approximate token counts.")
+
+        if counter is None:
+            counter = lambda texts: [approx_token_count(t) for t in texts]
+
+        _counters[model] = counter
+        return counter
+
+def count_tokens(text: str, model: str = DEFAULT_MODEL) -> int:
+    return get_token_counter(model)([text])[0]
+
+# --- Sentence splitting ---
+def split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in SENTENCE_END.split(text) if s.strip()]
+
+# --- Sentence packer ---
+class SentencePacker:
+    """
+    Packs whole sentences into chunks of at most `max_tokens`, in a single pass. Text can be fed
+    incrementally; an unterminated trailing sentence is held back until more text (or `flush`) arrives.
+    The last `overlap_tokens` worth of sentences of each chunk are repeated at the start of the next.
+    """
+
+    def __init__(self, max_tokens: int = CHUNK_TOKENS, overlap_tokens: int = CHUNK_OVERLAP_TOKENS, model: str = DEFAULT_MODEL):
+        if overlap_tokens >= max_tokens:
+            raise ValueError("overlap_tokens must be smaller than max_tokens")
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self._count = get_token_counter(model)
+        self._pending = ""
+        self._sentences = []
+        self._tokens = []
+        self._total = 0
+        self._carried = 0  # leading sentences repeated from the previous chunk
+
+    def _emit(self) -> str:
+        chunk = " ".join(self._sentences)
+
+        keep, kept_tokens = 0, 0
+        for tokens in reversed(self._tokens):
+            if kept_tokens + tokens > self.overlap_tokens:
+                break
+            keep += 1
+            kept_tokens += tokens
+        self._sentences = self._sentences[len(self._sentences) - keep:]
+        self._tokens = self._tokens[len(self._tokens) - keep:]
+        self._total = kept_tokens
+        self._carried = keep
+        return chunk
+
+    def _split_oversized(self, sentence: str, tokens: int) -> List[tuple[str, int]]:
+        # A single sentence over budget is cut on word boundaries instead
+        words = sentence.split()
+        parts = max(2, -(-tokens // self.max_tokens))
+        size = max(1, -(-len(words) // parts))
+        pieces = [" ".join(words[i:i + size]) for i in range(0, len(words), size)]
+        return list(zip(pieces, self._count(pieces)))
+
+    def _add(self, sentences: List[str]) -> List[str]:
+        ready = []
+        if not sentences:
+            return ready
+        for sentence, tokens in zip(sentences, self._count(sentences)):
+            items = self._split_oversized(sentence, tokens) if tokens > self.max_tokens else [(sentence, tokens)]
+            for text, count in items:
+                if self._total + count > self.max_tokens and len(self._sentences) > self._carried:
+                    ready.append(self._emit())
+                # Drop carried-over overlap if the new sentence still does not fit
+                while self._sentences and self._total + count > self.max_tokens:
+                    self._sentences.pop(0)
+                    self._total -= self._tokens.pop(0)
+                    self._carried = max(0, self._carried - 1)
+                self._sentences.append(text)
+                self._tokens.append(count)
+                self._total += count
+        return ready
+
+    def feed(self, text: str) -> List[str]:
+        sentences = split_sentences(f"{self._pending} {text}")
+        self._pending = ""
+        if sentences and not re.search(r"[.!?][\"')\]]*$", sentences[-1]):
+            self._pending = sentences.pop()
+            # Unpunctuated text is not held back forever
+            if len(self._pending) > self.max_tokens * MAX_CHARS_PER_TOKEN:
+                sentences.append(self._pending)
+                self._pending = ""
+        return self._add(sentences)
+
+    def flush(self) -> List[str]:
+        ready = self._add([self._pending] if self._pending else [])
+        self._pending = ""
+        if len(self._sentences) > self._carried:
+            ready.append(" ".join(self._sentences))
+        self._sentences, self._tokens, self._total, self._carried = [], [], 0, 0
+        return ready
+
+def chunk_text(text: str, max_tokens: int = CHUNK_TOKENS, overlap_tokens: int = CHUNK_OVERLAP_TOKENS, model: str = DEFAULT_MODEL) -> List[str]:
+    """Split `text` into sentence-aligned chunks of at most `max_tokens` tokens for `model`."""
+    packer = SentencePacker(max_tokens=max_tokens, overlap_tokens=overlap_tokens, model=model)
+    return packer.feed(text) + packer.flush()
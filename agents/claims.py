@@ -0,0 +1,137 @@
+import os, sys
+import re
+import json
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, NamedTuple
+
+# Setup path and import config
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import config
+import tracing
+from agents.chunker import split_sentences
+
+logger = logging.getLogger(__name__)
+
+# --- Claim Config ---
+MAX_CLAIMS = getattr(config, "FACT_CHECK_MAX_CLAIMS", 12)
+CLAIM_WORKERS = getattr(config, "FACT_CHECK_CLAIM_WORKERS", 6)
+DEDUP_THRESHOLD = getattr(config, "FACT_CHECK_DEDUP_THRESHOLD", 0.8)
+VERDICTS = ("Factually Accurate", "Partially Accurate", "Inaccurate", "Unverified")
+
+WORD = re.compile(r"\w+")
+STOPWORDS = {"the", "a", "an", "of", "to", "in", "on", "and", "is", "was", "that", "it", "for", "by", "as", "at", "has", "have", "be"}
+
+EXTRACT_PROMPT = """Extract the distinct, checkable factual claims from this podcast summary.
+Each claim must be a single self-contained sentence (resolve pronouns, keep names, numbers and dates).
+Ignore opinions and predictions that cannot be verified. Return at most {max_claims} claims as a JSON array of strings and nothing else.
+
+Summary:
+{summary}
+
+JSON array:"""
+
+VERIFY_PROMPT = """You are a highly accurate fact-checking assistant. Verify the claim using the search evidence.
+
+Current Date: {current_datetime}
+
+Claim: {claim}
+
+Search evidence:
+{evidence}
+
+Respond with a JSON object with keys:
+"verdict": one of "Factually Accurate", "Partially Accurate", "Inaccurate", "Unverified",
+"evidence": one or two sentences explaining the verdict,
+"sources": list of source names or URLs supporting it (e.g. "NASA.gov").
+
+JSON:"""
+
+# --- Structured verdict ---
+class Verdict(NamedTuple):
+    claim: str
+    verdict: str
+    evidence: str
+    sources: List[str]
+    checked_at: float = 0.0  # set when the verdict comes from the verdict cache
+
+    def to_line(self) -> str:
+        sources = "".join(f" [Source: {s}]" for s in self.sources)
+        checked = f" (verified {time.strftime('%Y-%m-%d', time.localtime(self.checked_at))})" if self.checked_at else ""
+        return f"{self.verdict}: {self.claim} — {self.evidence}{sources}{checked}"
+
+def format_verdicts(verdicts: List[Verdict]) -> str:
+    return "\n".join(v.to_line() for v in verdicts)
+
+# --- Parsing helpers ---
+def _parse_json(text: str, opener: str, closer: str):
+    start, end = text.find(opener), text.rfind(closer)
+    if start == -1 or end <= start:
+        raise ValueError("no JSON found")
+    return json.loads(text[start:end + 1])
+
+def _content(response) -> str:
+    return getattr(response, "content", response)
+
+# --- Claim extraction ---
+def extract_claims(summary: str, llm, max_claims: int = MAX_CLAIMS) -> List[str]:
+    response = _content(llm.invoke(EXTRACT_PROMPT.format(summary=summary, max_claims=max_claims)))
+    try:
+        parsed = _parse_json(response, "[", "]")
+        if not isinstance(parsed, list) or not all(isinstance(c, str) for c in parsed):
+            raise ValueError("claims are not a JSON array of strings")
+        claims = [c.strip() for c in parsed if c.strip()]
+    except ValueError:
+        logger.warning("[WARNING] Claim extraction did not return JSON; falling back to sentences.")
+        claims = split_sentences(summary)
+    return claims[:max_claims]
+
+def _signature(claim: str) -> set:
+    return {w for w in WORD.findall(claim.lower()) if w not in STOPWORDS}
+
+def dedupe_claims(claims: List[str], threshold: float = DEDUP_THRESHOLD) -> List[str]:
+    """Drop claims whose content-word Jaccard similarity to an earlier claim is >= `threshold`."""
+    kept, signatures = [], []
+    for claim in claims:
+        sig = _signature(claim)
+        if any(sig and len(sig & other) / len(sig | other) >= threshold for other in signatures):
+            continue
+        kept.append(claim)
+        signatures.append(sig)
+    return kept
+
+# --- Per-claim verification ---
+def verify_claim(claim: str, llm, search: Callable[[str], str], current_datetime: str = "") -> Verdict:
+    with tracing.span("fact_check.claim", bytes=len(claim.encode("utf-8"))) as span:
+        verdict = _verify_claim(claim, llm, search, current_datetime)
+        span.set(verdict=verdict.verdict)
+        return verdict
+
+def _verify_claim(claim: str, llm, search: Callable[[str], str], current_datetime: str) -> Verdict:
+    start = time.time()
+    try:
+        evidence = search(claim)
+        response = _content(llm.invoke(VERIFY_PROMPT.format(claim=claim, evidence=evidence, current_datetime=current_datetime)))
+    except Exception as e:
+        logger.error(f"[ERROR] Verification failed for '{claim[:80]}': {e}")
+        return Verdict(claim, "Unverified", f"Verification failed: {e}", [])
+
+    try:
+        data = _parse_json(response, "{", "}")
+        verdict = data.get("verdict") if data.get("verdict") in VERDICTS else "Unverified"
+        sources = data.get("sources") or []
+        if isinstance(sources, str):
+            sources = [sources]  # a single source given as a plain string, not one source per character
+        result = Verdict(claim, verdict, str(data.get("evidence", "")).strip(), [str(s) for s in sources])
+    except ValueError:
+        result = Verdict(claim, "Unverified", response.strip()[:300], [])
+    logger.info(f"[CLAIM] {result.verdict} in {time.time() - start:.2f}s: {claim[:80]}")
+    return result
+
+def verify_claims(claims: List[str], llm, search: Callable[[str], str], current_datetime: str = "", workers: int = CLAIM_WORKERS) -> List[Verdict]:
+    """Verify claims concurrently on a bounded pool; results keep the input order."""
+    if not claims:
+        return []
+    with ThreadPoolExecutor(max_workers=min(workers, len(claims)), thread_name_prefix="claim") as executor:
+        return list(executor.map(tracing.bind(lambda c: verify_claim(c, llm, search, current_datetime)), claims))
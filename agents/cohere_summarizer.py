@@ -1,88 +1,335 @@
 import os, sys
 import time
-import ray
+import atexit
+import threading
 import logging
-import cohere
 
-from typing import List
-from textwrap import wrap
+from typing import Iterable, List
+from collections import deque
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
 
 # Setup path and import config
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 import config
+import tracing
+from agents.llm_cache import get_cache, make_key
+from agents.chunker import SentencePacker, chunk_text, get_token_counter, CHUNK_TOKENS, CHUNK_OVERLAP_TOKENS
 
-# --- Logging setup ---
-project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-log_dir = os.path.join(project_root, "logs")
-os.makedirs(log_dir, exist_ok=True)
-log_path = os.path.join(log_dir, "summarizer_cohere.log")
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(log_path),
-        logging.StreamHandler()
-    ]
-)
+# --- Logging (handlers are set up by the entry point, see logging_setup) ---
 logger = logging.getLogger(__name__)
 
 
-# --- Ray Init ---
-if not ray.is_initialized():
-    ray.init(num_cpus=4, ignore_reinit_error=True)
-
 # --- Parameters ---
 MODEL_NAME = "command-light"
 MAX_TOKENS = 4096
-SAFE_CHUNK_LENGTH = 1500  # characters, approx ~600–800 tokens
-NUM_WORKERS = 4
+TEMPERATURE = 0.3
+SUMMARY_MAX_TOKENS = 300
+SAFE_CHUNK_LENGTH = CHUNK_TOKENS  # tokens per chunk, packed from whole sentences
+NUM_WORKERS = getattr(config, "SUMMARIZER_WORKERS", 4)
+SUMMARIZER_BACKEND = getattr(config, "SUMMARIZER_BACKEND", "ray")  # ray | thread
+RAY_NUM_CPUS = getattr(config, "RAY_NUM_CPUS", 4)
+LATENCY_WINDOW = getattr(config, "SUMMARIZER_LATENCY_WINDOW", 500)  # recent calls kept per worker for metrics
+SUMMARY_TARGET_TOKENS = getattr(config, "SUMMARY_TARGET_TOKENS", 800)  # bound on the final summary
+MAX_REDUCE_LEVELS = getattr(config, "SUMMARY_MAX_REDUCE_LEVELS", 5)
+
+PROMPTS = {
+    "chunk": "Summarize the following podcast transcript chunk. Focus on key points:\n\n{text}\n\nSummary:",
+    "reduce": (
+        "The following are summaries of consecutive parts of one podcast episode. Merge them into a "
+        "single concise summary that keeps every distinct factual claim, names, numbers and dates:\n\n"
+        "{text}\n\nMerged Summary:"
+    ),
+}
 
 logger.info(f"[INFO] Starting new test with model: {MODEL_NAME}")
 
-# --- Ray actor for summarization ---
-@ray.remote
+# --- Summarization worker ---
+def _billed_tokens(response) -> dict:
+    units = getattr(getattr(response, "meta", None), "billed_units", None)
+    tokens = {f"{kind}_tokens": getattr(units, f"{kind}_tokens", None) for kind in ("input", "output")}
+    return {k: v for k, v in tokens.items() if isinstance(v, (int, float))}
+
 class CohereSummarizer:
     def __init__(self, api_key):
+        import cohere  # deferred: the SDK is slow to import and only workers need it
+
         self.client = cohere.Client(api_key)
 
-    def summarize(self, chunk: str) -> str:
-        prompt = (
-            "Summarize the following podcast transcript chunk. Focus on key points:\n\n"
-            f"{chunk}\n\nSummary:"
-        )
+    def _chat(self, chunk: str, mode: str) -> tuple[str, dict]:
+        prompt = PROMPTS[mode].format(text=chunk)
         response = self.client.chat(
             message=prompt,
             model=MODEL_NAME,
-            temperature=0.3,
-            max_tokens=300,
+            temperature=TEMPERATURE,
+            max_tokens=SUMMARY_MAX_TOKENS,
         )
-        return response.text.strip()
+        return response.text.strip(), _billed_tokens(response)
+
+    def summarize(self, chunk: str, mode: str = "chunk") -> str:
+        return self._chat(chunk, mode)[0]
+
+    def timed_summarize(self, chunk: str, mode: str = "chunk") -> tuple[str, float, dict]:
+        # Latency and token counts travel with the result so Ray actors report them too
+        start = time.time()
+        text, tokens = self._chat(chunk, mode)
+        return text, time.time() - start, tokens
+
+# --- Persistent worker pool ---
+class SummarizerPool:
+    """
+    Long-lived pool of summarizer workers shared by every call in the process. Workers are
+    started lazily on first use and torn down at interpreter exit. The `ray` backend hosts
+    each worker in an actor; the `thread` backend runs them in a local thread pool.
+    """
+
+    def __init__(self, backend: str = SUMMARIZER_BACKEND, size: int = NUM_WORKERS):
+        if backend not in ("ray", "thread"):
+            raise ValueError(f"Unknown summarizer backend: {backend}")
+        self.backend = backend
+        self.size = size
+        self._workers = []
+        self._executor = None
+        self._started_ray = False
+        self._lock = threading.Lock()
+        self._in_flight = [0] * size
+        self._completed = [0] * size
+        self._latencies = [deque(maxlen=LATENCY_WINDOW) for _ in range(size)]
+
+    def _start(self):
+        start = time.time()
+        if self.backend == "ray":
+            # Ray is imported and started only when the first chunk is submitted
+            import ray
+
+            if not ray.is_initialized():
+                ray.init(num_cpus=RAY_NUM_CPUS, ignore_reinit_error=True)
+                self._started_ray = True
+            # Same worker class, hosted as a Ray actor
+            worker = ray.remote(CohereSummarizer)
+            self._workers = [worker.remote(config.COHERE_API_KEY) for _ in range(self.size)]
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="summarizer")
+            self._workers = [CohereSummarizer(config.COHERE_API_KEY) for _ in range(self.size)]
+        logger.info(f"[INFO] Started {self.backend} summarizer pool with {self.size} workers in {time.time() - start:.2f} seconds.")
+
+    def submit(self, chunk: str, mode: str = "chunk") -> Future:
+        result = Future()
+        span = tracing.start_span(f"summarize.{mode}", model=MODEL_NAME, bytes=len(chunk.encode("utf-8")))
+
+        # Identical chunks (re-runs, repeated intros/ads) are answered from the LLM cache
+        cache = get_cache()
+        key = make_key(MODEL_NAME, TEMPERATURE, SUMMARY_MAX_TOKENS, PROMPTS[mode].format(text=chunk))
+        cached = cache.get(key)
+        span.set(cache_hit=cached is not None)
+        if cached is not None:
+            span.end()
+            result.set_result(cached)
+            return result
+
+        with self._lock:
+            if not self._workers:
+                self._start()
+            # Least-loaded worker keeps per-worker queues short
+            index = min(range(self.size), key=lambda i: self._in_flight[i])
+            self._in_flight[index] += 1
+            worker = self._workers[index]
+
+        if self.backend == "ray":
+            timed = worker.timed_summarize.remote(chunk, mode).future()
+        else:
+            timed = self._executor.submit(worker.timed_summarize, chunk, mode)
+
+        def on_done(done: Future, index=index):
+            with self._lock:
+                self._in_flight[index] -= 1
+            if done.cancelled():
+                span.end(CancelledError())
+                result.cancel()
+                return
+            if done.exception() is not None:
+                span.end(done.exception())
+                result.set_exception(done.exception())
+                return
+            text, elapsed, tokens = done.result()
+            with self._lock:
+                self._completed[index] += 1
+                self._latencies[index].append(elapsed)
+            cache.set(key, text, elapsed)
+            span.set(worker=index, **tokens)
+            span.end()
+            result.set_result(text)
+
+        timed.add_done_callback(on_done)
+        return result
+
+    def map(self, chunks: List[str], mode: str = "chunk") -> List[str]:
+        futures = [self.submit(chunk, mode) for chunk in chunks]
+        return [f.result() for f in futures]
+
+    def metrics(self) -> dict:
+        with self._lock:
+            workers = []
+            for i in range(self.size):
+                latencies = self._latencies[i]
+                workers.append({
+                    "in_flight": self._in_flight[i],
+                    "completed": self._completed[i],
+                    "avg_latency": sum(latencies) / len(latencies) if latencies else 0.0,
+                    "max_latency": max(latencies, default=0.0),
+                })
+            return {
+                "backend": self.backend,
+                "size": self.size,
+                "started": bool(self._workers),
+                "queue_depth": sum(self._in_flight),
+                "workers": workers,
+            }
 
-# --- Chunking strategy (safe and simple) ---
-def split_text(text: str, chunk_size: int) -> List[str]:
-    return wrap(text, width=chunk_size, break_long_words=False, replace_whitespace=False)
+    def log_metrics(self):
+        m = self.metrics()
+        per_worker = ", ".join(f"#{i}: n={w['completed']} avg={w['avg_latency']:.2f}s max={w['max_latency']:.2f}s" for i, w in enumerate(m["workers"]))
+        logger.info(f"[METRICS] Summarizer pool ({m['backend']}) queue depth={m['queue_depth']} | {per_worker}")
+
+    def shutdown(self, cancel: bool = True):
+        """Stop the workers. With `cancel=False` chunks already submitted still finish (used when the pool is replaced)."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            # Dropped actor handles exit once their queued calls are done
+            if self.backend == "ray" and self._workers and cancel:
+                import ray  # already loaded by _start
+
+                if ray.is_initialized():
+                    for actor in self._workers:
+                        ray.kill(actor)
+                    if self._started_ray:
+                        ray.shutdown()
+            self._workers = []
+            self._started_ray = False
+        # Outside the lock: cancelling queued chunks runs their done callbacks in this thread
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=cancel)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool(num_workers: int = NUM_WORKERS) -> SummarizerPool:
+    """Return the process-wide summarizer pool, creating it on first use or when `num_workers` changes."""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.size != num_workers:
+            old, _pool = _pool, SummarizerPool(size=num_workers)
+            if old is not None:
+                logger.info(f"[INFO] Resizing summarizer pool from {old.size} to {num_workers} workers.")
+                # The new pool inherits a Ray runtime the old one started, so it is shut down once at exit
+                _pool._started_ray, old._started_ray = old._started_ray, False
+                old.shutdown(cancel=False)
+        return _pool
+
+@atexit.register
+def shutdown_pool():
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+
+# --- Chunking strategy (token-aware, sentence-aligned) ---
+def split_text(text: str, chunk_size: int, overlap: int = CHUNK_OVERLAP_TOKENS) -> List[str]:
+    return chunk_text(text, max_tokens=chunk_size, overlap_tokens=overlap, model=MODEL_NAME)
+
+# --- Hierarchical reduce ---
+def _batch_summaries(summaries: List[str], tokens: List[int], batch_tokens: int) -> List[List[str]]:
+    # Greedy packing in order; every batch merges at least two summaries so each level shrinks
+    batches, current, current_tokens = [], [], 0
+    for summary, count in zip(summaries, tokens):
+        if len(current) >= 2 and current_tokens + count > batch_tokens:
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(summary)
+        current_tokens += count
+    if len(current) == 1 and batches:
+        batches[-1].append(current[0])
+    elif current:
+        batches.append(current)
+    return batches
+
+def reduce_summaries(summaries: List[str], pool: "SummarizerPool", target_tokens: int = SUMMARY_TARGET_TOKENS, batch_tokens: int = SAFE_CHUNK_LENGTH) -> str:
+    """
+    Recursively merge chunk summaries in batches of up to `batch_tokens` until the combined
+    summary fits `target_tokens`. Batches within a level are merged in parallel on the pool.
+    """
+    count = get_token_counter(MODEL_NAME)
+    for level in range(1, MAX_REDUCE_LEVELS + 1):
+        tokens = count(summaries)
+        if sum(tokens) <= target_tokens:
+            break
+
+        start = time.time()
+        batches = _batch_summaries(summaries, tokens, batch_tokens)
+        with tracing.span("summarize.reduce_level", level=level, summary_tokens=sum(tokens), batches=len(batches)):
+            summaries = pool.map(["\n\n".join(batch) for batch in batches], mode="reduce")
+        logger.info(f"[REDUCE] Level {level}: {sum(tokens)} tokens in {len(tokens)} summaries -> {len(summaries)} in {time.time() - start:.2f} seconds.")
+
+    return "\n\n".join(summaries)
 
 # --- Main summarization pipeline ---
 def summarize_text(text: str, chunk_size: int = SAFE_CHUNK_LENGTH, num_workers: int = NUM_WORKERS) -> str:
     start = time.time()
 
-    chunks = split_text(text, chunk_size)
-    logger.info(f"[START] Summarizing {len(chunks)} chunks with model `{MODEL_NAME}` using {num_workers} workers.")
+    with tracing.span("summarize", model=MODEL_NAME, bytes=len(text.encode("utf-8"))) as span:
+        pool = get_pool(num_workers)
+        chunks = split_text(text, chunk_size)
+        span.set(chunks=len(chunks))
+        logger.info(f"[START] Summarizing {len(chunks)} chunks with model `{MODEL_NAME}` using {pool.size} workers.")
 
-    actors = [CohereSummarizer.remote(config.COHERE_API_KEY) for _ in range(min(num_workers, len(chunks)))]
-    futures = [actors[i % len(actors)].summarize.remote(chunk) for i, chunk in enumerate(chunks)]
-    summaries = ray.get(futures)
+        summaries = pool.map(chunks)
 
-    final_summary = "\n\n".join(summaries)
+        final_summary = reduce_summaries(summaries, pool)
     logger.info(f"[DONE] Cohere summarization completed in {time.time() - start:.2f} seconds.")
     logger.info(f"[INFO] Final output: {len(final_summary)} characters across {len(chunks)} chunks.")
+    pool.log_metrics()
+    get_cache().log_stats()
+
+    return final_summary
+
+# --- Streaming summarization (overlaps with transcription) ---
+def summarize_stream(text_stream: Iterable[str], chunk_size: int = SAFE_CHUNK_LENGTH, num_workers: int = NUM_WORKERS) -> str:
+    """
+    Summarize text that arrives incrementally (e.g. transcript segments). Each chunk is sent to a
+    worker as soon as `chunk_size` tokens of whole sentences have been buffered, so summarization
+    runs while the producer is still emitting text.
+    """
+    start = time.time()
+    pool = get_pool(num_workers)
+    packer = SentencePacker(max_tokens=chunk_size, overlap_tokens=CHUNK_OVERLAP_TOKENS, model=MODEL_NAME)
+    futures = []
+
+    def dispatch(chunk: str):
+        if not futures:
+            logger.info(f"[INFO] First chunk dispatched after {time.time() - start:.2f} seconds.")
+        futures.append(pool.submit(chunk))
+
+    with tracing.span("summarize", model=MODEL_NAME, streaming=True) as span:
+        for piece in text_stream:
+            for chunk in packer.feed(piece):
+                dispatch(chunk)
+
+        for chunk in packer.flush():
+            dispatch(chunk)
+
+        span.set(chunks=len(futures))
+        logger.info(f"[START] Input exhausted; waiting on {len(futures)} chunk summaries from `{MODEL_NAME}`.")
+        summaries = [f.result() for f in futures]
 
-    ray.shutdown()
+        final_summary = reduce_summaries(summaries, pool)
+    logger.info(f"[DONE] Streaming summarization completed in {time.time() - start:.2f} seconds.")
+    logger.info(f"[INFO] Final output: {len(final_summary)} characters across {len(futures)} chunks.")
+    pool.log_metrics()
+    get_cache().log_stats()
     return final_summary
 
 # --- Test entrypoint ---
 if __name__ == "__main__":
+    import logging_setup
+    logging_setup.configure_logging()
     logger.info("[TEST] Running summarizer using Cohere API...")
 
     sample_text = (
@@ -0,0 +1,278 @@
+import os, sys
+import json
+import time
+import hashlib
+import logging
+import argparse
+import threading
+import itertools
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process writer lock, run one ingest at a time
+    fcntl = None
+
+# Setup path and import config
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import config
+from agents.chunker import chunk_text
+
+logger = logging.getLogger(__name__)
+
+# --- Index Config ---
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+INDEX_DIR = getattr(config, "EVIDENCE_INDEX_DIR", os.path.join(project_root, "data", "evidence_index"))
+INDEX_ENABLED = getattr(config, "EVIDENCE_INDEX_ENABLED", True)
+EMBEDDING_MODEL = getattr(config, "EVIDENCE_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+SIMILARITY_THRESHOLD = getattr(config, "EVIDENCE_SIMILARITY_THRESHOLD", 0.75)
+TOP_K = getattr(config, "EVIDENCE_TOP_K", 3)
+PASSAGE_TOKENS = 200
+SEARCH_BLOCK_ROWS = 65_536  # rows scored per block, bounds temporary memory
+
+# --- Embeddings ---
+_model = None
+_model_lock = threading.Lock()
+
+def embed_texts(texts: List[str]) -> np.ndarray:
+    """Embed a batch of texts in one forward pass; rows are L2-normalised float32."""
+    global _model
+    with _model_lock:
+        if _model is None:
+            from sentence_transformers import SentenceTransformer
+            start = time.time()
+            _model = SentenceTransformer(EMBEDDING_MODEL)
+            logger.info(f"[INFO] Loaded embedding model `{EMBEDDING_MODEL}` in {time.time() - start:.2f}s")
+    vectors = _model.encode(texts, batch_size=64, normalize_embeddings=True, convert_to_numpy=True)
+    return np.asarray(vectors, dtype=np.float32)
+
+# --- Index ---
+class EvidenceIndex:
+    """
+    Exact cosine-similarity index over reference passages. Embeddings live in a raw float32 file
+    opened as a read-only memory map (so large archives are paged in on demand); passage metadata
+    is a parallel JSONL file. New passages are appended, never rewritten.
+
+    info.json holds the committed row count. Readers only look at that many rows, so a tail being
+    appended by another process is ignored; writers hold a file lock and are the only ones that
+    cut off a tail left by a crashed append.
+    """
+
+    def __init__(self, index_dir: str = INDEX_DIR, embedder: Optional[Callable[[List[str]], np.ndarray]] = None):
+        self.index_dir = index_dir
+        self.embedder = embedder or embed_texts
+        self.vectors_path = os.path.join(index_dir, "embeddings.f32")
+        self.meta_path = os.path.join(index_dir, "passages.jsonl")
+        self.info_path = os.path.join(index_dir, "info.json")
+        self.lock_path = os.path.join(index_dir, "index.lock")
+        self._lock = threading.Lock()
+        self._matrix = None
+        self._meta = []
+        self._ids = set()
+        self.dim = None
+        self._load()
+
+    def _read_info(self) -> dict:
+        if not os.path.exists(self.info_path):
+            return {"dim": None, "count": 0}
+        with open(self.info_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _load(self, info: Optional[dict] = None):
+        """Map the committed rows; anything after them in either file is ignored."""
+        info = info or self._read_info()
+        self.dim = info["dim"]
+        self._meta, self._ids, self._matrix = [], set(), None
+        if not info["count"]:
+            return
+        with open(self.meta_path, encoding="utf-8") as f:
+            self._meta = [json.loads(line) for line in itertools.islice(f, info["count"])]
+        self._ids = {m["id"] for m in self._meta}
+        self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(len(self._meta), self.dim))
+
+    @contextmanager
+    def _writer_lock(self):
+        os.makedirs(self.index_dir, exist_ok=True)
+        with open(self.lock_path, "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _truncate(self, count: int, dim: Optional[int]):
+        """
+        Cut both files back to the `count` rows recorded in info.json, dropping whatever a crashed
+        append wrote after it, so the next append starts on a row boundary in both files. Only
+        called under the writer lock.
+        """
+        if os.path.exists(self.vectors_path) and os.path.getsize(self.vectors_path) > count * (dim or 0) * 4:
+            logger.warning(f"[EVIDENCE] Dropping partial embeddings after row {count} in {self.vectors_path}")
+            os.truncate(self.vectors_path, count * (dim or 0) * 4)
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, "rb") as f:
+                size = 0
+                for _ in range(count):
+                    size += len(f.readline())
+                extra = f.read(1)
+            if extra:
+                logger.warning(f"[EVIDENCE] Dropping partial passages after line {count} in {self.meta_path}")
+                os.truncate(self.meta_path, size)
+
+    def __len__(self) -> int:
+        return len(self._meta)
+
+    def add(self, passages: List[dict]) -> int:
+        """Append passages ({"text", optional "source"/"claim"/"verdict"}); duplicates are skipped."""
+        with self._lock, self._writer_lock():
+            # Pick up rows committed by other processes since this index was opened
+            info = self._read_info()
+            if info["count"] != len(self._meta):
+                self._load(info)
+            self._truncate(len(self._meta), self.dim)
+
+            new, seen = [], set()
+            for p in passages:
+                text = p["text"].strip()
+                pid = hashlib.sha1(text.encode("utf-8")).hexdigest()
+                if text and pid not in self._ids and pid not in seen:
+                    seen.add(pid)
+                    new.append({**p, "text": text, "id": pid})
+            if not new:
+                return 0
+
+            vectors = self.embedder([p["text"] for p in new])
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match index ({self.dim})")
+
+            os.makedirs(self.index_dir, exist_ok=True)
+            with open(self.vectors_path, "ab") as f:
+                f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+            with open(self.meta_path, "a", encoding="utf-8") as f:
+                for p in new:
+                    f.write(json.dumps(p, ensure_ascii=False) + "\n")
+
+            # info.json is written last, so a crash mid-append leaves the previous count authoritative
+            # and the next writer truncates the partial rows
+            tmp = f"{self.info_path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"dim": self.dim, "count": len(self._meta) + len(new), "model": EMBEDDING_MODEL}, f)
+            os.replace(tmp, self.info_path)
+            # Registered only once they are on disk, so a failed add can be retried
+            self._meta.extend(new)
+            self._ids.update(seen)
+            self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(len(self._meta), self.dim))
+            return len(new)
+
+    def search(self, queries: List[str], k: int = TOP_K) -> List[List[tuple[float, dict]]]:
+        """Top-k passages for every query; all queries are embedded in a single batch."""
+        if not queries or self._matrix is None:
+            return [[] for _ in queries]
+
+        q = self.embedder(queries)
+        k = min(k, len(self._meta))
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((len(queries), 0), dtype=np.int64)
+
+        for offset in range(0, len(self._meta), SEARCH_BLOCK_ROWS):
+            block = np.asarray(self._matrix[offset:offset + SEARCH_BLOCK_ROWS])
+            scores = q @ block.T
+            take = min(k, scores.shape[1])
+            top = np.argpartition(-scores, take - 1, axis=1)[:, :take]
+            best_scores = np.concatenate([best_scores, np.take_along_axis(scores, top, axis=1)], axis=1)
+            best_rows = np.concatenate([best_rows, top + offset], axis=1)
+            if best_scores.shape[1] > k:
+                keep = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+                best_rows = np.take_along_axis(best_rows, keep, axis=1)
+
+        results = []
+        for scores, rows in zip(best_scores, best_rows):
+            order = np.argsort(-scores)
+            results.append([(float(scores[i]), self._meta[rows[i]]) for i in order])
+        return results
+
+    def evidence_for(self, claims: List[str], threshold: float = SIMILARITY_THRESHOLD, k: int = TOP_K) -> Dict[str, str]:
+        """Formatted local evidence for each claim whose best match clears `threshold`."""
+        evidence = {}
+        for claim, hits in zip(claims, self.search(claims, k)):
+            hits = [(score, p) for score, p in hits if score >= threshold]
+            if hits:
+                evidence[claim] = "\n".join(
+                    p["text"] + (f" [Source: {p['source']}]" if p.get("source") else "") for _, p in hits
+                )
+        return evidence
+
+# --- Process-wide index ---
+_index = None
+_index_lock = threading.Lock()
+
+def get_index() -> Optional[EvidenceIndex]:
+    global _index
+    with _index_lock:
+        if _index is None and INDEX_ENABLED:
+            _index = EvidenceIndex(INDEX_DIR)
+        return _index
+
+def local_evidence(claims: List[str]) -> Dict[str, str]:
+    """Claims answerable from the local archive; anything below the threshold falls back to web search."""
+    try:
+        # Opening a corrupt or mismatched index fails here too; either way claims go to web search
+        index = get_index()
+        if index is None or len(index) == 0:
+            return {}
+        start = time.time()
+        evidence = index.evidence_for(claims)
+        logger.info(f"[EVIDENCE] {len(evidence)}/{len(claims)} claims matched the local index in {time.time() - start:.2f}s")
+        return evidence
+    except Exception as e:
+        logger.error(f"[ERROR] Local evidence lookup failed: {e}")
+        return {}
+
+# --- Ingestion ---
+def load_passages(path: str) -> List[dict]:
+    """Read passages from .jsonl (one record with "text" per line) or split plain-text files."""
+    if path.endswith(".jsonl"):
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    return [{"text": chunk, "source": os.path.basename(path)} for chunk in chunk_text(text, max_tokens=PASSAGE_TOKENS)]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the local fact-check evidence index.")
+    parser.add_argument("--index-dir", default=INDEX_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+    ingest = sub.add_parser("ingest", help="Add .jsonl / .txt / .md files (or directories of them) to the index")
+    ingest.add_argument("paths", nargs="+")
+    query = sub.add_parser("search", help="Show the closest passages for a claim")
+    query.add_argument("claim")
+    query.add_argument("-k", type=int, default=TOP_K)
+    args = parser.parse_args(argv)
+
+    index = EvidenceIndex(args.index_dir)
+    if args.command == "ingest":
+        files = []
+        for path in args.paths:
+            if os.path.isdir(path):
+                files.extend(os.path.join(root, name) for root, _, names in os.walk(path) for name in sorted(names)
+                             if name.endswith((".jsonl", ".txt", ".md")))
+            else:
+                files.append(path)
+        for path in files:
+            added = index.add(load_passages(path))
+            print(f"{path}: {added} new passages")
+        print(f"Index now holds {len(index)} passages")
+    else:
+        for score, passage in index.search([args.claim], args.k)[0]:
+            print(f"{score:.3f}  {passage['text'][:200]}  [{passage.get('source', '-')}]")
+
+if __name__ == "__main__":
+    main()
@@ -3,32 +3,22 @@ import sys
 import logging
 import warnings
 import time
+import threading
 from datetime import datetime
 import pytz
 from concurrent.futures import ThreadPoolExecutor
 
-from langchain.agents import AgentExecutor, create_tool_calling_agent, Tool
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_cohere import ChatCohere
-from tavily import TavilyClient
-
 # --- Path setup ---
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import config
-
-# --- Logging Setup ---
-LOG_DIR = os.path.join(os.path.dirname(__file__), "..", "logs")
-os.makedirs(LOG_DIR, exist_ok=True)
-LOG_PATH = os.path.join(LOG_DIR, "factchecker.log")
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(LOG_PATH),
-        logging.StreamHandler()
-    ]
-)
+import tracing
+from agents.search_cache import get_search_cache
+from agents.async_search import get_search_engine
+from agents.claims import extract_claims, dedupe_claims, verify_claims, format_verdicts
+from agents.evidence_index import local_evidence
+from agents.verdict_cache import get_verdict_cache
+
+# --- Logging (handlers are set up by the entry point, see logging_setup) ---
 logger = logging.getLogger(__name__)
 
 # --- Suppress known warnings ---
@@ -36,33 +26,80 @@ warnings.filterwarnings("ignore", category=DeprecationWarning, module="pydantic"
 warnings.filterwarnings("ignore", category=DeprecationWarning, module="cohere")
 warnings.filterwarnings("ignore", category=FutureWarning, module="cohere.core.unchecked_base_model")
 
-# --- Initialize LLM ---
-llm = ChatCohere(
-    model="command-r",
-    temperature=0.3,
-    cohere_api_key=config.COHERE_API_KEY
-)
-
-# --- Tavily API Setup ---
+# --- Config ---
+FACT_CHECK_MODEL = "command-r"
 TAVILY_API_KEY = getattr(config, "TAVILY_API_KEY", os.getenv("TAVILY_API_KEY"))
-tavily = TavilyClient(api_key=TAVILY_API_KEY)
+SEARCH_BACKEND = getattr(config, "SEARCH_BACKEND", "async")  # async | thread
+FACT_CHECK_MODE = getattr(config, "FACT_CHECK_MODE", "claims")  # claims | agent
+
+# --- Clients (built on first use, so importing this module stays cheap) ---
+_llm = None
+_tavily = None
+_agent_executor = None
+_clients_lock = threading.Lock()
+
+def get_llm():
+    """Return the shared fact-checking chat model; its responses go through the shared LLM cache."""
+    global _llm
+    with _clients_lock:
+        if _llm is None:
+            from langchain_cohere import ChatCohere
+            from agents.langchain_cache import install_langchain_cache
+
+            install_langchain_cache()
+            _llm = ChatCohere(
+                model=FACT_CHECK_MODEL,
+                temperature=0.3,
+                cohere_api_key=config.COHERE_API_KEY,
+                callbacks=[tracing.llm_span_handler()],
+            )
+        return _llm
+
+def get_tavily():
+    global _tavily
+    with _clients_lock:
+        if _tavily is None:
+            from tavily import TavilyClient
+
+            _tavily = TavilyClient(api_key=TAVILY_API_KEY)
+        return _tavily
 
 # --- Parallel Search Functions (Threaded) ---
+def tavily_answer(query: str) -> str:
+    result = get_tavily().search(query=query, include_answer=True, max_results=3)
+    return result.get("answer") or "No clear answer found."
+
 def threaded_search(query: str) -> str:
     logger.info(f"[SEARCH] Querying: {query}")
-    try:
-        result = tavily.search(query=query, include_answer=True, max_results=3)
-        answer = result.get("answer") or "No clear answer found."
-        logger.info(f"[RESULT] {query} => {answer[:100]}...")
-        return answer
-    except Exception as e:
-        logger.error(f"[ERROR] Search failed for '{query}': {e}")
-        return "Search error."
+    fetched = []
+
+    def fetch(q: str) -> str:
+        fetched.append(q)
+        return tavily_answer(q)
+
+    with tracing.span("search.query", backend="thread", bytes=len(query.encode("utf-8"))) as span:
+        try:
+            # Repeated and concurrently identical queries are served by the search cache
+            answer = get_search_cache().get_or_fetch(query, fetch)
+            span.set(cache_hit=not fetched)
+            logger.info(f"[RESULT] {query} => {answer[:100]}...")
+            return answer
+        except Exception as e:
+            span.record_error(e)
+            logger.error(f"[ERROR] Search failed for '{query}': {e}")
+            return "Search error."
+
+def search_answer(query: str) -> str:
+    if SEARCH_BACKEND == "async":
+        return get_search_engine(TAVILY_API_KEY).search_many([query])[query]
+    return threaded_search(query)
 
 def run_parallel_searches(queries: list[str]) -> dict[str, str]:
     logger.info(f"[INFO] Running {len(queries)} threaded searches.")
-    with ThreadPoolExecutor(max_workers=5) as executor:
-        results = list(executor.map(threaded_search, queries))
+    with tracing.span("search.batch", backend="thread", queries=len(queries)), ThreadPoolExecutor(max_workers=5) as executor:
+        results = list(executor.map(tracing.bind(threaded_search), queries))
+    stats = get_search_cache().stats()
+    logger.info(f"[CACHE] Search cache hits={stats['hits']} misses={stats['misses']} coalesced={stats['coalesced']}")
     return dict(zip(queries, results))
 
 # --- LangChain Tool Wrapper ---
@@ -76,21 +113,14 @@ class ParallelFactSearchTool:
             logger.warning("[WARNING] No valid search queries received.")
             return "No valid queries provided."
 
-        results = run_parallel_searches(query_list)
+        if SEARCH_BACKEND == "async":
+            results = get_search_engine(TAVILY_API_KEY).search_many(query_list)
+        else:
+            results = run_parallel_searches(query_list)
         return "\n".join(f"{q}: {a}" for q, a in results.items())
 
-# --- Tool Registration ---
-tools = [
-    Tool(
-        name="parallel_fact_search",
-        func=ParallelFactSearchTool().run,
-        description="Useful for checking multiple factual claims at once. Input should be newline-separated search questions."
-    )
-]
-
-# --- Prompt Template ---
-prompt = ChatPromptTemplate.from_messages([
-    ("system", """You are a highly accurate fact-checking assistant. Your job is to verify claims.
+# --- Agent Prompt ---
+SYSTEM_PROMPT = """You are a highly accurate fact-checking assistant. Your job is to verify claims.
 
 Follow these steps:
 1. Break down complex input into specific factual sub-claims.
@@ -102,17 +132,70 @@ Follow these steps:
 
 Current Date and Time: {current_datetime}
 Current Location: {current_location}
-"""),
-    ("human", "{input}"),
-    MessagesPlaceholder("agent_scratchpad")
-])
-
-# --- Agent + Executor Setup ---
-agent = create_tool_calling_agent(llm=llm, tools=tools, prompt=prompt)
-agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True, handle_parsing_errors=True)
+"""
+
+# --- Agent + Executor Setup (only the `agent` mode needs it) ---
+def get_agent_executor():
+    global _agent_executor
+    llm = get_llm()
+    with _clients_lock:
+        if _agent_executor is None:
+            from langchain.agents import AgentExecutor, create_tool_calling_agent, Tool
+            from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+
+            tools = [
+                Tool(
+                    name="parallel_fact_search",
+                    func=ParallelFactSearchTool().run,
+                    description="Useful for checking multiple factual claims at once. Input should be newline-separated search questions."
+                )
+            ]
+            prompt = ChatPromptTemplate.from_messages([
+                ("system", SYSTEM_PROMPT),
+                ("human", "{input}"),
+                MessagesPlaceholder("agent_scratchpad")
+            ])
+            agent = create_tool_calling_agent(llm=llm, tools=tools, prompt=prompt)
+            _agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True, handle_parsing_errors=True)
+        return _agent_executor
+
+# --- Claim-level pipeline ---
+def check_claims(summary: str, current_datetime: str = "") -> list:
+    """Extract atomic claims from the summary and verify each one concurrently."""
+    with tracing.span("fact_check.extract_claims") as span:
+        llm = get_llm()
+        claims = dedupe_claims(extract_claims(summary, llm))
+        span.set(claims=len(claims))
+    logger.info(f"[FACT CHECK] Extracted {len(claims)} claims in {span.duration:.2f}s")
+
+    # Previously verified claims are answered from the verdict store without search or LLM calls
+    verdict_cache = get_verdict_cache()
+    cached = verdict_cache.lookup_many(claims) if verdict_cache is not None else [None] * len(claims)
+    pending = [c for c, v in zip(claims, cached) if v is None]
+    logger.info(f"[FACT CHECK] {len(claims) - len(pending)}/{len(claims)} claims answered from the verdict cache")
+
+    # Claims close enough to the local archive skip the web search
+    local = local_evidence(pending) if pending else {}
+
+    def search(query: str) -> str:
+        return local.get(query) or search_answer(query)
+
+    with tracing.span("fact_check.verify_claims", claims=len(pending), cached=len(claims) - len(pending), local=len(local)):
+        fresh = iter(verify_claims(pending, llm, search, current_datetime))
+    verdicts = [v if v is not None else next(fresh) for v in cached]
+    if verdict_cache is not None:
+        verdict_cache.store_many([v for v, hit in zip(verdicts, cached) if hit is None])
+    return verdicts
 
 # --- Main API ---
 def fact_check(claim: str) -> str:
+    with tracing.span("fact_check", mode=FACT_CHECK_MODE, bytes=len(claim.encode("utf-8"))) as span:
+        output = _fact_check(claim)
+        if output.startswith("Error:"):
+            span.record_error(output)
+        return output
+
+def _fact_check(claim: str) -> str:
     try:
         start_check = time.time()
         logger.info(f"[FACT CHECK] Started for input: {claim[:100]}...")
@@ -120,13 +203,18 @@ def fact_check(claim: str) -> str:
         now = datetime.now(ist).strftime("%A, %B %d, %Y at %I:%M:%S %p %Z")
         location = "Mumbai, Maharashtra, India"
 
-        result = agent_executor.invoke({
-            "input": claim,
-            "current_datetime": now,
-            "current_location": location
-        })
+        if FACT_CHECK_MODE == "claims":
+            # Date only, so identical claims verified on the same day share LLM cache entries
+            today = datetime.now(ist).strftime("%A, %B %d, %Y")
+            output = format_verdicts(check_claims(claim, today))
+        else:
+            result = get_agent_executor().invoke({
+                "input": claim,
+                "current_datetime": now,
+                "current_location": location
+            })
+            output = result.get("output", "")
 
-        output = result.get("output", "")
         end_check = time.time()
         logger.info("[FACT CHECK] Completed successfully.")
         logger.info(f"[DONE] Fact Check completed in {end_check - start_check:.2f}s")
@@ -137,6 +225,8 @@ def fact_check(claim: str) -> str:
 
 # --- Direct Test Run ---
 if __name__ == "__main__":
+    import logging_setup
+    logging_setup.configure_logging()
     logger.info("[TEST] Running fact checker on test claims...")
     test_claim = """NASA is funding the Artemis program for a moon landing in 2025.
 SpaceX launched Starship in 2023.
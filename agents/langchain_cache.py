@@ -0,0 +1,56 @@
+"""
+LangChain adapter for the shared LLM cache (ChatCohere in the fact-checker and reporter).
+
+Kept apart from agents.llm_cache because langchain_core is slow to import; only modules that
+actually build a LangChain model import this, and only when they build it.
+"""
+import time
+import warnings
+
+from langchain_core._api import LangChainBetaWarning
+from langchain_core.caches import BaseCache
+from langchain_core.globals import get_llm_cache, set_llm_cache
+from langchain_core.load import dumps, loads
+
+import tracing
+from agents.llm_cache import LLMCache, get_cache, make_key
+
+class LangChainLLMCache(BaseCache):
+    """Exposes an LLMCache through LangChain's global cache hook; llm_string carries model and sampling params."""
+
+    def __init__(self, cache: LLMCache):
+        self.cache = cache
+        self._miss_started = {}
+
+    def _key(self, prompt: str, llm_string: str) -> str:
+        return make_key(llm_string, None, None, prompt)
+
+    def lookup(self, prompt: str, llm_string: str):
+        key = self._key(prompt, llm_string)
+        value = self.cache.get(key)
+        span = tracing.current_span()
+        if span is not None and span.name == "llm":  # opened for this call by tracing.llm_span_handler()
+            span.set(cache_hit=value is not None)
+        if value is None:
+            # Remember when the miss happened so update() can record the LLM latency
+            self._miss_started[key] = time.time()
+            return None
+        # loads() is flagged as beta but stable for the generations we serialize
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", LangChainBetaWarning)
+            return loads(value)
+
+    def update(self, prompt: str, llm_string: str, return_val) -> None:
+        key = self._key(prompt, llm_string)
+        started = self._miss_started.pop(key, None)
+        latency = time.time() - started if started else 0.0
+        self.cache.set(key, dumps(list(return_val)), latency)
+
+    def clear(self, **kwargs) -> None:
+        if self.cache.backend is not None:
+            self.cache.backend.clear()
+
+def install_langchain_cache():
+    """Route every LangChain chat model call in this process through the shared cache."""
+    if not isinstance(get_llm_cache(), LangChainLLMCache):
+        set_llm_cache(LangChainLLMCache(get_cache()))
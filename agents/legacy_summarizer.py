@@ -1,8 +1,9 @@
 from transformers import pipeline
+from agents.chunker import chunk_text
 
 summarizer = pipeline("summarization")
 
 def summarize_text(text: str) -> str:
-    chunks = [text[i:i+1000] for i in range(0, len(text), 1000)]
+    chunks = chunk_text(text, max_tokens=700)
     summaries = [summarizer(chunk)[0]["summary_text"] for chunk in chunks]
     return " ".join(summaries)
\ No newline at end of file
@@ -0,0 +1,191 @@
+import os, sys
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+# Setup path and import config
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import config
+
+logger = logging.getLogger(__name__)
+
+# --- Cache Config ---
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+CACHE_BACKEND = getattr(config, "LLM_CACHE_BACKEND", "memory")  # memory | sqlite | none
+CACHE_PATH = getattr(config, "LLM_CACHE_PATH", os.path.join(project_root, "cache", "llm_cache.sqlite"))
+CACHE_TTL = getattr(config, "LLM_CACHE_TTL", 7 * 24 * 3600)  # seconds
+CACHE_MAX_ENTRIES = getattr(config, "LLM_CACHE_MAX_ENTRIES", 10_000)
+
+def make_key(model: str, temperature, max_tokens, prompt: str) -> str:
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    return hashlib.sha256(json.dumps([model, temperature, max_tokens, prompt_hash]).encode("utf-8")).hexdigest()
+
+# --- Backends ---
+class MemoryBackend:
+    """In-process LRU of (value, latency, created_at) tuples."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, value: str, latency: float):
+        with self._lock:
+            self._entries[key] = (value, latency, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class SQLiteBackend:
+    """File-backed store shared by every process (Ray actors, Streamlit sessions) on the host."""
+
+    def __init__(self, path: str = CACHE_PATH, max_entries: int = CACHE_MAX_ENTRIES, table: str = "llm_cache"):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "key TEXT PRIMARY KEY, value TEXT, latency REAL, created_at REAL, accessed_at REAL)"
+            )
+            # Eviction picks the least recently used rows without scanning the table
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed_at ON {table} (accessed_at)")
+
+    def get(self, key: str):
+        with self._lock, self._conn:
+            row = self._conn.execute(f"SELECT value, latency, created_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return row
+
+    def set(self, key: str, value: str, latency: float):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(f"INSERT OR REPLACE INTO {self.table} VALUES (?, ?, ?, ?, ?)", (key, value, latency, now, now))
+            excess = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0] - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    f"DELETE FROM {self.table} WHERE key IN ("
+                    f"SELECT key FROM {self.table} ORDER BY accessed_at LIMIT ?)",
+                    (excess,),
+                )
+
+    def delete(self, key: str):
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table}")
+
+# --- Cache front-end ---
+class LLMCache:
+    """
+    Response cache shared by the summarizer, fact-checker and reporter. Entries expire after
+    `ttl` seconds. Tracks hit rate and the LLM latency saved by hits (the latency recorded when
+    the entry was first produced).
+    """
+
+    def __init__(self, backend, ttl: float = CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self.backend.get(key)
+        if entry is not None and self.ttl and time.time() - entry[2] > self.ttl:
+            self.backend.delete(key)
+            entry = None
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.saved_seconds += entry[1] or 0.0
+        return entry[0]
+
+    def set(self, key: str, value: str, latency: float = 0.0):
+        self.backend.set(key, value, latency)
+
+    def cached_call(self, model: str, temperature, max_tokens, prompt: str, call: Callable[[], str]) -> str:
+        key = make_key(model, temperature, max_tokens, prompt)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        start = time.time()
+        value = call()
+        self.set(key, value, time.time() - start)
+        return value
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "saved_seconds": self.saved_seconds,
+            }
+
+    def log_stats(self):
+        s = self.stats()
+        logger.info(f"[CACHE] LLM cache hits={s['hits']} misses={s['misses']} hit rate={s['hit_rate']:.0%} saved={s['saved_seconds']:.2f}s")
+
+class NullCache(LLMCache):
+    """Cache that never stores anything, used when LLM_CACHE_BACKEND is 'none'."""
+
+    def __init__(self):
+        super().__init__(backend=None, ttl=0)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: str, latency: float = 0.0):
+        pass
+
+# --- Process-wide instance ---
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache() -> LLMCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            if CACHE_BACKEND == "sqlite":
+                _cache = LLMCache(SQLiteBackend(CACHE_PATH))
+            elif CACHE_BACKEND == "memory":
+                _cache = LLMCache(MemoryBackend())
+            else:
+                _cache = NullCache()
+            logger.info(f"[INFO] LLM cache backend: {CACHE_BACKEND} (ttl={CACHE_TTL}s)")
+        return _cache
@@ -1,39 +1,25 @@
 import sys, os, time, logging
-from langchain_core.prompts import PromptTemplate, FewShotPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-from langchain_cohere import ChatCohere
+import threading
+from typing import TYPE_CHECKING, Iterator
 
 # Add project root to sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 import config
+import tracing
 
-# --- Logging ---
-LOG_DIR = os.path.join(os.getcwd(), "logs")
-os.makedirs(LOG_DIR, exist_ok=True)
-LOG_PATH = os.path.join(LOG_DIR, "report.log")
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(LOG_PATH),
-        logging.StreamHandler()
-    ]
-)
+if TYPE_CHECKING:
+    from langchain_core.prompts import PromptTemplate
 
-# Setup Logging
+# --- Logging (handlers are set up by the entry point, see logging_setup) ---
 logger = logging.getLogger(__name__)
 
-def generate_final_report(summary: str, fact_check_output: str) -> str:
-    """
-    Generate a markdown-formatted final report from a podcast summary and its fact check result.
-    """
-
-    # Model
-    llm = ChatCohere(model="command-r", cohere_api_key=config.COHERE_API_KEY)
+# --- Report Config ---
+REPORT_MODEL = "command-r"
+REPORT_MAX_CONCURRENCY = getattr(config, "REPORT_MAX_CONCURRENCY", 4)
 
-    # --- Examples ---
-    example1 = {
+# --- Examples ---
+EXAMPLES = [
+    {
         "summary": "The host stated that WHO declared COVID-19 a pandemic in March 2020 and that vaccines became widely available in early 2021.",
         "fact_check": (
             "Confirmed: WHO declared COVID-19 a global pandemic on March 11, 2020.\n"
@@ -51,9 +37,8 @@ def generate_final_report(summary: str, fact_check_output: str) -> str:
         **Confidence Level:** High  
         **Recommendation:** The summary is factually reliable and can be trusted.
         """
-    }
-
-    example2 = {
+    },
+    {
         "summary": "The speaker claimed that electric vehicles (EVs) never require battery replacement.",
         "fact_check": (
             "Inaccuracy: EV batteries degrade and may need replacement after 8–10 years.\n"
@@ -70,66 +55,159 @@ def generate_final_report(summary: str, fact_check_output: str) -> str:
         **Confidence Level:** Medium  
         **Recommendation:** Be cautious. Some misleading information is present.
         """
-    }
-
-    # --- Prompt Templates ---
-    example_prompt = PromptTemplate(
-        input_variables=["summary", "fact_check", "final_report"],
-        template=(
-            "Summary:\n{summary}\n\n"
-            "Fact Check Results:\n{fact_check}\n\n"
-            "Final Report:\n{final_report}"
-        )
-    )
+    },
+]
+
+# --- Prompt Templates (plain strings; LangChain is only imported when a chain is built) ---
+EXAMPLE_TEMPLATE = (
+    "Summary:\n{summary}\n\n"
+    "Fact Check Results:\n{fact_check}\n\n"
+    "Final Report:\n{final_report}"
+)
 
-    fewshot_prompt = FewShotPromptTemplate(
-        examples=[example1, example2],
-        example_prompt=example_prompt,
-        prefix=(
-            "You are a fact-checking report generator. Based on the summary and fact-check output, generate a markdown-formatted report using this structure:\n\n"
-            "### [Emoji] Fact Check Report\n\n"
-            "**Confirmed Claims:**\n- ...\n\n"
-            "**Inaccuracies:**\n- ...\n\n"
-            "**Confidence Level:** ...\n"
-            "**Recommendation:** ..."
-        ),
-        suffix=(
-            "\n---\nNow evaluate this:\n\n"
-            "Summary:\n"
-            "{summary}\n\n"
-            "Fact Check Results:\n"
-            "{fact_check}\n\n"
-            "Please follow these instructions:\n"
-            "- Use proper markdown formatting.\n"
-            "- Clearly list confirmed claims.\n"
-            "- Call out any inaccuracies.\n"
-            "- Include a confidence level (High, Medium, Low).\n"
-            "- State whether the summary can be trusted.\n\n"
-            "Final Report:"
-        ),
-        input_variables=["summary", "fact_check"]
-    )
+PREFIX = (
+    "You are a fact-checking report generator. Based on the summary and fact-check output, generate a markdown-formatted report using this structure:\n\n"
+    "### [Emoji] Fact Check Report\n\n"
+    "**Confirmed Claims:**\n- ...\n\n"
+    "**Inaccuracies:**\n- ...\n\n"
+    "**Confidence Level:** ...\n"
+    "**Recommendation:** ..."
+)
 
-    # Run the chain
-    chain = (
-        {"summary": lambda _: summary.strip(), "fact_check": lambda _: fact_check_output.strip()}
-        | fewshot_prompt
-        | llm
-        | StrOutputParser()
-    )
+SUFFIX = (
+    "\n---\nNow evaluate this:\n\n"
+    "Summary:\n"
+    "{summary}\n\n"
+    "Fact Check Results:\n"
+    "{fact_check}\n\n"
+    "Please follow these instructions:\n"
+    "- Use proper markdown formatting.\n"
+    "- Clearly list confirmed claims.\n"
+    "- Call out any inaccuracies.\n"
+    "- Include a confidence level (High, Medium, Low).\n"
+    "- State whether the summary can be trusted.\n\n"
+    "Final Report:"
+)
 
-    final_report = chain.invoke({"summary": summary, "fact_check": fact_check_output})
+def build_prompt() -> "PromptTemplate":
+    """
+    Render the instructions and few-shot examples once into a static prefix; only the summary and
+    fact-check slots are filled per report. Produces the same text as the equivalent FewShotPromptTemplate.
+    """
+    from langchain_core.prompts import PromptTemplate
 
-    # --- Optional Warning ---
-    if not final_report.strip().startswith("###"):
-        logger.warning("[WARNING] Final report is not in expected markdown format.")
+    examples = [EXAMPLE_TEMPLATE.format(**example) for example in EXAMPLES]
+    static = "\n\n".join([PREFIX, *examples]).replace("{", "{{").replace("}", "}}")
+    return PromptTemplate(input_variables=["summary", "fact_check"], template=static + "\n\n" + SUFFIX)
+
+class ReportGenerator:
+    """
+    Reusable report chain: the prompt is compiled once and one LLM client (and its HTTP connection
+    pool) is shared by every report. `generate_reports` runs many reports through the chain's batch API.
+    """
+
+    def __init__(self, llm=None, max_concurrency: int = REPORT_MAX_CONCURRENCY):
+        from langchain_core.output_parsers import StrOutputParser
+
+        if llm is None:
+            from langchain_cohere import ChatCohere  # deferred: slow to import
+
+            llm = ChatCohere(model=REPORT_MODEL, cohere_api_key=config.COHERE_API_KEY, callbacks=[tracing.llm_span_handler()])
+        self.llm = llm
+        self.max_concurrency = max_concurrency
+        self.prompt = build_prompt()
+        self.chain = self.prompt | self.llm | StrOutputParser()
+
+    @staticmethod
+    def _inputs(summary: str, fact_check_output: str) -> dict:
+        return {"summary": summary.strip(), "fact_check": fact_check_output.strip()}
+
+    @staticmethod
+    def _check_format(report: str):
+        if not report.strip().startswith("###"):
+            logger.warning("[WARNING] Final report is not in expected markdown format.")
+
+    def generate(self, summary: str, fact_check_output: str) -> str:
+        with tracing.span("report", model=REPORT_MODEL) as span:
+            report = self.chain.invoke(self._inputs(summary, fact_check_output))
+            span.set(bytes=len(report.encode("utf-8")))
+        self._check_format(report)
+        return report
+
+    def stream(self, summary: str, fact_check_output: str) -> Iterator[str]:
+        """Yield report text as the LLM produces it."""
+        # Not made current: the consumer renders tokens between our yields
+        span = tracing.start_span("report", model=REPORT_MODEL, streaming=True)
+        start = time.time()
+        parts = []
+        try:
+            for token in self.chain.stream(self._inputs(summary, fact_check_output)):
+                if not parts:
+                    span.set(first_token_seconds=time.time() - start)
+                    logger.info(f"[INFO] First report token after {time.time() - start:.2f}s")
+                parts.append(token)
+                yield token
+        except Exception as e:
+            span.end(e)
+            raise
+        finally:
+            span.set(bytes=len("".join(parts).encode("utf-8")))
+            span.end()
+        self._check_format("".join(parts))
+
+    def generate_reports(self, pairs: list[tuple[str, str]]) -> list[str]:
+        """Reports for (summary, fact_check_output) pairs in input order; a failed report becomes an error string."""
+        start = time.time()
+        with tracing.span("report.batch", model=REPORT_MODEL, reports=len(pairs)):
+            results = self.chain.batch(
+                [self._inputs(summary, fact_check_output) for summary, fact_check_output in pairs],
+                config={"max_concurrency": self.max_concurrency},
+                return_exceptions=True,
+            )
+        reports = []
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"[ERROR] Report generation failed: {result}")
+                reports.append(f"Error: {result}")
+            else:
+                self._check_format(result)
+                reports.append(result)
+        logger.info(f"[INFO] Generated {len(pairs)} reports in {time.time() - start:.2f}s (max_concurrency={self.max_concurrency})")
+        return reports
+
+_generator = None
+_generator_lock = threading.Lock()
+
+def get_report_generator() -> ReportGenerator:
+    global _generator
+    with _generator_lock:
+        if _generator is None:
+            from agents.langchain_cache import install_langchain_cache
+
+            # Identical summary/fact-check pairs are served from the shared LLM cache
+            install_langchain_cache()
+            _generator = ReportGenerator()
+        return _generator
+
+def generate_final_report(summary: str, fact_check_output: str) -> str:
+    """
+    Generate a markdown-formatted final report from a podcast summary and its fact check result.
+    """
+    return get_report_generator().generate(summary, fact_check_output)
 
-    return final_report
+def stream_final_report(summary: str, fact_check_output: str) -> Iterator[str]:
+    """Streaming version of `generate_final_report`; yields markdown fragments as they are generated."""
+    return get_report_generator().stream(summary, fact_check_output)
 
+def generate_reports(pairs: list[tuple[str, str]]) -> list[str]:
+    """Batch version of `generate_final_report` for back-fills."""
+    return get_report_generator().generate_reports(pairs)
 
 
 # --- CLI test ---
 if __name__ == "__main__":
+    import logging_setup
+    logging_setup.configure_logging()
     sample_summary = (
         "Tesla CEO Elon Musk claimed during the podcast that their cars can fully drive themselves without human intervention as of 2023."
     )
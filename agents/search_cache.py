@@ -0,0 +1,99 @@
+import os, sys
+import re
+import time
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Callable
+
+# Setup path and import config
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import config
+from agents.llm_cache import LLMCache, MemoryBackend, SQLiteBackend
+
+logger = logging.getLogger(__name__)
+
+# --- Cache Config ---
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SEARCH_CACHE_ENABLED = getattr(config, "SEARCH_CACHE_ENABLED", True)
+SEARCH_CACHE_PATH = getattr(config, "SEARCH_CACHE_PATH", os.path.join(project_root, "cache", "search_cache.sqlite"))
+SEARCH_CACHE_TTL = getattr(config, "SEARCH_CACHE_TTL", 24 * 3600)  # seconds
+SEARCH_CACHE_MAX_ENTRIES = getattr(config, "SEARCH_CACHE_MAX_ENTRIES", 50_000)
+
+PUNCTUATION = re.compile(r"[^\w\s]")
+WHITESPACE = re.compile(r"\s+")
+
+def normalize_query(query: str) -> str:
+    """Case-, whitespace- and punctuation-insensitive key for a search query."""
+    return WHITESPACE.sub(" ", PUNCTUATION.sub(" ", query.lower())).strip()
+
+class SearchCache:
+    """
+    TTL cache for web search answers keyed by normalised query. Concurrent lookups for the same
+    key are coalesced so only one of them performs the HTTP call; the others wait on its result.
+    Failed searches are never cached.
+    """
+
+    def __init__(self, cache: LLMCache):
+        self.cache = cache
+        self.coalesced = 0
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def get(self, query: str):
+        return self.cache.get(normalize_query(query))
+
+    def set(self, query: str, answer: str, latency: float = 0.0):
+        self.cache.set(normalize_query(query), answer, latency)
+
+    def get_or_fetch(self, query: str, fetch: Callable[[str], str]) -> str:
+        key = normalize_query(query)
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.info(f"[CACHE] Search hit: {query}")
+            return cached
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            logger.info(f"[CACHE] Search coalesced with in-flight request: {query}")
+            return future.result()
+
+        try:
+            start = time.time()
+            answer = fetch(query)
+            self.cache.set(key, answer, time.time() - start)
+            future.set_result(answer)
+            return answer
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def stats(self) -> dict:
+        return {**self.cache.stats(), "coalesced": self.coalesced}
+
+def _build_cache() -> SearchCache:
+    if SEARCH_CACHE_ENABLED:
+        backend = SQLiteBackend(SEARCH_CACHE_PATH, max_entries=SEARCH_CACHE_MAX_ENTRIES, table="search_cache")
+        return SearchCache(LLMCache(backend, ttl=SEARCH_CACHE_TTL))
+    return SearchCache(LLMCache(MemoryBackend(max_entries=0), ttl=SEARCH_CACHE_TTL))
+
+# --- Process-wide instance (built on first use, so importing this module touches no files) ---
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_search_cache() -> SearchCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = _build_cache()
+        return _cache
@@ -1,9 +1,12 @@
-import os
+import os, sys
 import time
 import ray
 import logging
 from transformers import pipeline
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from agents.chunker import chunk_text
+
 # --- Logging Setup ---
 current_file_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.abspath(os.path.join(current_file_dir, ".."))
@@ -49,11 +52,11 @@ class SummarizerActor:
         return self.summarizer(text)[0]["summary_text"]
 
 # --- Main summarization function ---
-def summarize_text(text: str, chunk_size: int = 1000, num_workers: int = 4, model_name: str = MODEL_NAME) -> str:
+def summarize_text(text: str, chunk_size: int = 700, num_workers: int = 4, model_name: str = MODEL_NAME) -> str:
     total_start = time.time()
 
-    # Split text into chunks
-    chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+    # Split text into sentence-aligned chunks (chunk_size in tokens; distilbart accepts up to 1024)
+    chunks = chunk_text(text, max_tokens=chunk_size, model=model_name)
     logger.info(f"[START] Summarization with {len(chunks)} chunks using `{model_name}` and {num_workers} workers.")
 
     # Create Ray actors
@@ -0,0 +1,109 @@
+import os, sys
+import json
+import time
+import hashlib
+import logging
+import threading
+
+# Setup path and import config
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import config
+
+logger = logging.getLogger(__name__)
+
+# --- Cache Config ---
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+CACHE_DIR = getattr(config, "TRANSCRIPT_CACHE_DIR", os.path.join(project_root, "cache", "transcripts"))
+CACHE_MAX_MB = getattr(config, "TRANSCRIPT_CACHE_MAX_MB", 500)
+CACHE_ENABLED = getattr(config, "TRANSCRIPT_CACHE_ENABLED", True)
+HASH_BLOCK_SIZE = 1 << 20  # 1 MiB
+
+# --- Audio fingerprint ---
+def hash_audio(file_path: str) -> str:
+    """SHA-256 of the audio bytes, read in fixed-size blocks so large files are never fully loaded."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def make_key(audio_hash: str, model_size: str, compute_type: str, beam_size: int, language: str, batch_size: int = 0,
+             decode_mode: str = "whole") -> str:
+    # Batched and windowed decoding segment the audio differently; unbatched whole-file keys stay as they were
+    settings = [audio_hash, model_size, compute_type, beam_size, language] + ([batch_size] if batch_size else [])
+    if decode_mode != "whole":
+        settings.append(decode_mode)
+    return hashlib.sha256(json.dumps(settings).encode("utf-8")).hexdigest()
+
+# --- On-disk cache ---
+class TranscriptCache:
+    """
+    Content-addressed transcript store: one JSON file per key holding the transcript text and
+    segment timestamps. Files are evicted least-recently-used first once `max_bytes` is exceeded.
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR, max_bytes: int = CACHE_MAX_MB * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str):
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            logger.info(f"[CACHE] Transcript miss {key[:12]} (hits={self.hits}, misses={self.misses})")
+            return None
+
+        # Bump mtime so eviction treats this entry as recently used
+        os.utime(path)
+        with self._lock:
+            self.hits += 1
+        logger.info(f"[CACHE] Transcript hit {key[:12]} (hits={self.hits}, misses={self.misses})")
+        return entry
+
+    def put(self, key: str, transcript: str, segments: list):
+        entry = {
+            "transcript": transcript,
+            "segments": [list(seg) for seg in segments],
+            "created_at": time.time(),
+        }
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+                total -= size
+                logger.info(f"[CACHE] Evicted transcript {name[:12]}")
+            except OSError:
+                pass
+
+transcript_cache = TranscriptCache()
@@ -1,57 +1,487 @@
-import os
+import os, sys
 import time
 import logging
-from faster_whisper import WhisperModel
-
-# --- Logging ---
-LOG_DIR = os.path.join(os.getcwd(), "logs")
-os.makedirs(LOG_DIR, exist_ok=True)
-LOG_PATH = os.path.join(LOG_DIR, "transcription.log")
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler(LOG_PATH),
-        logging.StreamHandler()
-    ]
-)
+import atexit
+import threading
+import multiprocessing
+from collections import OrderedDict
+from functools import partial
+from typing import Iterator, NamedTuple, Optional
+from concurrent.futures import ProcessPoolExecutor
+import av
+import numpy as np
+from faster_whisper import BatchedInferencePipeline, WhisperModel, decode_audio
+from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+# Setup path and import config
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import config
+import tracing
+import logging_setup
+from agents.transcript_cache import transcript_cache, hash_audio, make_key, CACHE_ENABLED
+from agents.whisper_tuning import load_tuning
+
+# --- Logging (handlers are set up by the entry point, see logging_setup) ---
 logger = logging.getLogger(__name__)
 
 # --- Model Config ---
 MODEL_SIZE = "base"  # small | medium | large-v2 | tiny
 USE_GPU = False  # Set True for GPU if available
-COMPUTE_TYPE = "int8" if not USE_GPU else "float16"
+DEVICE = "cuda" if USE_GPU else "cpu"
+LANGUAGE = "en"
+
+# Untuned defaults; see `whisper_settings` for the per-model-size values actually used
+COMPUTE_TYPE = getattr(config, "WHISPER_COMPUTE_TYPE", "float16" if USE_GPU else "int8")
+CPU_THREADS = getattr(config, "WHISPER_CPU_THREADS", 0)  # 0 = CTranslate2 default
+NUM_WORKERS = getattr(config, "WHISPER_NUM_WORKERS", 1)  # concurrent transcribe calls one model can serve
+BEAM_SIZE = getattr(config, "WHISPER_BEAM_SIZE", 5)
+BATCH_SIZE = getattr(config, "WHISPER_BATCH_SIZE", 0)  # 0 = unbatched
+
+class WhisperSettings(NamedTuple):
+    compute_type: str
+    cpu_threads: int
+    beam_size: int
+    batch_size: int
+
+def whisper_settings(model_size: str = MODEL_SIZE) -> WhisperSettings:
+    """
+    Settings for `model_size`: what `python -m agents.whisper_tuning` stored for this host and
+    model size when it has been run, else the defaults above. Values set in config.py always win.
+    """
+    tuned = load_tuning(model_size) if not USE_GPU else {}
+
+    def pick(config_name, option, default):
+        return getattr(config, config_name) if hasattr(config, config_name) else tuned.get(option, default)
+
+    return WhisperSettings(
+        pick("WHISPER_COMPUTE_TYPE", "compute_type", COMPUTE_TYPE),
+        pick("WHISPER_CPU_THREADS", "cpu_threads", CPU_THREADS),
+        pick("WHISPER_BEAM_SIZE", "beam_size", BEAM_SIZE),
+        pick("WHISPER_BATCH_SIZE", "batch_size", BATCH_SIZE),
+    )
+
+# --- Model Registry Config ---
+MAX_CACHED_MODELS = getattr(config, "WHISPER_MAX_MODELS", 2)
+MODEL_MEMORY_LIMIT_MB = getattr(config, "WHISPER_MEMORY_LIMIT_MB", 4096)
+
+# Rough resident size (MB) per model size, used to enforce the memory ceiling
+MODEL_MEMORY_MB = {
+    "tiny": 75,
+    "base": 150,
+    "small": 500,
+    "medium": 1500,
+    "large": 3100,
+    "large-v1": 3100,
+    "large-v2": 3100,
+    "large-v3": 3100,
+}
+DEFAULT_MODEL_MEMORY_MB = 1500
+
+# --- Model Registry ---
+class WhisperModelRegistry:
+    """
+    Process-wide, thread-safe LRU cache of loaded Whisper models keyed by (size, device, compute_type).
+    Least recently used models are evicted once `max_models` or `memory_limit_mb` is exceeded.
+    """
+
+    def __init__(self, max_models: int = MAX_CACHED_MODELS, memory_limit_mb: int = MODEL_MEMORY_LIMIT_MB, loader=None):
+        self.max_models = max_models
+        self.memory_limit_mb = memory_limit_mb
+        self._loader = loader
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def _load(self, model_size: str, device: str, compute_type: str):
+        loader = self._loader or whisper_loader()
+        start_model = time.time()
+        model = loader(model_size, device=device, compute_type=compute_type)
+        logger.info(f"[INFO] Loaded Whisper model '{model_size}' on {device.upper()} ({compute_type}) in {time.time() - start_model:.2f}s")
+        return model
+
+    def _memory_used(self) -> int:
+        return sum(MODEL_MEMORY_MB.get(size, DEFAULT_MODEL_MEMORY_MB) for size, _, _ in self._models)
+
+    def _evict(self, keep):
+        # Always keep the model that was just requested, even if it alone exceeds the ceiling
+        while len(self._models) > 1 and (len(self._models) > self.max_models or self._memory_used() > self.memory_limit_mb):
+            key = next(iter(self._models))
+            if key == keep:
+                self._models.move_to_end(key)
+                continue
+            del self._models[key]
+            logger.info(f"[INFO] Evicted Whisper model '{key[0]}' ({key[1]}, {key[2]}) from registry")
+
+    def get(self, model_size: str = MODEL_SIZE, device: str = DEVICE, compute_type: str = COMPUTE_TYPE):
+        key = (model_size, device, compute_type)
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                return self._models[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Load outside the registry lock so other sizes stay available; the per-key
+        # lock makes concurrent requests for the same model share a single load.
+        with key_lock:
+            with self._lock:
+                if key in self._models:
+                    self._models.move_to_end(key)
+                    return self._models[key]
+
+            model = self._load(model_size, device, compute_type)
+
+            with self._lock:
+                self._models[key] = model
+                self._evict(keep=key)
+        return model
+
+    def loaded(self) -> list:
+        with self._lock:
+            return list(self._models)
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+            self._key_locks.clear()
+
+def whisper_loader(cpu_threads: Optional[int] = None, num_workers: int = NUM_WORKERS):
+    """WhisperModel factory; without `cpu_threads`, each model size loads with its own `whisper_settings` thread count."""
+    if cpu_threads is not None:
+        return partial(WhisperModel, cpu_threads=cpu_threads, num_workers=num_workers)
+
+    def load(model_size, **kwargs):
+        return WhisperModel(model_size, cpu_threads=whisper_settings(model_size).cpu_threads, num_workers=num_workers, **kwargs)
+    return load
+
+model_registry = WhisperModelRegistry()
+
+def configure_cpu_threads(cpu_threads: int):
+    """Cap CTranslate2 threads for models loaded from now on, e.g. in one of N worker processes."""
+    global model_registry
+    model_registry = WhisperModelRegistry(loader=whisper_loader(cpu_threads=cpu_threads))
 
 # --- Load model ---
-def load_model(model_size = MODEL_SIZE):
-    start_model = time.time()
-    model = WhisperModel(MODEL_SIZE, device="cuda" if USE_GPU else "cpu", compute_type=COMPUTE_TYPE)
-    logger.info(f"[INFO] Loaded Whisper model '{MODEL_SIZE}' on {'GPU' if USE_GPU else 'CPU'} in {time.time() - start_model:.2f}s")
-    return model
+def load_model(model_size = MODEL_SIZE, settings: Optional[WhisperSettings] = None):
+    settings = settings or whisper_settings(model_size)
+    return model_registry.get(model_size, DEVICE, settings.compute_type)
+
+# --- Inference ---
+def transcribe_with(model, audio, beam_size: int = BEAM_SIZE, batch_size: int = BATCH_SIZE, language: str = LANGUAGE):
+    """
+    (segments, info) for a file path or samples. With `batch_size` > 0 the audio is split into VAD
+    speech segments that are decoded `batch_size` at a time by faster-whisper's batched pipeline.
+    """
+    if batch_size > 0:
+        return BatchedInferencePipeline(model).transcribe(audio, beam_size=beam_size, language=language, batch_size=batch_size)
+    return model.transcribe(audio, beam_size=beam_size, language=language)
+
+# --- Timestamped segment ---
+class TranscriptSegment(NamedTuple):
+    start: float
+    end: float
+    text: str
+
+# --- Parallel Chunked Transcription Config ---
+SAMPLE_RATE = 16000
+PARALLEL_TRANSCRIPTION = getattr(config, "WHISPER_PARALLEL", False)
+PARALLEL_WORKERS = getattr(config, "WHISPER_PARALLEL_WORKERS", os.cpu_count() or 1)
+WINDOW_SECONDS = getattr(config, "WHISPER_WINDOW_SECONDS", 120)
+WINDOW_OVERLAP_SECONDS = getattr(config, "WHISPER_WINDOW_OVERLAP_SECONDS", 2.0)
+
+def plan_windows(speech_timestamps: list[dict], total_samples: int, window_samples: int, overlap_samples: int) -> list[dict]:
+    """
+    Group VAD speech regions into windows of at most `window_samples`, cutting only at silences.
+    Each window is padded by `overlap_samples` on both sides; `core_start`/`core_end` mark the
+    non-overlapping span (cut at the middle of the silence) that owns segments when stitching.
+    """
+    groups = []
+    for region in speech_timestamps:
+        if groups and region["end"] - groups[-1][0]["start"] <= window_samples:
+            groups[-1].append(region)
+        else:
+            groups.append([region])
+
+    windows = []
+    for i, group in enumerate(groups):
+        start, end = group[0]["start"], group[-1]["end"]
+        core_start = 0 if i == 0 else (groups[i - 1][-1]["end"] + start) // 2
+        core_end = total_samples if i == len(groups) - 1 else (end + groups[i + 1][0]["start"]) // 2
+        windows.append({
+            "start": max(0, start - overlap_samples),
+            "end": min(total_samples, end + overlap_samples),
+            "core_start": core_start,
+            "core_end": core_end,
+        })
+    return windows
+
+def stitch_segments(window_results: list[tuple[dict, list[TranscriptSegment]]]) -> list[TranscriptSegment]:
+    """
+    Merge per-window segments (absolute seconds) in window order, keeping each segment only in
+    the window whose core span contains its midpoint so overlapping audio is not duplicated.
+    """
+    stitched = []
+    for window, segments in window_results:
+        core_start = window["core_start"] / SAMPLE_RATE
+        core_end = window["core_end"] / SAMPLE_RATE
+        for seg in segments:
+            midpoint = (seg.start + seg.end) / 2
+            if core_start <= midpoint < core_end:
+                stitched.append(seg)
+    return stitched
+
+# --- Worker process state (one model per worker) ---
+_worker_model = None
+
+def _init_worker(model_size: str, device: str, compute_type: str, cpu_threads: int, log_queue=None):
+    global _worker_model
+    logging_setup.configure_logging(log_queue=log_queue)
+    _worker_model = WhisperModel(model_size, device=device, compute_type=compute_type, cpu_threads=cpu_threads)
+
+def _transcribe_window(audio, offset: float, beam_size: int, batch_size: int, language: str) -> list[TranscriptSegment]:
+    segments, _ = transcribe_with(_worker_model, audio, beam_size, batch_size, language)
+    return [TranscriptSegment(seg.start + offset, seg.end + offset, seg.text.strip()) for seg in segments]
+
+_pool = None
+_pool_key = None
+_pool_lock = threading.Lock()
+
+def parallel_workers(model_size: str, workers: int) -> int:
+    """Cap `workers` so that one model per worker process fits within `MODEL_MEMORY_LIMIT_MB`."""
+    model_mb = MODEL_MEMORY_MB.get(model_size, DEFAULT_MODEL_MEMORY_MB)
+    return max(1, min(workers, MODEL_MEMORY_LIMIT_MB // model_mb))
+
+def _get_pool(model_size: str, settings: WhisperSettings, workers: int) -> ProcessPoolExecutor:
+    # The pool is kept alive across calls so worker models stay warm; only one is live at a time
+    global _pool, _pool_key
+    key = (model_size, DEVICE, settings.compute_type, settings.cpu_threads, workers)
+    with _pool_lock:
+        if _pool_key != key:
+            if _pool is not None:
+                # Windows already submitted to the old pool still finish
+                _pool.shutdown(wait=False)
+                logger.info(f"[INFO] Shut down transcription pool for {_pool_key[0]!r}")
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(model_size, DEVICE, settings.compute_type, settings.cpu_threads, logging_setup.worker_queue()),
+            )
+            _pool_key = key
+            logger.info(f"[INFO] Started transcription pool: {workers} workers x {settings.cpu_threads or 'default'} threads ('{model_size}')")
+        return _pool
+
+@atexit.register
+def shutdown_pools():
+    global _pool, _pool_key
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool, _pool_key = None, None
+
+def transcribe_parallel(file_path: str, model_size = MODEL_SIZE, workers: int = PARALLEL_WORKERS) -> list[TranscriptSegment]:
+    """
+    Split the audio at VAD silence boundaries into overlapping windows, transcribe them
+    concurrently in a process pool and stitch the segments back in order.
+    """
+    capped = parallel_workers(model_size, workers)
+    if capped < workers:
+        logger.warning(f"[WARNING] {workers} '{model_size}' workers exceed the {MODEL_MEMORY_LIMIT_MB} MB model memory limit; using {capped}")
+        workers = capped
+    logger.info(f"[START] Parallel transcription of {file_path} with {workers} workers")
+    start = time.time()
+    settings = whisper_settings(model_size)
+
+    audio = decode_audio(file_path, sampling_rate=SAMPLE_RATE)
+    vad_options = VadOptions(max_speech_duration_s=WINDOW_SECONDS)
+    speech = get_speech_timestamps(audio, vad_options)
+    windows = plan_windows(
+        speech,
+        total_samples=len(audio),
+        window_samples=int(WINDOW_SECONDS * SAMPLE_RATE),
+        overlap_samples=int(WINDOW_OVERLAP_SECONDS * SAMPLE_RATE),
+    )
+    logger.info(f"[INFO] Audio {len(audio) / SAMPLE_RATE:.2f}s split into {len(windows)} windows")
+
+    if not windows:
+        return []
+
+    pool = _get_pool(model_size, settings, workers)
+    futures = [
+        pool.submit(_transcribe_window, audio[w["start"]:w["end"]], w["start"] / SAMPLE_RATE, settings.beam_size, settings.batch_size, LANGUAGE)
+        for w in windows
+    ]
+    segments = stitch_segments([(w, f.result()) for w, f in zip(windows, futures)])
+
+    logger.info(f"[DONE] Parallel transcription completed in {time.time() - start:.2f}s | Segments: {len(segments)}")
+    return segments
+
+# --- Incremental decoding ---
+STREAM_DECODE = getattr(config, "WHISPER_STREAM_DECODE", True)
+STREAM_DECODE_MIN_SECONDS = getattr(config, "WHISPER_STREAM_DECODE_MIN_SECONDS", 600)  # shorter files are decoded whole
+SILENCE_MARGIN_SECONDS = 0.1
+
+def audio_duration(file_path: str):
+    """Container duration in seconds, or None when the file cannot be probed."""
+    try:
+        with av.open(file_path, mode="r", metadata_errors="ignore") as container:
+            return container.duration / av.time_base if container.duration else None
+    except (av.error.FFmpegError, OSError):
+        return None
+
+def iter_audio(file_path: str, sampling_rate: int = SAMPLE_RATE) -> Iterator[np.ndarray]:
+    """Decode and resample frame by frame, yielding small float32 mono blocks instead of one array."""
+    resampler = av.audio.resampler.AudioResampler(format="s16", layout="mono", rate=sampling_rate)
+    with av.open(file_path, mode="r", metadata_errors="ignore") as container:
+        frames = container.decode(audio=0)
+        while True:
+            try:
+                frame = next(frames)
+            except StopIteration:
+                break
+            except av.error.InvalidDataError:
+                continue  # skip corrupt frames, as decode_audio does
+            for out in resampler.resample(frame):
+                yield out.to_ndarray().reshape(-1).astype(np.float32) / 32768.0
+        for out in resampler.resample(None):
+            yield out.to_ndarray().reshape(-1).astype(np.float32) / 32768.0
+
+def _silence_cut(window: np.ndarray) -> int:
+    """Where to end a window: in trailing silence if there is some, else where the last utterance starts."""
+    speech = get_speech_timestamps(window, VadOptions())
+    if not speech or speech[-1]["end"] < len(window) - SILENCE_MARGIN_SECONDS * SAMPLE_RATE:
+        return len(window)
+    if speech[-1]["start"] > len(window) // 2:
+        return speech[-1]["start"]
+    return len(window)  # one utterance longer than half a window: hard cut
+
+def iter_audio_windows(file_path: str, window_seconds: float = WINDOW_SECONDS) -> Iterator[tuple[float, np.ndarray]]:
+    """
+    Yield (offset seconds, samples) windows of at most `window_seconds`, cut at silences, while the
+    file is still being decoded. Memory stays bounded by one window regardless of episode length.
+    """
+    window_samples = int(window_seconds * SAMPLE_RATE)
+    blocks, buffered, offset = [], 0, 0
+    for block in iter_audio(file_path):
+        blocks.append(block)
+        buffered += len(block)
+        while buffered >= window_samples:
+            buffer = np.concatenate(blocks)
+            cut = _silence_cut(buffer[:window_samples])
+            yield offset / SAMPLE_RATE, buffer[:cut]
+            offset += cut
+            blocks, buffered = [buffer[cut:]], len(buffer) - cut
+    if buffered:
+        yield offset / SAMPLE_RATE, np.concatenate(blocks)
+
+def decode_mode(file_path: str, parallel: bool = False) -> str:
+    """`parallel` (VAD windows in a process pool), `stream` (windowed incremental decode) or `whole` (one decode)."""
+    if parallel:
+        return "parallel"
+    duration = audio_duration(file_path) if STREAM_DECODE else None
+    return "stream" if duration is not None and duration >= STREAM_DECODE_MIN_SECONDS else "whole"
+
+def _decode_segments(model, file_path: str, settings: WhisperSettings, mode: str) -> Iterator[TranscriptSegment]:
+    """Segments for `file_path`; in `stream` mode the file is decoded and transcribed window by window."""
+    if mode == "stream":
+        logger.info(f"[INFO] Decoding incrementally in {WINDOW_SECONDS}s windows")
+        for offset, audio in iter_audio_windows(file_path):
+            segments, _ = transcribe_with(model, audio, settings.beam_size, settings.batch_size)
+            for seg in segments:
+                yield TranscriptSegment(seg.start + offset, seg.end + offset, seg.text.strip())
+        return
+
+    segments, info = transcribe_with(model, file_path, settings.beam_size, settings.batch_size)
+    logger.info(f"[INFO] Duration: {info.duration:.2f}s | Language: {info.language} | Batch size: {settings.batch_size}")
+    for seg in segments:
+        yield TranscriptSegment(seg.start, seg.end, seg.text.strip())
+
+def _cache_key(file_path: str, model_size: str, settings: WhisperSettings, mode: str) -> str:
+    return make_key(hash_audio(file_path), model_size, settings.compute_type, settings.beam_size, LANGUAGE, settings.batch_size, mode)
+
+# --- Streaming Transcription ---
+def iter_transcript(file_path: str, model_size = MODEL_SIZE, use_cache: bool = CACHE_ENABLED) -> Iterator[TranscriptSegment]:
+    """
+    Yield timestamped segments as faster-whisper decodes them, so downstream stages can start
+    before the whole file has been transcribed.
+    """
+    if not os.path.exists(file_path):
+        logger.error(f"[ERROR] File not found: {file_path}")
+        return
+
+    # Not made current: the consumer's own spans run between our yields
+    span = tracing.start_span("transcribe", model=model_size, bytes=os.path.getsize(file_path), streaming=True)
+    try:
+        settings = whisper_settings(model_size)
+        mode = decode_mode(file_path)
+        if use_cache:
+            key = _cache_key(file_path, model_size, settings, mode)
+            cached = transcript_cache.get(key)
+            span.set(cache_hit=cached is not None)
+            if cached is not None:
+                yield from (TranscriptSegment(*seg) for seg in cached["segments"])
+                return
+
+        model = load_model(model_size, settings)
+
+        logger.info(f"[START] Streaming transcription of file: {file_path}")
+        start = time.time()
+
+        collected = []
+        for segment in _decode_segments(model, file_path, settings, mode):
+            collected.append(segment)
+            yield segment
+
+        span.set(segments=len(collected), audio_seconds=collected[-1].end if collected else 0.0)
+        logger.info(f"[DONE] Streaming transcription completed in {time.time() - start:.2f}s | Segments: {len(collected)}")
+
+        if use_cache:
+            transcript_cache.put(key, " ".join(seg.text for seg in collected), collected)
+    except Exception as e:
+        span.end(e)
+        raise
+    finally:
+        span.end()
 
 # --- Transcription Function ---
-def transcribe_audio(file_path: str, model_size = MODEL_SIZE) -> str:
-    model = load_model(model_size)
-    
+def transcribe_audio(file_path: str, model_size = MODEL_SIZE, parallel: bool = PARALLEL_TRANSCRIPTION, use_cache: bool = CACHE_ENABLED) -> str:
     if not os.path.exists(file_path):
         logger.error(f"[ERROR] File not found: {file_path}")
         return ""
 
-    logger.info(f"[START] Transcribing file: {file_path}")
-    start = time.time()
+    with tracing.span("transcribe", model=model_size, bytes=os.path.getsize(file_path), parallel=parallel) as span:
+        settings = whisper_settings(model_size)
+        mode = decode_mode(file_path, parallel)
+        if use_cache:
+            key = _cache_key(file_path, model_size, settings, mode)
+            cached = transcript_cache.get(key)
+            span.set(cache_hit=cached is not None)
+            if cached is not None:
+                return cached["transcript"]
+
+        if parallel:
+            segments = transcribe_parallel(file_path, model_size=model_size)
+            transcript = " ".join(seg.text for seg in segments)
+        else:
+            model = load_model(model_size, settings)
+
+            logger.info(f"[START] Transcribing file: {file_path}")
+            start = time.time()
+
+            segments = list(_decode_segments(model, file_path, settings, mode))
+            transcript = " ".join(seg.text for seg in segments)
 
-    segments, info = model.transcribe(file_path, beam_size=5, language="en")
-    transcript = " ".join([seg.text.strip() for seg in segments])
+            end = time.time()
+            logger.info(f"[DONE] Transcription completed in {end - start:.2f}s | Segments: {len(segments)}")
 
-    end = time.time()
-    logger.info(f"[DONE] Transcription completed in {end - start:.2f}s")
-    logger.info(f"[INFO] Duration: {info.duration:.2f}s | Language: {info.language} | Segments: {len(transcript.split('.'))}")
+        span.set(segments=len(segments), audio_seconds=segments[-1].end if segments else 0.0)
+        if use_cache:
+            transcript_cache.put(key, transcript, segments)
 
-    return transcript
+        return transcript
 
 # --- Test Entry Point ---
 if __name__ == "__main__":
+    logging_setup.configure_logging()
     SAMPLE_FILE = "elon_musk_starship_rocket.mp3"  # replace with your test file
     output = transcribe_audio(SAMPLE_FILE)
     print("\n🔍 Transcript Preview:\n", output[:1000], "...\n")
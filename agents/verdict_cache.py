@@ -0,0 +1,153 @@
+import os, sys
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+# Setup path and import config
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import config
+from agents.claims import STOPWORDS, WORD, Verdict
+
+logger = logging.getLogger(__name__)
+
+# --- Verdict Store Config ---
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+VERDICT_CACHE_ENABLED = getattr(config, "VERDICT_CACHE_ENABLED", True)
+VERDICT_CACHE_PATH = getattr(config, "VERDICT_CACHE_PATH", os.path.join(project_root, "cache", "verdicts.sqlite"))
+STABLE_TTL = getattr(config, "VERDICT_STABLE_TTL", 180 * 24 * 3600)  # historical facts
+VOLATILE_TTL = getattr(config, "VERDICT_VOLATILE_TTL", 24 * 3600)  # "currently", "next year", ...
+NEAR_DUPLICATE_THRESHOLD = getattr(config, "VERDICT_NEAR_DUPLICATE_THRESHOLD", 0.92)
+USE_EMBEDDINGS = getattr(config, "VERDICT_CACHE_USE_EMBEDDINGS", False)
+
+# Claims about the present or future can change; past-tense facts rarely do
+VOLATILE_PATTERN = re.compile(
+    r"\b(current(ly)?|now|today|this (week|month|year)|next (week|month|year)|upcoming|soon|latest|"
+    r"recent(ly)?|still|plans?|will|expected|scheduled|as of)\b",
+    re.IGNORECASE,
+)
+YEAR = re.compile(r"\b(19|20)\d{2}\b")
+
+def fingerprint(claim: str) -> str:
+    """
+    Fingerprint of a claim's content words in order, ignoring case, punctuation, whitespace and
+    stopwords. Word order is kept: "A acquired B" and "B acquired A" are different claims. Reworded
+    matches are left to the embedding near-duplicate lookup.
+    """
+    words = [w for w in WORD.findall(claim.lower()) if w not in STOPWORDS]
+    return hashlib.sha256(" ".join(words).encode("utf-8")).hexdigest()
+
+def is_time_sensitive(claim: str) -> bool:
+    """Present/future wording, or a reference to this year or later."""
+    if VOLATILE_PATTERN.search(claim):
+        return True
+    this_year = time.localtime().tm_year
+    return any(int(m.group(0)) >= this_year for m in YEAR.finditer(claim))
+
+def ttl_for(claim: str) -> float:
+    return VOLATILE_TTL if is_time_sensitive(claim) else STABLE_TTL
+
+class VerdictCache:
+    """
+    Persistent claim -> verdict store. Exact matches use the claim fingerprint; with an embedder,
+    near-duplicate wording above `near_threshold` cosine similarity also hits. Time-sensitive
+    claims expire after VOLATILE_TTL, others after STABLE_TTL.
+    """
+
+    def __init__(self, path: str = VERDICT_CACHE_PATH, embedder=None, near_threshold: float = NEAR_DUPLICATE_THRESHOLD):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.embedder = embedder
+        self.near_threshold = near_threshold
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS verdicts ("
+                "fingerprint TEXT PRIMARY KEY, claim TEXT, verdict TEXT, evidence TEXT, sources TEXT, "
+                "checked_at REAL, expires_at REAL, embedding BLOB)"
+            )
+
+    def _row_to_verdict(self, claim: str, row) -> Verdict:
+        _, verdict, evidence, sources, checked_at = row[:5]
+        return Verdict(claim, verdict, evidence, json.loads(sources), checked_at)
+
+    def lookup_many(self, claims: List[str]) -> List[Optional[Verdict]]:
+        now = time.time()
+        results = []
+        with self._lock:
+            for claim in claims:
+                row = self._conn.execute(
+                    "SELECT claim, verdict, evidence, sources, checked_at FROM verdicts WHERE fingerprint = ? AND expires_at > ?",
+                    (fingerprint(claim), now),
+                ).fetchone()
+                results.append(self._row_to_verdict(claim, row) if row else None)
+
+        missing = [i for i, r in enumerate(results) if r is None]
+        if missing and self.embedder is not None:
+            for i, verdict in zip(missing, self._near_duplicates([claims[i] for i in missing], now)):
+                results[i] = verdict
+
+        with self._lock:
+            hits = sum(r is not None for r in results)
+            self.hits += hits
+            self.misses += len(results) - hits
+        return results
+
+    def _near_duplicates(self, claims: List[str], now: float) -> List[Optional[Verdict]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT claim, verdict, evidence, sources, checked_at, embedding FROM verdicts WHERE expires_at > ? AND embedding IS NOT NULL",
+                (now,),
+            ).fetchall()
+        if not rows:
+            return [None] * len(claims)
+
+        stored = np.stack([np.frombuffer(r[5], dtype=np.float32) for r in rows])
+        scores = self.embedder(claims) @ stored.T
+        best = scores.argmax(axis=1)
+        return [
+            self._row_to_verdict(claim, rows[j]) if scores[i, j] >= self.near_threshold else None
+            for i, (claim, j) in enumerate(zip(claims, best))
+        ]
+
+    def store_many(self, verdicts: List[Verdict]):
+        # Unverified results (search/LLM failures) are not worth remembering
+        verdicts = [v for v in verdicts if v.verdict != "Unverified"]
+        if not verdicts:
+            return
+        embeddings = self.embedder([v.claim for v in verdicts]) if self.embedder is not None else [None] * len(verdicts)
+        now = time.time()
+        with self._lock, self._conn:
+            for v, emb in zip(verdicts, embeddings):
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO verdicts VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (fingerprint(v.claim), v.claim, v.verdict, v.evidence, json.dumps(v.sources), now,
+                     now + ttl_for(v.claim), None if emb is None else np.asarray(emb, dtype=np.float32).tobytes()),
+                )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_verdict_cache() -> Optional[VerdictCache]:
+    global _cache
+    with _cache_lock:
+        if _cache is None and VERDICT_CACHE_ENABLED:
+            embedder = None
+            if USE_EMBEDDINGS:
+                from agents.evidence_index import embed_texts
+                embedder = embed_texts
+            _cache = VerdictCache(embedder=embedder)
+        return _cache
@@ -0,0 +1,171 @@
+import os, sys
+import json
+import time
+import logging
+import argparse
+import platform
+import itertools
+from datetime import datetime, timezone
+from typing import Callable, List, Optional
+
+# Setup path and import config
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import config
+
+logger = logging.getLogger(__name__)
+
+# --- Tuning Config ---
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+TUNING_PATH = getattr(config, "WHISPER_TUNING_PATH", os.path.join(project_root, "cache", "whisper_tuning.json"))
+COMPUTE_TYPES = ["int8", "int8_float32"]
+BEAM_SIZES = [1, 5]
+BATCH_SIZES = [0, 8]  # 0 = unbatched model.transcribe
+SAMPLE_SECONDS = 120  # audio used per measurement
+WARMUP_SECONDS = 5
+
+# --- Host identity ---
+def cpu_model() -> str:
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+def host_key() -> str:
+    """Instances with the same CPU model and core count share tuned settings."""
+    return f"{cpu_model()} x{os.cpu_count() or 1}"
+
+# --- Stored results ---
+def _read(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def load_tuning(model_size: str, path: str = TUNING_PATH, host: Optional[str] = None) -> dict:
+    """Best settings recorded for this host and model size (compute_type, cpu_threads, beam_size, batch_size), or {}."""
+    return _read(path).get(host or host_key(), {}).get(model_size, {}).get("best", {})
+
+def save_tuning(model_size: str, report: dict, path: str = TUNING_PATH, host: Optional[str] = None):
+    data = _read(path)
+    data.setdefault(host or host_key(), {})[model_size] = report
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+# --- Sweep ---
+def thread_counts(cpu_count: Optional[int] = None) -> List[int]:
+    """Powers of two up to the core count, plus the core count itself."""
+    cpu_count = cpu_count or os.cpu_count() or 1
+    counts = [n for n in (2 ** i for i in range(cpu_count.bit_length())) if n < cpu_count]
+    return counts + [cpu_count]
+
+def select_best(results: List[dict], beam_size: int) -> Optional[dict]:
+    """
+    Fastest working combination at `beam_size`, or None when none at that beam size succeeded.
+    Beam size trades accuracy for speed, so other beam sizes are only reported; lower
+    WHISPER_BEAM_SIZE deliberately to use them.
+    """
+    candidates = [r for r in results if "error" not in r and r["beam_size"] == beam_size]
+    return max(candidates, key=lambda r: r["throughput"], default=None)
+
+def autotune(sample_path: str, model_size: str, compute_types: List[str] = COMPUTE_TYPES, threads: Optional[List[int]] = None,
+             beam_sizes: List[int] = BEAM_SIZES, batch_sizes: List[int] = BATCH_SIZES, seconds: float = SAMPLE_SECONDS,
+             repeat: int = 1, target_beam_size: Optional[int] = None, loader: Optional[Callable] = None) -> dict:
+    """
+    Transcribe the first `seconds` of `sample_path` with every combination and record throughput
+    (audio seconds per wall second, best of `repeat`). One model is loaded per (compute type, threads).
+    """
+    from faster_whisper import WhisperModel, decode_audio
+    from agents.transcription import BEAM_SIZE, SAMPLE_RATE, transcribe_with
+
+    loader = loader or WhisperModel
+    audio = decode_audio(sample_path, sampling_rate=SAMPLE_RATE)[: int(seconds * SAMPLE_RATE)]
+    audio_seconds = len(audio) / SAMPLE_RATE
+    target_beam_size = target_beam_size or BEAM_SIZE
+    results = []
+
+    for compute_type, cpu_threads in itertools.product(compute_types, threads or thread_counts()):
+        setting = {"compute_type": compute_type, "cpu_threads": cpu_threads}
+        try:
+            model = loader(model_size, device="cpu", compute_type=compute_type, cpu_threads=cpu_threads)
+            list(transcribe_with(model, audio[: WARMUP_SECONDS * SAMPLE_RATE], beam_size=1, batch_size=0)[0])
+        except Exception as e:
+            logger.error(f"[TUNE] {compute_type} x{cpu_threads} threads failed to load: {e}")
+            results.extend({**setting, "beam_size": b, "batch_size": n, "error": str(e)} for b, n in itertools.product(beam_sizes, batch_sizes))
+            continue
+
+        for beam_size, batch_size in itertools.product(beam_sizes, batch_sizes):
+            result = {**setting, "beam_size": beam_size, "batch_size": batch_size}
+            try:
+                walls = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    list(transcribe_with(model, audio, beam_size=beam_size, batch_size=batch_size)[0])
+                    walls.append(time.perf_counter() - start)
+                result.update(wall_seconds=min(walls), throughput=audio_seconds / min(walls))
+                logger.info(f"[TUNE] {compute_type} x{cpu_threads} threads, beam {beam_size}, batch {batch_size}: {result['throughput']:.2f}x realtime")
+            except Exception as e:
+                result["error"] = str(e)
+                logger.error(f"[TUNE] {compute_type} x{cpu_threads} threads, beam {beam_size}, batch {batch_size} failed: {e}")
+            results.append(result)
+        del model
+
+    best = select_best(results, target_beam_size)
+    return {
+        "best": {k: best[k] for k in ("compute_type", "cpu_threads", "beam_size", "batch_size")} if best else {},
+        "best_throughput": best["throughput"] if best else None,
+        "results": results,
+        "sample": os.path.basename(sample_path),
+        "audio_seconds": audio_seconds,
+        "cpu_count": os.cpu_count(),
+        "platform": platform.platform(),
+        "tuned_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m agents.whisper_tuning",
+                                     description="Find the fastest Whisper CPU settings for this host and store them for agents.transcription.")
+    parser.add_argument("sample", help="Audio file to transcribe during the sweep")
+    parser.add_argument("--model-size", default=None, help="Whisper model size (default: transcription.MODEL_SIZE)")
+    parser.add_argument("--compute-types", nargs="+", default=COMPUTE_TYPES)
+    parser.add_argument("--threads", nargs="+", type=int, default=None, help="cpu_threads values (default: powers of two up to the core count)")
+    parser.add_argument("--beam-sizes", nargs="+", type=int, default=BEAM_SIZES)
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=BATCH_SIZES, help="0 = unbatched")
+    parser.add_argument("--target-beam-size", type=int, default=None, help="Beam size the stored best must use (default: WHISPER_BEAM_SIZE)")
+    parser.add_argument("--seconds", type=float, default=SAMPLE_SECONDS, help="Audio seconds per measurement")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--out", default=TUNING_PATH)
+    parser.add_argument("--dry-run", action="store_true", help="Print results without storing them")
+    args = parser.parse_args(argv)
+
+    import logging_setup
+    from agents.transcription import MODEL_SIZE
+    logging_setup.configure_logging()
+
+    model_size = args.model_size or MODEL_SIZE
+    report = autotune(args.sample, model_size, args.compute_types, args.threads, args.beam_sizes, args.batch_sizes,
+                      seconds=args.seconds, repeat=args.repeat, target_beam_size=args.target_beam_size)
+
+    print(f"\n{'compute':<14}{'threads':>8}{'beam':>6}{'batch':>7}{'x realtime':>12}")
+    for r in sorted(report["results"], key=lambda r: r.get("throughput", -1), reverse=True):
+        speed = f"{r['throughput']:.2f}" if "throughput" in r else "error"
+        print(f"{r['compute_type']:<14}{r['cpu_threads']:>8}{r['beam_size']:>6}{r['batch_size']:>7}{speed:>12}")
+    if not report["best"]:
+        print("No combination succeeded; nothing stored.", file=sys.stderr)
+        return 1
+
+    print(f"\nBest for {host_key()} ({model_size}): {report['best']} at {report['best_throughput']:.2f}x realtime")
+    if not args.dry_run:
+        save_tuning(model_size, report, path=args.out)
+        print(f"Stored in {args.out}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
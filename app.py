@@ -1,45 +1,16 @@
 import streamlit as st
-import os, sys
+import os
 import time
 import logging
-from logging.handlers import RotatingFileHandler
-from tempfile import NamedTemporaryFile
-from main import initialize_pipeline
-from agents.transcription import transcribe_audio
-
-# Use Streamlit's current working directory
-LOG_DIR = os.path.join(os.getcwd(), "logs")
-os.makedirs(LOG_DIR, exist_ok=True)
-
-LOG_PATH = os.path.join(LOG_DIR, "app_latency.log")
-
-# Get a logger specific to this module
+from main import PIPELINE_MODE, prepare_transcript, stream_pipeline, trace_run
+from checkpoints import RunCheckpoint
+from jobs import POLL_INTERVAL, get_worker_pool, save_upload
+import logging_setup
+import config
+
+# One queue-backed logging setup for the whole process (idempotent across Streamlit reruns)
+logging_setup.configure_logging()
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
-
-# Ensure handlers are only added once
-# Below ensures the log of this file takes precedence over others
-if not logger.handlers:
-    # File handler for app_latency.log
-    file_handler = RotatingFileHandler(LOG_PATH, maxBytes=5_000_000, backupCount=2, encoding="utf-8")
-    file_handler.setLevel(logging.INFO)
-
-    # Stream handler for console output
-    stream_handler = logging.StreamHandler(stream=sys.stdout)
-    stream_handler.setLevel(logging.INFO)
-    # Ensure console output uses UTF-8 for compatibility
-    stream_handler.stream.reconfigure(encoding='utf-8')
-
-    # Define formatter
-    formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-
-    # Set formatter for handlers
-    file_handler.setFormatter(formatter)
-    stream_handler.setFormatter(formatter)
-
-    # Add handlers to the logger
-    logger.addHandler(file_handler)
-    logger.addHandler(stream_handler)
 
 
 # --- Streamlit UI Setup ---
@@ -64,42 +35,66 @@ if "report" not in st.session_state:
 
 # --- Whisper Model Selection ---
 model_size = st.selectbox("Select Whisper model for transcription:", ["base", "small", "medium", "large"], index=0)
+streaming = st.checkbox("⚡ Summarize while transcribing (overlap pipeline stages)", value=False)
+resume = st.checkbox("♻️ Resume from the last successful stage if this file was processed before", value=True)
+background = st.checkbox("🧵 Run in the background job queue (keeps the app responsive)", value=getattr(config, "APP_BACKGROUND_JOBS", True))
+
+# One worker pool per Streamlit server process, shared by all sessions
+@st.cache_resource
+def worker_pool():
+    return get_worker_pool()
 
 # --- File Uploader ---
 uploaded_file = st.file_uploader("🎧 Upload a podcast audio file (.mp3, .wav, .m4a)")
 
 # --- Processing Function ---
-def process_podcast(file_path, model_size="base"):
+# Every stage output is checkpointed under a run keyed by the audio hash, so a retry after a
+# fact-check or report failure resumes instead of re-transcribing and re-summarizing.
+def process_podcast(file_path, checkpoint, model_size="base", overlap=False):
+    with trace_run("app", checkpoint, model=model_size, overlap=overlap):
+        _process_podcast(file_path, checkpoint, model_size, overlap)
+
+def _process_podcast(file_path, checkpoint, model_size, overlap):
     overall_start = time.time()
 
-    try:
-        # --- Step 1: Transcription ---
-        t1 = time.time()
-        with st.spinner("Step 1: Transcribing audio..."):
-            transcription = transcribe_audio(file_path, model_size=model_size)
-            st.session_state.transcript = transcription
-        t2 = time.time()
-        transcription_time = t2 - t1
-        logger.info(f"Transcription took {transcription_time:.2f} seconds")
-        st.info(f"🕒 Transcription took {transcription_time:.2f} seconds")
-
-        # --- Step 2: Report Generation ---
-        t3 = time.time()
-        with st.spinner("Step 2: Generating final report..."):
-            report = initialize_pipeline(transcription)
-            st.session_state.report = report
-        t4 = time.time()
-        report_time = t4 - t3
-        logger.info(f"Report generation took {report_time:.2f} seconds")
-        st.info(f"🕒 Report generation took {report_time:.2f} seconds")
-
-        # --- Total ---
-        total_time = time.time() - overall_start
-        logger.info(f"Total processing time: {total_time:.2f} seconds")
-        st.success(f"✅ Total processing time: {total_time:.2f} seconds")
-
-    finally:
-        os.unlink(file_path)
+    # --- Step 1: Transcription (with overlap, summarization runs alongside it) ---
+    t1 = time.time()
+    message = "Transcribing and summarizing in parallel..." if overlap else "Step 1: Transcribing audio..."
+    with st.spinner(message):
+        transcription = prepare_transcript(file_path, checkpoint, model_size=model_size, overlap=overlap)
+    st.session_state.transcript = transcription
+    t2 = time.time()
+    transcription_time = t2 - t1
+    logger.info(f"Transcription took {transcription_time:.2f} seconds")
+    st.info(f"🕒 Transcription took {transcription_time:.2f} seconds")
+
+    # --- Step 2: Report Generation (streamed as it is written) ---
+    t3 = time.time()
+    st.subheader("📊 Fact-Check Report")
+    tokens = _start_stream(stream_pipeline(transcription, checkpoint), "Step 2: Summarizing and fact-checking...")
+    report = st.write_stream(tokens)
+    st.session_state.report = report
+    st.session_state.report_streamed = True
+    t4 = time.time()
+    report_time = t4 - t3
+    logger.info(f"Report generation took {report_time:.2f} seconds")
+    st.info(f"🕒 Report generation took {report_time:.2f} seconds")
+
+    # --- Total ---
+    total_time = time.time() - overall_start
+    logger.info(f"Total processing time: {total_time:.2f} seconds")
+    st.success(f"✅ Total processing time: {total_time:.2f} seconds")
+
+def _start_stream(tokens, message):
+    """Wait for the first report token under a spinner, then hand the whole stream to st.write_stream."""
+    with st.spinner(message):
+        first = next(tokens, "")
+
+    def stream():
+        yield first
+        yield from tokens
+
+    return stream()
 
 # --- Handle Upload & Trigger Analysis ---
 if uploaded_file is not None:
@@ -108,17 +103,63 @@ if uploaded_file is not None:
     else:
         st.audio(uploaded_file)
 
-        with NamedTemporaryFile(delete=False, suffix=os.path.splitext(uploaded_file.name)[-1], dir="temp") as tmp_file:
-            tmp_file.write(uploaded_file.read())
-            file_path = tmp_file.name
-
         if st.button("🔍 Analyze Podcast"):
-            try:
-                process_podcast(file_path, model_size=model_size)
-            except Exception as e:
-                logger.exception("An error occurred during podcast processing")
-                st.error(f"❌ An error occurred: {e}")
-                os.unlink(file_path)
+            if background:
+                # A worker process picks the job up; this session only polls its status
+                pool = worker_pool()
+                pool.ensure_running()
+                st.session_state.job_id = pool.queue.submit(save_upload(uploaded_file), model_size=model_size, overlap=streaming, resume=resume)
+                st.session_state.transcript = st.session_state.report = None
+            else:
+                # Written only when analysis starts and always removed afterwards; progress lives in the run checkpoint
+                file_path = save_upload(uploaded_file, "temp")
+
+                try:
+                    checkpoint = RunCheckpoint.for_audio(file_path, model_size, resume=resume, mode=PIPELINE_MODE)
+                    if checkpoint.completed():
+                        st.info(f"♻️ Resuming run `{checkpoint.run_id}` (finished: {', '.join(checkpoint.completed())})")
+                    process_podcast(file_path, checkpoint, model_size=model_size, overlap=streaming)
+                except Exception as e:
+                    logger.exception("An error occurred during podcast processing")
+                    st.error(f"❌ An error occurred: {e}. Finished stages were saved; press Analyze again to resume.")
+                finally:
+                    if os.path.exists(file_path):
+                        os.unlink(file_path)
+
+# --- Background Job Status ---
+poll_job = False
+if st.session_state.get("job_id"):
+    pool = worker_pool()
+    job = pool.queue.get(st.session_state.job_id)
+    if job is None:
+        del st.session_state.job_id
+    elif job["status"] in ("queued", "running"):
+        poll_job = True
+        if job["status"] == "queued":
+            st.info(f"⏳ Job queued ({job['position']} ahead of it)")
+        else:
+            stage = job["stage"] or "starting"
+            st.info(f"⚙️ Job running ({stage}, {time.time() - job['started_at']:.0f}s elapsed)")
+        if job["report"]:
+            st.subheader("📊 Fact-Check Report (in progress)")
+            st.markdown(job["report"], unsafe_allow_html=True)
+
+        if job["cancel_requested"]:
+            st.warning("Cancellation requested; the job stops after its current stage.")
+            if st.button("⛔ Force stop"):
+                pool.cancel(job["id"], force=True)
+        elif st.button("✖️ Cancel job"):
+            pool.cancel(job["id"])
+    else:
+        del st.session_state.job_id
+        st.session_state.transcript = job["transcript"]
+        st.session_state.report = job["report"] if job["status"] == "done" else None
+        if job["status"] == "done":
+            st.success(f"✅ Total processing time: {job['finished_at'] - job['created_at']:.2f} seconds")
+        elif job["status"] == "cancelled":
+            st.warning("Job cancelled.")
+        else:
+            st.error(f"❌ An error occurred: {job['error']}. Finished stages were saved; press Analyze again to resume.")
 
 # --- Transcript Display ---
 if st.session_state.transcript:
@@ -127,8 +168,10 @@ if st.session_state.transcript:
 
 # --- Report Display ---
 if st.session_state.report:
-    st.subheader("📊 Fact-Check Report")
-    st.markdown(st.session_state.report, unsafe_allow_html=True)
+    # A report streamed during this run is already on the page
+    if not st.session_state.pop("report_streamed", False):
+        st.subheader("📊 Fact-Check Report")
+        st.markdown(st.session_state.report, unsafe_allow_html=True)
 
     st.download_button(
         "⬇️ Download Report",
@@ -138,10 +181,9 @@ if st.session_state.report:
 
 # --- Optional Log Viewer ---
 with st.expander("📜 View Recent Log Output"):
-    if os.path.exists(LOG_PATH):
-        with open(LOG_PATH) as f:
-            logs = f.readlines()[-20:]
-        st.text("".join(logs))
+    records = logging_setup.read_recent(limit=20)
+    if records:
+        st.text("\n".join(f"{r['ts']} - {r['logger']} - {r['level']} - {r['message']}" for r in records))
     else:
         st.info("No logs yet. Process a file to generate logs.")
 
@@ -152,3 +194,8 @@ if st.button("🔁 Rerun / Start Over"):
         del st.session_state[key]
     st.success("Session reset. Please upload a new podcast file to begin.")
     st.rerun()
+
+# --- Poll running jobs ---
+if poll_job:
+    time.sleep(POLL_INTERVAL)
+    st.rerun()
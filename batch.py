@@ -0,0 +1,210 @@
+"""
+Batch back-fill: transcribe and analyse every podcast in a directory or manifest.
+
+    python -m batch episodes/ --out reports/
+    python -m batch manifest.txt --transcribe-workers 2 --llm-workers 4
+
+Transcription runs in a process pool (one warm Whisper model per worker), the LLM stages in a
+bounded thread pool, and every stage is checkpointed per file, so rerunning the command skips
+finished episodes and resumes interrupted ones. One markdown report per file is written to the
+output directory, plus an `index.jsonl` with one line per processed file and a `metrics.prom`
+with the stage latency histograms (Prometheus text format).
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import config
+import tracing
+import logging_setup
+from checkpoints import RunCheckpoint
+from agents.transcript_cache import hash_audio
+
+logger = logging.getLogger("batch")
+
+# --- Batch Config ---
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".m4a")
+TRANSCRIBE_WORKERS = getattr(config, "BATCH_TRANSCRIBE_WORKERS", 2)
+LLM_WORKERS = getattr(config, "BATCH_LLM_WORKERS", 4)
+HASH_WORKERS = getattr(config, "BATCH_HASH_WORKERS", 4)  # files fingerprinted concurrently before scheduling
+
+# --- Inputs ---
+def collect_inputs(source: str) -> list[str]:
+    """Audio files under a directory, or the paths listed in a manifest (.txt lines or .jsonl with "path")."""
+    if os.path.isdir(source):
+        return sorted(
+            os.path.join(root, name)
+            for root, _, names in os.walk(source)
+            for name in names
+            if name.lower().endswith(AUDIO_EXTENSIONS)
+        )
+
+    base = os.path.dirname(os.path.abspath(source))
+    paths = []
+    with open(source, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            path = json.loads(line)["path"] if source.endswith(".jsonl") else line
+            paths.append(path if os.path.isabs(path) else os.path.join(base, path))
+    return paths
+
+def report_name(file_path: str, run_id: str) -> str:
+    # The run id keeps equally named episodes from different folders apart
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    return f"{stem}-{run_id[:8]}.md"
+
+# --- Transcription workers ---
+def _init_transcriber(cpu_threads: int, log_queue=None):
+    logging_setup.configure_logging(log_queue=log_queue)
+    # Cap CTranslate2 threads so N worker processes do not oversubscribe the cores
+    from agents.transcription import configure_cpu_threads
+    configure_cpu_threads(cpu_threads)
+
+def _transcribe(file_path: str, model_size: str) -> str:
+    from agents.transcription import transcribe_audio
+    return transcribe_audio(file_path, model_size=model_size, parallel=False)
+
+# --- Batch runner ---
+class BatchRunner:
+    def __init__(self, out_dir: str, model_size: str = "base", transcribe_workers: int = TRANSCRIBE_WORKERS,
+                 llm_workers: int = LLM_WORKERS, resume: bool = True):
+        self.out_dir = out_dir
+        self.model_size = model_size
+        self.transcribe_workers = transcribe_workers
+        self.llm_workers = llm_workers
+        self.resume = resume
+        self.index_path = os.path.join(out_dir, "index.jsonl")
+        self._index_lock = threading.Lock()
+        os.makedirs(out_dir, exist_ok=True)
+
+    def _record(self, entry: dict):
+        with self._index_lock, open(self.index_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def _write_report(self, file_path: str, checkpoint: RunCheckpoint, report: str) -> str:
+        path = os.path.join(self.out_dir, report_name(file_path, checkpoint.run_id))
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(report)
+        return path
+
+    def _analyse(self, file_path: str, checkpoint: RunCheckpoint, transcript: str, started: float) -> dict:
+        # Imported here rather than at module level so spawned transcription workers never load the LLM stack
+        from main import initialize_pipeline
+        entry = {"file": file_path, "run_id": checkpoint.run_id, "model_size": self.model_size}
+        try:
+            report = initialize_pipeline(transcript, checkpoint=checkpoint)
+            if report.startswith("Error:"):
+                raise RuntimeError(report)
+            entry.update(status="ok", report=self._write_report(file_path, checkpoint, report))
+        except Exception as e:
+            logger.error(f"[BATCH] Analysis failed for {file_path}: {e}")
+            entry.update(status="failed", error=str(e))
+        entry["seconds"] = round(time.time() - started, 2)
+        self._record(entry)
+        return entry
+
+    def run(self, files: list[str]) -> list[dict]:
+        from main import PIPELINE_MODE, is_valid_transcript
+        start = time.time()
+        results, to_transcribe, transcribed = [], [], []
+        # Hashing reads every file in full; hashlib releases the GIL, so threads overlap the reads
+        with ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="batch-hash") as hash_pool:
+            hashes = list(hash_pool.map(hash_audio, files))
+
+        first_by_hash = {}
+        for file_path, audio_hash in zip(files, hashes):
+            # Identical audio maps to one run directory; processing it twice would race on its checkpoints
+            if audio_hash in first_by_hash:
+                original = first_by_hash[audio_hash]
+                logger.info(f"[BATCH] Skipping {file_path}: same audio as {original[0]}")
+                entry = {"file": file_path, "run_id": original[1], "model_size": self.model_size, "status": "skipped", "duplicate_of": original[0]}
+                self._record(entry)
+                results.append(entry)
+                continue
+            checkpoint = RunCheckpoint.for_audio(file_path, self.model_size, resume=self.resume, mode=PIPELINE_MODE, audio_hash=audio_hash)
+            first_by_hash[audio_hash] = (file_path, checkpoint.run_id)
+            report = checkpoint.get("report")
+            if report is not None:
+                path = os.path.join(self.out_dir, report_name(file_path, checkpoint.run_id))
+                if not os.path.exists(path):
+                    self._write_report(file_path, checkpoint, report)
+                logger.info(f"[BATCH] Skipping {file_path}: already complete")
+                entry = {"file": file_path, "run_id": checkpoint.run_id, "model_size": self.model_size, "status": "skipped", "report": path}
+                self._record(entry)
+                results.append(entry)
+                continue
+            transcript = checkpoint.get("transcript")
+            if not is_valid_transcript(transcript):
+                to_transcribe.append((file_path, checkpoint))
+            else:
+                transcribed.append((file_path, checkpoint, transcript))
+
+        logger.info(f"[BATCH] {len(files)} files: {len(results)} skipped, {len(transcribed)} transcribed, {len(to_transcribe)} to transcribe")
+
+        # LLM stages start as soon as each transcript is ready, overlapping with remaining transcription
+        with ThreadPoolExecutor(max_workers=self.llm_workers, thread_name_prefix="batch-llm") as llm_pool:
+            analyses = [llm_pool.submit(self._analyse, f, c, t, time.time()) for f, c, t in transcribed]
+
+            if to_transcribe:
+                workers = min(self.transcribe_workers, len(to_transcribe))
+                cpu_threads = max(1, (os.cpu_count() or 1) // workers)
+                with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                         initializer=_init_transcriber, initargs=(cpu_threads, logging_setup.worker_queue())) as transcribe_pool:
+                    started = {transcribe_pool.submit(_transcribe, f, self.model_size): (f, c, time.time()) for f, c in to_transcribe}
+                    for future in as_completed(started):
+                        file_path, checkpoint, t0 = started[future]
+                        try:
+                            transcript = future.result()
+                        except Exception as e:
+                            logger.error(f"[BATCH] Transcription failed for {file_path}: {e}")
+                            checkpoint.fail("transcript", str(e))
+                            entry = {"file": file_path, "run_id": checkpoint.run_id, "model_size": self.model_size,
+                                     "status": "failed", "error": str(e), "seconds": round(time.time() - t0, 2)}
+                            self._record(entry)
+                            results.append(entry)
+                            continue
+                        # Invalid transcripts fail in analysis and are transcribed again on the next run
+                        if is_valid_transcript(transcript):
+                            checkpoint.save("transcript", transcript)
+                        analyses.append(llm_pool.submit(self._analyse, file_path, checkpoint, transcript, t0))
+
+            results.extend(f.result() for f in analyses)
+
+        counts = {status: sum(r["status"] == status for r in results) for status in ("ok", "skipped", "failed")}
+        logger.info(f"[BATCH] Done in {time.time() - start:.2f}s: {counts}")
+        # Stage latency histograms for this batch (transcription spans stay in the worker processes)
+        tracing.metrics.write(os.path.join(self.out_dir, "metrics.prom"))
+        return results
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m batch", description="Transcribe, fact-check and report on many podcast episodes.")
+    parser.add_argument("source", help="Directory of audio files, or a manifest (.txt with one path per line, or .jsonl with \"path\")")
+    parser.add_argument("--out", default="reports", help="Output directory for reports and index.jsonl")
+    parser.add_argument("--model-size", default="base", help="Whisper model size")
+    parser.add_argument("--transcribe-workers", type=int, default=TRANSCRIBE_WORKERS)
+    parser.add_argument("--llm-workers", type=int, default=LLM_WORKERS)
+    parser.add_argument("--no-resume", action="store_true", help="Discard existing checkpoints and reprocess every file")
+    args = parser.parse_args(argv)
+
+    logging_setup.configure_logging()
+    files = collect_inputs(args.source)
+    if not files:
+        print(f"No audio files found in {args.source}", file=sys.stderr)
+        return 1
+
+    runner = BatchRunner(args.out, args.model_size, args.transcribe_workers, args.llm_workers, resume=not args.no_resume)
+    results = runner.run(files)
+    failed = [r for r in results if r["status"] == "failed"]
+    print(f"{len(results) - len(failed)}/{len(results)} files done; reports in {args.out}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
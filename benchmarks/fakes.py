@@ -0,0 +1,217 @@
+"""
+Deterministic local stand-ins for the Cohere and Tavily clients.
+
+Responses are derived from the prompt alone and every call sleeps for a latency drawn from a
+`LatencyModel` seeded by (seed, prompt), so a benchmark run does the same work and waits the same
+total time no matter how requests interleave across threads.
+"""
+import re
+import json
+import time
+import random
+import asyncio
+import hashlib
+from contextlib import ExitStack, contextmanager
+from types import SimpleNamespace
+from typing import Any, Iterator, Optional
+from unittest.mock import patch
+
+import httpx
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from agents.chunker import approx_token_count, split_sentences
+
+# --- Latency ---
+class LatencyModel:
+    """
+    Per-request latency in seconds: `constant:<s>`, `uniform:<low>:<high>` or
+    `lognormal:<median>:<sigma>`, multiplied by `scale` (0 disables sleeping).
+    """
+
+    def __init__(self, spec: str = "constant:0", seed: int = 0, scale: float = 1.0):
+        kind, *params = spec.split(":")
+        if kind not in ("constant", "uniform", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+        self.spec = spec
+        self.kind = kind
+        self.params = [float(p) for p in params]
+        self.seed = seed
+        self.scale = scale
+
+    def sample(self, key: str) -> float:
+        rng = random.Random(hashlib.sha256(f"{self.seed}:{key}".encode("utf-8")).digest())
+        if self.kind == "constant":
+            value = self.params[0] if self.params else 0.0
+        elif self.kind == "uniform":
+            value = rng.uniform(*self.params)
+        else:
+            median, sigma = self.params
+            value = median * rng.lognormvariate(0.0, sigma)
+        return value * self.scale
+
+    def sleep(self, key: str):
+        delay = self.sample(key)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+# --- Canned responses ---
+def _body(prompt: str, marker: str) -> str:
+    # The part of the prompt after `marker` (e.g. the summary inside the claim extraction prompt)
+    return prompt.split(marker, 1)[-1] if marker in prompt else prompt
+
+def _first_tokens(text: str, max_tokens: int) -> str:
+    kept, tokens = [], 0
+    for sentence in split_sentences(text):
+        count = approx_token_count(sentence)
+        if kept and tokens + count > max_tokens:
+            break
+        kept.append(sentence)
+        tokens += count
+    return " ".join(kept)
+
+def summary_for(prompt: str, max_tokens: int) -> str:
+    """Leading sentences of the chunk, about a fifth of its length, so hierarchical reduce converges."""
+    text = _body(prompt, ":\n\n").rsplit("\n\nSummary:", 1)[0].rsplit("\n\nMerged Summary:", 1)[0]
+    return _first_tokens(text, min(max_tokens, max(20, approx_token_count(text) // 5)))
+
+def chat_response(prompt: str) -> str:
+    """Answer the prompts used by agents.claims and agents.reporter in the format they parse."""
+    if prompt.rstrip().endswith("JSON array:"):
+        limit = re.search(r"at most (\d+) claims", prompt)
+        summary = _body(prompt, "Summary:\n").rsplit("\n\nJSON array:", 1)[0]
+        claims = [s for s in split_sentences(summary) if len(s.split()) >= 4]
+        return json.dumps(claims[: int(limit.group(1)) if limit else 12])
+    if prompt.rstrip().endswith("JSON:") and "Claim:" in prompt:
+        claim = _body(prompt, "Claim:").split("\n", 1)[0].strip()
+        verdict = ("Factually Accurate", "Partially Accurate", "Inaccurate")[int(hashlib.sha256(claim.encode()).hexdigest(), 16) % 3]
+        return json.dumps({"verdict": verdict, "evidence": f"Benchmark evidence for: {claim[:80]}", "sources": ["example.org"]})
+    # The report prompt's few-shot examples have summaries too; the real one comes last
+    summary = prompt.rsplit("Summary:", 1)[-1].split("Fact Check Results:", 1)[0].strip()
+    return (
+        "### Podcast Fact-Check Report\n\n"
+        f"**Summary:** {_first_tokens(summary, 120)}\n\n"
+        "**Confirmed claims:** see fact-check results.\n\n"
+        "**Confidence level:** Medium\n\n"
+        "**Can the summary be trusted?** Partially."
+    )
+
+# --- Cohere SDK client (summarizer) ---
+class FakeCohereClient:
+    def __init__(self, api_key: Optional[str] = None, latency: Optional[LatencyModel] = None):
+        self.latency = latency or LatencyModel()
+
+    def chat(self, message: str, model: str = "command-light", temperature: float = 0.3, max_tokens: int = 300, **kwargs):
+        self.latency.sleep(message)
+        text = summary_for(message, max_tokens)
+        units = SimpleNamespace(input_tokens=approx_token_count(message), output_tokens=approx_token_count(text))
+        return SimpleNamespace(text=text, meta=SimpleNamespace(billed_units=units))
+
+# --- LangChain chat model (fact-checker, reporter) ---
+class FakeChatCohere(BaseChatModel):
+    model: str = "command-r"
+    latency: Any = None
+    token_delay: float = 0.0  # seconds between streamed tokens
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-cohere"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"model": self.model}
+
+    @staticmethod
+    def _prompt(messages) -> str:
+        return "\n".join(str(m.content) for m in messages)
+
+    def _usage(self, prompt: str, text: str) -> dict:
+        input_tokens, output_tokens = approx_token_count(prompt), approx_token_count(text)
+        return {"input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens}
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        prompt = self._prompt(messages)
+        (self.latency or LatencyModel()).sleep(prompt)
+        text = chat_response(prompt)
+        message = AIMessage(content=text, usage_metadata=self._usage(prompt, text))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        prompt = self._prompt(messages)
+        (self.latency or LatencyModel()).sleep(prompt)  # time to first token
+        words = re.findall(r"\S+\s*", chat_response(prompt))
+        for i, word in enumerate(words):
+            if i and self.token_delay:
+                time.sleep(self.token_delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word))
+            if run_manager:
+                run_manager.on_llm_new_token(word, chunk=chunk)
+            yield chunk
+
+# --- Tavily (threaded client and async HTTP endpoint) ---
+def search_answer(query: str) -> str:
+    return f"According to example.org, reports confirm: {query.strip()[:120]}"
+
+class FakeTavilyClient:
+    def __init__(self, api_key: Optional[str] = None, latency: Optional[LatencyModel] = None):
+        self.latency = latency or LatencyModel()
+
+    def search(self, query: str, include_answer: bool = True, max_results: int = 3, **kwargs) -> dict:
+        self.latency.sleep(query)
+        return {"query": query, "answer": search_answer(query), "results": []}
+
+def tavily_transport(latency: Optional[LatencyModel] = None) -> httpx.MockTransport:
+    """httpx transport answering Tavily search requests locally, for agents.async_search."""
+    latency = latency or LatencyModel()
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        query = json.loads(request.content)["query"]
+        delay = latency.sample(query)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return httpx.Response(200, json={"query": query, "answer": search_answer(query), "results": []})
+
+    return httpx.MockTransport(handle)
+
+@contextmanager
+def installed(llm_latency: LatencyModel, search_latency: LatencyModel, token_delay: float = 0.0):
+    """Point every agent at the fakes, with fresh in-memory caches, for the duration of the block."""
+    from langchain_core.globals import get_llm_cache, set_llm_cache
+    import cohere
+    from agents import async_search, cohere_summarizer, factchecker, llm_cache, reporter
+    from agents.langchain_cache import LangChainLLMCache
+    from agents.search_cache import SearchCache
+
+    # Fresh caches, so every run measures the uncached path unless a stage warms them itself
+    cache = llm_cache.LLMCache(llm_cache.MemoryBackend())
+    search_cache = SearchCache(llm_cache.LLMCache(llm_cache.MemoryBackend()))
+    engine = async_search.AsyncSearchEngine("benchmark", cache=search_cache)
+    engine._client = httpx.AsyncClient(transport=tavily_transport(search_latency))
+    report_llm = FakeChatCohere(model=reporter.REPORT_MODEL, latency=llm_latency, token_delay=token_delay)
+
+    previous_cache = get_llm_cache()
+    with ExitStack() as stack:
+        for target, name, value in [
+            (llm_cache, "_cache", cache),
+            # Thread backend, so worker CPU time and memory are counted in this process
+            (cohere, "Client", lambda api_key=None: FakeCohereClient(api_key, llm_latency)),
+            (cohere_summarizer, "_pool", cohere_summarizer.SummarizerPool(backend="thread")),
+            (factchecker, "_llm", FakeChatCohere(model="command-r", latency=llm_latency)),
+            (factchecker, "_tavily", FakeTavilyClient(latency=search_latency)),
+            (factchecker, "get_search_cache", lambda: search_cache),
+            (factchecker, "FACT_CHECK_MODE", "claims"),
+            (factchecker, "get_verdict_cache", lambda: None),
+            (factchecker, "local_evidence", lambda claims: {}),
+            (async_search, "_engine", engine),
+            (reporter, "_generator", reporter.ReportGenerator(llm=report_llm)),
+        ]:
+            stack.enter_context(patch.object(target, name, value))
+        set_llm_cache(LangChainLLMCache(cache))
+        try:
+            yield
+        finally:
+            set_llm_cache(previous_cache)
+            cohere_summarizer._pool.shutdown()
+            engine.close()
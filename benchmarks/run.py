@@ -0,0 +1,297 @@
+"""
+Per-stage benchmarks that run offline, with deterministic stand-ins for Cohere and Tavily.
+
+    python -m benchmarks.run                                     # every stage, 3 samples each
+    python -m benchmarks.run --stages summarize fact_check --repeat 5 --latency-scale 0.1
+    python -m benchmarks.run --baseline benchmarks/results/baseline.json
+
+Each sample runs in a fresh process, so peak RSS belongs to that stage alone, and records wall
+time, CPU time (all threads) and peak RSS. Transcription runs the real faster-whisper model on the
+bundled audio; the LLM stages use `benchmarks/data/starship_transcript.txt`. Results are written
+as JSON; with `--baseline`, stages that got slower or bigger than `--threshold` are listed and the
+command exits with status 1.
+"""
+import os
+import sys
+import json
+import glob
+import time
+import logging
+import platform
+import argparse
+import functools
+import statistics
+import multiprocessing
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, NamedTuple
+from unittest.mock import patch
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import logging_setup
+from benchmarks import fakes
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DEFAULT_AUDIO = sorted(glob.glob(os.path.join(project_root, "example_audio", "*.mp3"))) + [os.path.join(project_root, "elon_musk_starship_rocket.mp3")]
+TRANSCRIPT_PATH = os.path.join(os.path.dirname(__file__), "data", "starship_transcript.txt")
+DEFAULT_OUT = os.path.join(os.path.dirname(__file__), "results", "latest.json")
+METRICS = ("wall_seconds", "cpu_seconds", "peak_rss_mb")
+NOISE_FLOOR = {"wall_seconds": 0.05, "cpu_seconds": 0.05, "peak_rss_mb": 10.0}  # smaller differences are never regressions
+
+FACT_CHECK_INPUT = (
+    "Factually Accurate: Starship reached space — Benchmark evidence.\n"
+    "Inaccurate: The booster was caught by the launch tower — Benchmark evidence."
+)
+
+# --- Stages ---
+class Stage(NamedTuple):
+    name: str
+    func: Callable[[dict], dict]
+    warmup: bool = False  # run once unmeasured first, e.g. to time the cache-hit path
+    uses_fakes: bool = True
+
+def _summary_input(ctx: dict) -> str:
+    return fakes._first_tokens(ctx["transcript"], 300)
+
+def _transcribe(ctx: dict, audio: str) -> dict:
+    from agents.transcription import audio_duration, transcribe_audio
+    transcript = transcribe_audio(audio, model_size=ctx["model_size"], parallel=False, use_cache=False)
+    return {"audio_seconds": audio_duration(audio), "words": len(transcript.split())}
+
+def _chunk(ctx: dict) -> dict:
+    from agents.chunker import chunk_text
+    return {"chunks": len(chunk_text(ctx["transcript"]))}
+
+def _summarize(ctx: dict) -> dict:
+    from agents.cohere_summarizer import summarize_text
+    return {"summary_chars": len(summarize_text(ctx["transcript"]))}
+
+def _fact_check(ctx: dict, backend: str) -> dict:
+    from agents import factchecker
+    with patch.object(factchecker, "SEARCH_BACKEND", backend):
+        output = factchecker.fact_check(_summary_input(ctx))
+    if output.startswith("Error:"):
+        raise RuntimeError(output)
+    return {"verdicts": len(output.splitlines())}
+
+def _report(ctx: dict, stream: bool) -> dict:
+    from agents.reporter import generate_final_report, stream_final_report
+    if stream:
+        report = "".join(stream_final_report(_summary_input(ctx), FACT_CHECK_INPUT))
+    else:
+        report = generate_final_report(_summary_input(ctx), FACT_CHECK_INPUT)
+    return {"report_chars": len(report)}
+
+def _pipeline(ctx: dict, mode: str) -> dict:
+    import main
+    with patch.object(main, "build_pipeline", functools.partial(main.build_pipeline, mode)):
+        report = main.initialize_pipeline(ctx["transcript"])
+    if report.startswith("Error:"):
+        raise RuntimeError(report)
+    return {"report_chars": len(report)}
+
+def build_stages(audio_files: list[str]) -> dict[str, Stage]:
+    stages = [Stage(f"transcribe[{os.path.basename(a)}]", functools.partial(_transcribe, audio=a), uses_fakes=False) for a in audio_files]
+    stages += [
+        Stage("chunk", _chunk, uses_fakes=False),
+        Stage("summarize", _summarize),
+        Stage("summarize[cached]", _summarize, warmup=True),
+        Stage("fact_check[async]", functools.partial(_fact_check, backend="async")),
+        Stage("fact_check[thread]", functools.partial(_fact_check, backend="thread")),
+        Stage("fact_check[cached]", functools.partial(_fact_check, backend="async"), warmup=True),
+        Stage("report", functools.partial(_report, stream=False)),
+        Stage("report[stream]", functools.partial(_report, stream=True)),
+        Stage("pipeline[sequential]", functools.partial(_pipeline, mode="sequential")),
+        Stage("pipeline[overlap]", functools.partial(_pipeline, mode="overlap")),
+    ]
+    return {stage.name: stage for stage in stages}
+
+def select(stages: dict[str, Stage], patterns) -> list[Stage]:
+    """Stages whose name equals a pattern or starts with `<pattern>[`; all of them without patterns."""
+    if not patterns:
+        return list(stages.values())
+    return [s for name, s in stages.items() if any(name == p or name.startswith(f"{p}[") for p in patterns)]
+
+# --- Measurement ---
+def _rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KiB elsewhere
+
+def measure(name: str, ctx: dict, options: dict) -> dict:
+    """One sample of one stage in the current process."""
+    stage = build_stages(ctx["audio_files"])[name]
+    llm_latency = fakes.LatencyModel(options["llm_latency"], options["seed"], options["latency_scale"])
+    search_latency = fakes.LatencyModel(options["search_latency"], options["seed"], options["latency_scale"])
+    installed = fakes.installed(llm_latency, search_latency, options["token_delay"]) if stage.uses_fakes else nullcontext()
+    previous_disable = logging.root.manager.disable
+    if options.get("verbose"):
+        logging_setup.configure_logging()
+    else:
+        logging.disable(logging.INFO)
+    try:
+        with installed:
+            if stage.warmup:
+                stage.func(ctx)
+            start_rss = _rss_mb()
+            cpu, wall = time.process_time(), time.perf_counter()
+            info = stage.func(ctx) or {}
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+    finally:
+        logging.disable(previous_disable)
+    sample = {"wall_seconds": wall, "cpu_seconds": cpu, "peak_rss_mb": _peak_rss_mb(), "start_rss_mb": start_rss, **info}
+    if info.get("audio_seconds"):
+        sample["realtime_factor"] = info["audio_seconds"] / wall  # audio seconds per wall second
+    return sample
+
+def _aggregate(samples: list[dict]) -> dict:
+    ok = [s for s in samples if "error" not in s]
+    if not ok:
+        return {"error": samples[-1]["error"], "samples": samples}
+    result = {key: value for key, value in ok[-1].items() if key not in METRICS and key != "start_rss_mb"}
+    for metric in ("wall_seconds", "cpu_seconds"):
+        values = [s[metric] for s in ok]
+        result[metric] = statistics.median(values)
+        result[f"{metric}_min"] = min(values)
+    peaks = [s["peak_rss_mb"] for s in ok if s["peak_rss_mb"] is not None]
+    result["peak_rss_mb"] = max(peaks) if peaks else None
+    if "realtime_factor" in result:
+        result["realtime_factor"] = statistics.median(s["realtime_factor"] for s in ok)
+    result["samples"] = samples
+    return result
+
+def run(stages: list[Stage], ctx: dict, options: dict, repeat: int = 3, isolate: bool = True) -> dict:
+    results = {}
+    for stage in stages:
+        samples = []
+        for _ in range(repeat):
+            if isolate:
+                # Fresh process per sample: peak RSS and warm caches never leak between stages
+                with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                    samples.append(pool.submit(measure, stage.name, ctx, options).result())
+            else:
+                samples.append(measure(stage.name, ctx, options))
+            if "error" in samples[-1]:
+                break  # failures (e.g. no Whisper model offline) are deterministic; do not repeat them
+        results[stage.name] = _aggregate(samples)
+        print(_format_stage(stage.name, results[stage.name]), flush=True)
+    return results
+
+def host_info() -> dict:
+    return {
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+    }
+
+# --- Baseline comparison ---
+def compare(current: dict, baseline: dict, threshold: float = 0.15) -> list[dict]:
+    """One row per stage and metric present in both runs; `regression` marks growth beyond `threshold`."""
+    rows = []
+    for name, stage in current["stages"].items():
+        base = baseline.get("stages", {}).get(name)
+        if base is None or "error" in stage or "error" in base:
+            continue
+        for metric in METRICS:
+            new, old = stage.get(metric), base.get(metric)
+            if new is None or not old:
+                continue
+            ratio = new / old
+            rows.append({
+                "stage": name, "metric": metric, "baseline": old, "current": new, "ratio": ratio,
+                "regression": ratio > 1 + threshold and new - old > NOISE_FLOOR[metric],
+            })
+    return rows
+
+def _format_stage(name: str, result: dict) -> str:
+    if "error" in result:
+        return f"{name:<28} ERROR {result['error'].splitlines()[0]}"
+    peak = f"{result['peak_rss_mb']:.0f} MB" if result.get("peak_rss_mb") is not None else "n/a"
+    line = f"{name:<28} wall {result['wall_seconds']:8.3f}s  cpu {result['cpu_seconds']:8.3f}s  peak RSS {peak}"
+    if "realtime_factor" in result:
+        line += f"  {result['realtime_factor']:.1f}x realtime"
+    return line
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description="Offline per-stage benchmarks with fake LLM and search clients.")
+    parser.add_argument("--stages", nargs="*", help="Stage names or families (e.g. `fact_check` for every fact_check[...] stage); default all")
+    parser.add_argument("--list", action="store_true", help="List the stages and exit")
+    parser.add_argument("--repeat", type=int, default=3, help="Samples per stage (the median is reported)")
+    parser.add_argument("--out", default=DEFAULT_OUT, help="Results JSON")
+    parser.add_argument("--baseline", help="Results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Relative growth reported as a regression")
+    parser.add_argument("--llm-latency", default="lognormal:0.8:0.35", help="constant:S | uniform:LOW:HIGH | lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--search-latency", default="lognormal:0.6:0.5")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiplier for all simulated latencies (0 = no sleeping)")
+    parser.add_argument("--token-delay", type=float, default=0.01, help="Seconds between streamed report tokens")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--audio", nargs="*", default=DEFAULT_AUDIO, help="Audio files for the transcription stages")
+    parser.add_argument("--skip-transcription", action="store_true")
+    parser.add_argument("--model-size", default="base", help="Whisper model size")
+    parser.add_argument("--transcript-repeat", type=int, default=4, help="Repeat the sample transcript to simulate a longer episode")
+    parser.add_argument("--in-process", action="store_true", help="Run every sample in this process (faster; peak RSS becomes cumulative)")
+    parser.add_argument("--verbose", action="store_true", help="Keep INFO logging from the agents")
+    args = parser.parse_args(argv)
+
+    audio_files = [] if args.skip_transcription else [a for a in args.audio if os.path.exists(a)]
+    stages = build_stages(audio_files)
+    if args.list:
+        print("\n".join(stages))
+        return 0
+    selected = select(stages, args.stages)
+    if not selected:
+        print(f"No stages match {args.stages}; see --list", file=sys.stderr)
+        return 1
+
+    with open(TRANSCRIPT_PATH, encoding="utf-8") as f:
+        transcript = " ".join([f.read().strip()] * args.transcript_repeat)
+    ctx = {"transcript": transcript, "audio_files": audio_files, "model_size": args.model_size}
+    options = {
+        "llm_latency": args.llm_latency, "search_latency": args.search_latency, "latency_scale": args.latency_scale,
+        "token_delay": args.token_delay * args.latency_scale, "seed": args.seed, "verbose": args.verbose,
+    }
+
+    results = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "host": host_info(),
+        "settings": {**options, "repeat": args.repeat, "model_size": args.model_size,
+                     "transcript_words": len(transcript.split()), "isolated": not args.in_process},
+        "stages": run(selected, ctx, options, repeat=args.repeat, isolate=not args.in_process),
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.out}")
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("host") != results["host"]:
+        print("Warning: baseline was recorded on a different host; compare with care.")
+    rows = compare(results, baseline, args.threshold)
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        print(f"{row['stage']:<28} {row['metric']:<13} {row['baseline']:10.3f} -> {row['current']:10.3f} ({row['ratio']:.2f}x) {flag}")
+    regressions = [r for r in rows if r["regression"]]
+    print(f"{len(regressions)} regression(s) against {args.baseline}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+import os
+import json
+import time
+import shutil
+import logging
+import threading
+from typing import Optional
+
+import config
+from agents.transcript_cache import hash_audio
+
+logger = logging.getLogger(__name__)
+
+# --- Checkpoint Config ---
+project_root = os.path.abspath(os.path.dirname(__file__))
+RUNS_DIR = getattr(config, "RUNS_DIR", os.path.join(project_root, "runs"))
+
+class RunCheckpoint:
+    """
+    Persists each pipeline stage's output in a run directory (`<stage>.json`, written atomically)
+    plus a `manifest.json` recording which stages finished and when. Reopening the same run
+    restores finished stages so only the remaining ones are recomputed.
+    """
+
+    def __init__(self, run_dir: str, run_id: str, audio_hash: str = ""):
+        self.run_dir = run_dir
+        self.run_id = run_id
+        self._lock = threading.Lock()
+        os.makedirs(run_dir, exist_ok=True)
+        self.manifest_path = os.path.join(run_dir, "manifest.json")
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError):
+            self.manifest = {"run_id": run_id, "audio_hash": audio_hash, "created_at": time.time(), "stages": {}}
+            self._write_json(self.manifest_path, self.manifest)
+
+    @classmethod
+    def for_audio(cls, file_path: str, model_size: str, resume: bool = True, runs_dir: Optional[str] = None,
+                  mode: str = "sequential", audio_hash: Optional[str] = None) -> "RunCheckpoint":
+        """
+        Run keyed by the audio content, Whisper model and pipeline mode, so re-uploading the same
+        file resumes it. The modes produce different `fact_check` outputs and must not share them.
+        Pass `audio_hash` when the file has already been hashed.
+        """
+        audio_hash = audio_hash or hash_audio(file_path)
+        run_id = f"{audio_hash[:16]}-{model_size}-{mode}"
+        run_dir = os.path.join(runs_dir or RUNS_DIR, run_id)
+        if not resume and os.path.isdir(run_dir):
+            shutil.rmtree(run_dir)
+        run = cls(run_dir, run_id, audio_hash)
+        if run.completed():
+            logger.info(f"[CHECKPOINT] Resuming run {run_id}; finished stages: {', '.join(run.completed())}")
+        return run
+
+    @staticmethod
+    def _write_json(path: str, value):
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(value, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def _path(self, stage: str) -> str:
+        return os.path.join(self.run_dir, f"{stage}.json")
+
+    def has(self, stage: str) -> bool:
+        return self.manifest["stages"].get(stage, {}).get("status") == "done" and os.path.exists(self._path(stage))
+
+    def load(self, stage: str):
+        with open(self._path(stage), encoding="utf-8") as f:
+            return json.load(f)
+
+    def get(self, stage: str, default=None):
+        return self.load(stage) if self.has(stage) else default
+
+    def save(self, stage: str, value):
+        # Output first, manifest second: a crash in between leaves the stage unfinished
+        self._write_json(self._path(stage), value)
+        with self._lock:
+            self.manifest["stages"][stage] = {"status": "done", "finished_at": time.time()}
+            self._write_json(self.manifest_path, self.manifest)
+
+    def fail(self, stage: str, error: str):
+        with self._lock:
+            self.manifest["stages"][stage] = {"status": "failed", "error": error, "failed_at": time.time()}
+            self._write_json(self.manifest_path, self.manifest)
+
+    def completed(self) -> list[str]:
+        return [stage for stage in self.manifest["stages"] if self.has(stage)]
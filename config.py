@@ -0,0 +1,2 @@
+COHERE_API_KEY = "dummy"
+TAVILY_API_KEY = "dummy"
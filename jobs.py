@@ -0,0 +1,277 @@
+import os
+import json
+import time
+import uuid
+import atexit
+import shutil
+import sqlite3
+import logging
+import threading
+import multiprocessing
+from typing import Optional
+
+import config
+import logging_setup
+
+logger = logging.getLogger(__name__)
+
+# --- Job Queue Config ---
+project_root = os.path.abspath(os.path.dirname(__file__))
+JOBS_DB_PATH = getattr(config, "JOBS_DB_PATH", os.path.join(project_root, "cache", "jobs.sqlite"))
+UPLOAD_DIR = getattr(config, "JOBS_UPLOAD_DIR", os.path.join(project_root, "temp", "jobs"))
+MAX_CONCURRENT_JOBS = getattr(config, "JOBS_MAX_CONCURRENT", 2)
+POLL_INTERVAL = getattr(config, "JOBS_POLL_INTERVAL", 1.0)  # seconds
+UPLOAD_CHUNK_BYTES = getattr(config, "UPLOAD_CHUNK_BYTES", 1024 * 1024)
+PARTIAL_FLUSH_SECONDS = 0.5  # how often a streaming report is written back for the UI
+
+ACTIVE = ("queued", "running")
+TERMINAL = ("done", "failed", "cancelled")
+
+class JobCancelled(Exception):
+    pass
+
+# --- Queue ---
+class JobQueue:
+    """
+    SQLite-backed job table shared by the UI and worker processes (WAL mode, so readers never
+    block the writer). Claiming is a single UPDATE ... RETURNING, so two workers can never take
+    the same job.
+    """
+
+    def __init__(self, path: str = JOBS_DB_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, file_path TEXT, options TEXT, status TEXT, stage TEXT, "
+                "transcript TEXT, report TEXT, error TEXT, worker TEXT, cancel_requested INTEGER DEFAULT 0, "
+                "created_at REAL, started_at REAL, finished_at REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+
+    def _execute(self, sql: str, params=()):
+        with self._lock, self._conn:
+            return self._conn.execute(sql, params).fetchall()
+
+    def submit(self, file_path: str, model_size: str = "base", overlap: bool = False, resume: bool = True) -> str:
+        job_id = uuid.uuid4().hex
+        options = json.dumps({"model_size": model_size, "overlap": overlap, "resume": resume})
+        self._execute(
+            "INSERT INTO jobs (id, file_path, options, status, created_at) VALUES (?, ?, ?, 'queued', ?)",
+            (job_id, file_path, options, time.time()),
+        )
+        logger.info(f"[JOBS] Queued {job_id} for {file_path}")
+        return job_id
+
+    def get(self, job_id: str) -> Optional[dict]:
+        rows = self._execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        if not rows:
+            return None
+        job = dict(rows[0])
+        job["options"] = json.loads(job["options"])
+        if job["status"] == "queued":
+            job["position"] = self._execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND created_at < ?", (job["created_at"],)
+            )[0][0]
+        return job
+
+    def claim(self, worker: str) -> Optional[dict]:
+        rows = self._execute(
+            "UPDATE jobs SET status = 'running', worker = ?, started_at = ? "
+            "WHERE id = (SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1) RETURNING *",
+            (worker, time.time()),
+        )
+        if not rows:
+            return None
+        job = dict(rows[0])
+        job["options"] = json.loads(job["options"])
+        return job
+
+    def update(self, job_id: str, **fields):
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        self._execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def finish(self, job_id: str, status: str, **fields):
+        self.update(job_id, status=status, finished_at=time.time(), **fields)
+        logger.info(f"[JOBS] {job_id} {status}")
+
+    def cancel(self, job_id: str) -> bool:
+        """Queued jobs are cancelled at once; running jobs stop at their next stage boundary."""
+        if self._execute("UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE id = ? AND status = 'queued' RETURNING id",
+                         (time.time(), job_id)):
+            return True
+        return bool(self._execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running' RETURNING id", (job_id,)))
+
+    def cancel_requested(self, job_id: str) -> bool:
+        rows = self._execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,))
+        return bool(rows and rows[0][0])
+
+    def requeue_orphans(self, live_workers: set) -> int:
+        """Put jobs whose worker died back in the queue; they resume from their checkpoints."""
+        rows = self._execute("SELECT id, worker FROM jobs WHERE status = 'running'")
+        orphans = [job_id for job_id, worker in rows if worker not in live_workers]
+        for job_id in orphans:
+            self._execute("UPDATE jobs SET status = 'queued', worker = NULL WHERE id = ? AND status = 'running'", (job_id,))
+            logger.warning(f"[JOBS] Requeued {job_id} after its worker exited")
+        return len(orphans)
+
+# --- Job execution ---
+class _JobCheckpoint:
+    """Run checkpoint that records stage progress on the job and stops the run once cancelled."""
+
+    def __init__(self, checkpoint, queue: JobQueue, job_id: str):
+        self._checkpoint = checkpoint
+        self._queue = queue
+        self._job_id = job_id
+
+    def __getattr__(self, name):
+        return getattr(self._checkpoint, name)
+
+    def save(self, stage: str, value):
+        self._checkpoint.save(stage, value)
+        self._queue.update(self._job_id, stage=stage)
+        if self._queue.cancel_requested(self._job_id):
+            raise JobCancelled(f"Cancelled after {stage}")
+
+def run_job(queue: JobQueue, job: dict):
+    from checkpoints import RunCheckpoint
+    from main import PIPELINE_MODE, prepare_transcript, stream_pipeline, trace_run
+
+    job_id, file_path, options = job["id"], job["file_path"], job["options"]
+    try:
+        checkpoint = _JobCheckpoint(RunCheckpoint.for_audio(file_path, options["model_size"], resume=options["resume"], mode=PIPELINE_MODE), queue, job_id)
+        with trace_run("job", checkpoint, job_id=job_id, model=options["model_size"]):
+            queue.update(job_id, stage="transcribing")
+            transcript = prepare_transcript(file_path, checkpoint, options["model_size"], overlap=options["overlap"])
+            queue.update(job_id, transcript=transcript)
+
+            # The report is written back as it streams, so the UI can show it while it is generated
+            parts, flushed = [], time.time()
+            for token in stream_pipeline(transcript, checkpoint):
+                parts.append(token)
+                if time.time() - flushed >= PARTIAL_FLUSH_SECONDS:
+                    queue.update(job_id, report="".join(parts))
+                    flushed = time.time()
+                    if queue.cancel_requested(job_id):
+                        raise JobCancelled("Cancelled during report generation")
+            report = "".join(parts)
+
+        if report.startswith("Error:"):
+            queue.finish(job_id, "failed", report=None, error=report)
+        else:
+            queue.finish(job_id, "done", report=report, stage="report")
+    except JobCancelled as e:
+        queue.finish(job_id, "cancelled", error=str(e))
+    except Exception as e:
+        logger.exception(f"[JOBS] {job_id} failed")
+        queue.finish(job_id, "failed", error=str(e))
+    finally:
+        # Stage outputs are checkpointed by audio hash, so re-uploading the same file resumes a failed run
+        _remove_upload(file_path)
+
+def _remove_upload(file_path: str):
+    try:
+        os.unlink(file_path)
+    except FileNotFoundError:
+        pass
+
+def worker_main(db_path: str, cpu_threads: int, poll_interval: float = POLL_INTERVAL):
+    """Worker process loop; the Whisper model and LLM clients stay warm across jobs."""
+    # Own writers rather than the UI's worker_queue(): a force-cancelled worker is terminated,
+    # which can leave a shared multiprocessing queue corrupted. Each worker gets its own file, since
+    # several processes rotating the shared LOG_PATH would rename it out from under each other.
+    logging_setup.configure_logging(path=os.path.join(logging_setup.LOG_DIR, f"worker-{os.getpid()}.jsonl"))
+    from agents.transcription import configure_cpu_threads
+    configure_cpu_threads(cpu_threads)
+    queue = JobQueue(db_path)
+    worker = str(os.getpid())
+    logger.info(f"[JOBS] Worker {worker} started ({cpu_threads} threads)")
+    while True:
+        job = queue.claim(worker)
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+        run_job(queue, job)
+
+# --- Worker pool (owned by the UI process) ---
+class WorkerPool:
+    """
+    Keeps `size` worker processes running; `size` is the admission limit on concurrently running
+    jobs, and each worker gets an equal share of the cores for transcription.
+    """
+
+    def __init__(self, db_path: str = JOBS_DB_PATH, size: int = MAX_CONCURRENT_JOBS):
+        self.db_path = db_path
+        self.size = size
+        self.queue = JobQueue(db_path)
+        self.cpu_threads = max(1, (os.cpu_count() or 1) // size)
+        self._context = multiprocessing.get_context("spawn")
+        self._processes = []
+        self._lock = threading.Lock()
+
+    def _spawn(self):
+        process = self._context.Process(target=worker_main, args=(self.db_path, self.cpu_threads), daemon=True, name="job-worker")
+        process.start()
+        return process
+
+    def ensure_running(self):
+        with self._lock:
+            self._processes = [p for p in self._processes if p.is_alive()]
+            self.queue.requeue_orphans({str(p.pid) for p in self._processes})
+            while len(self._processes) < self.size:
+                self._processes.append(self._spawn())
+
+    def cancel(self, job_id: str, force: bool = False) -> bool:
+        """Request cancellation; with `force`, a running job's worker is killed and replaced."""
+        requested = self.queue.cancel(job_id)
+        job = self.queue.get(job_id)
+        if force and job is not None and job["status"] == "running":
+            with self._lock:
+                for process in self._processes:
+                    if str(process.pid) == job["worker"]:
+                        process.terminate()
+                        process.join(timeout=5)
+                self.queue.finish(job_id, "cancelled", error="Force-stopped")
+            _remove_upload(job["file_path"])
+            self.ensure_running()
+            return True
+        if job is not None and job["status"] == "cancelled":
+            _remove_upload(job["file_path"])  # cancelled while queued, so no worker will remove it
+        return requested
+
+    def shutdown(self):
+        with self._lock:
+            for process in self._processes:
+                process.terminate()
+            for process in self._processes:
+                process.join(timeout=5)
+            self._processes = []
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_worker_pool() -> WorkerPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WorkerPool()
+            atexit.register(_pool.shutdown)
+        _pool.ensure_running()
+        return _pool
+
+def save_upload(uploaded_file, upload_dir: str = UPLOAD_DIR) -> str:
+    """
+    Persist an upload for a worker (or the inline run) to pick up. The file is copied in
+    fixed-size chunks, so saving never holds a second full copy of the episode in memory.
+    """
+    os.makedirs(upload_dir, exist_ok=True)
+    path = os.path.join(upload_dir, f"{uuid.uuid4().hex}{os.path.splitext(uploaded_file.name)[-1]}")
+    uploaded_file.seek(0)
+    with open(path, "wb") as f:
+        shutil.copyfileobj(uploaded_file, f, UPLOAD_CHUNK_BYTES)
+    return path
@@ -0,0 +1,210 @@
+"""
+Process-wide logging shared by every module.
+
+    import logging_setup
+    logging_setup.configure_logging()          # once, in the entry point (main, app, batch, workers)
+    logger = logging.getLogger(__name__)       # everywhere else, as before
+
+Threads that log only enqueue: a `QueueHandler` on the root logger resolves the message and hands
+the record to a queue, and one `QueueListener` thread formats it and does the file and console
+writes. The file gets one JSON object per line (with the current trace and span
+ids); the console gets plain text. High-volume per-query messages are sampled by their `[TAG]`
+prefix (`LOG_SAMPLE_RATES`); warnings and errors are always kept.
+
+Spawned worker processes pass `worker_queue()` to `configure_logging(log_queue=...)`, so their
+records are written by the parent's listener instead of racing it on the same file.
+"""
+import os
+import sys
+import copy
+import json
+import queue
+import atexit
+import logging
+import threading
+import multiprocessing
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, List, Optional
+
+import config
+import tracing
+
+# --- Config ---
+project_root = os.path.dirname(os.path.abspath(__file__))
+LOG_DIR = getattr(config, "LOG_DIR", os.path.join(project_root, "logs"))
+LOG_PATH = getattr(config, "LOG_PATH", os.path.join(LOG_DIR, "podcast.jsonl"))
+LOG_LEVEL = getattr(config, "LOG_LEVEL", "INFO")
+LOG_CONSOLE = getattr(config, "LOG_CONSOLE", True)
+LOG_MAX_BYTES = getattr(config, "LOG_MAX_BYTES", 5_000_000)
+LOG_BACKUP_COUNT = getattr(config, "LOG_BACKUP_COUNT", 2)
+# Fraction of INFO/DEBUG records kept per message prefix (1.0 keeps all, 0 drops all)
+LOG_SAMPLE_RATES = getattr(config, "LOG_SAMPLE_RATES", {
+    "[SEARCH]": 0.1, "[RESULT]": 0.1, "[CACHE] Search hit": 0.1, "[CACHE] Search coalesced": 0.1,
+})
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Attributes every LogRecord has; anything else was passed through `extra=` and goes into the JSON
+_STANDARD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+# --- Formatting ---
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, process/thread, trace ids and `extra` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "process": record.process,
+            "thread": record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_FIELDS and value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+# --- Sampling ---
+class SampleFilter(logging.Filter):
+    """
+    Keeps every n-th INFO/DEBUG record whose message starts with a sampled prefix (n = 1/rate, so
+    the first one always gets through). Kept records carry `sample_rate` so readers can scale counts.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = dict(rates)
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not isinstance(record.msg, str):
+            return True
+        for prefix, rate in self.rates.items():
+            if not record.msg.startswith(prefix):
+                continue
+            if rate >= 1:
+                return True
+            if rate <= 0:
+                return False
+            with self._lock:
+                count = self._counts[prefix] = self._counts.get(prefix, 0) + 1
+            if (count - 1) % max(1, round(1 / rate)):
+                return False
+            record.sample_rate = rate
+            return True
+        return True
+
+# --- Enqueueing ---
+class _TracingQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve everything that depends on the calling thread (message args, traceback, current
+        # span) before the record crosses to the listener thread or another process
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        span = tracing.current_span()
+        if span is not None and not hasattr(record, "trace_id"):
+            record.trace_id, record.span_id = span.trace_id, span.span_id
+        return record
+
+# --- Process-wide setup ---
+_lock = threading.Lock()
+_handler = None
+_writers = []
+_listeners = []
+_worker_queue = None
+
+def _build_writers(path: Optional[str], console: bool) -> List[logging.Handler]:
+    writers = []
+    if path:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        file_handler = RotatingFileHandler(path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8")
+        file_handler.setFormatter(JsonFormatter())
+        writers.append(file_handler)
+    if console:
+        stream_handler = logging.StreamHandler(stream=sys.stdout)
+        stream_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        writers.append(stream_handler)
+    return writers
+
+def configure_logging(level=LOG_LEVEL, path: Optional[str] = LOG_PATH, console: bool = LOG_CONSOLE,
+                      sample_rates: Optional[Dict[str, float]] = None, log_queue=None):
+    """
+    Route the root logger through a queue. Without `log_queue` this process owns the writers (a
+    listener thread writing to `path` and the console); with one (from the parent's `worker_queue()`)
+    records are forwarded to the parent. Calling it again is a no-op until `shutdown_logging()`.
+    """
+    global _handler
+    with _lock:
+        if _handler is not None:
+            return
+        if log_queue is None:
+            log_queue = queue.SimpleQueue()
+            _writers.extend(_build_writers(path, console))
+            listener = QueueListener(log_queue, *_writers, respect_handler_level=True)
+            listener.start()
+            _listeners.append(listener)
+        _handler = _TracingQueueHandler(log_queue)
+        _handler.addFilter(SampleFilter(LOG_SAMPLE_RATES if sample_rates is None else sample_rates))
+        root = logging.getLogger()
+        root.addHandler(_handler)
+        root.setLevel(level)
+        atexit.register(shutdown_logging)
+
+def worker_queue():
+    """
+    Queue for spawned worker processes (pass it through the process args or pool initializer);
+    their records are written by this process. None when this process does not own the writers,
+    in which case workers configure their own.
+    """
+    global _worker_queue
+    with _lock:
+        if not _writers:
+            return None
+        if _worker_queue is None:
+            _worker_queue = multiprocessing.get_context("spawn").Queue()
+            listener = QueueListener(_worker_queue, *_writers, respect_handler_level=True)
+            listener.start()
+            _listeners.append(listener)
+        return _worker_queue
+
+def shutdown_logging():
+    """Flush queued records, stop the listeners and detach from the root logger."""
+    global _handler, _worker_queue
+    with _lock:
+        if _handler is not None:
+            logging.getLogger().removeHandler(_handler)
+            _handler = None
+        for listener in _listeners:
+            listener.stop()  # drains the queue first
+        for writer in _writers:
+            writer.close()
+        if _worker_queue is not None:
+            _worker_queue.close()
+        _listeners.clear()
+        _writers.clear()
+        _worker_queue = None
+
+def read_recent(path: str = LOG_PATH, limit: int = 20) -> List[dict]:
+    """The last `limit` records of a JSON log file, oldest first."""
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        lines = f.readlines()[-limit:]
+    records = []
+    for line in lines:
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return records
@@ -1,82 +1,210 @@
-#from agents.transcription import transcribe_podcast
-from agents.cohere_summarizer import summarize_text
+from agents.transcription import iter_transcript, transcribe_audio
+from agents.cohere_summarizer import summarize_text, summarize_stream
 from agents.factchecker import fact_check
-from agents.reporter import generate_final_report
-
-from langchain.agents import Tool
-#from langchain_cohere import ChatCohere
-import time, os, sys
+from agents.reporter import generate_final_report, stream_final_report
+from agents.llm_cache import get_cache
+from agents.chunker import chunk_text
+from pipeline import Node, Pipeline
+from checkpoints import RunCheckpoint
+import tracing
+import logging_setup
+import config
+
+import time, os
 import logging
-from logging.handlers import RotatingFileHandler
-
 
-# --- Logging ---
-LOG_DIR = os.path.join(os.path.dirname(__file__), "logs")
-os.makedirs(LOG_DIR, exist_ok=True)
-LOG_PATH = os.path.join(LOG_DIR, "main.log")
 
-# Get a logger specific to this module
+# --- Logging (one queue-backed setup for the whole process, see logging_setup) ---
+logging_setup.configure_logging()
+LOG_PATH = logging_setup.LOG_PATH
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO) # Set the minimum logging level for this logger
-
-# Check if handlers are already attached to prevent duplicate logs
-# This is crucial in environments where the script might be reloaded (e.g., Streamlit)
-if not logger.handlers:
-    # Create a file handler for logging to a file
-    file_handler = RotatingFileHandler(LOG_PATH, maxBytes=5_000_000, backupCount=2, encoding="utf-8")
-    file_handler.setLevel(logging.INFO) # Set level for file output
-
-    # Create a stream handler for logging to console (sys.stdout)
-    stream_handler = logging.StreamHandler(stream=sys.stdout)
-    stream_handler.setLevel(logging.INFO) # Set level for console output
-    # Ensure console output also uses UTF-8, even without emojis, for broader compatibility
-    stream_handler.stream.reconfigure(encoding='utf-8')
-
-    # Define the log format
-    formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-
-    # Apply the formatter to both handlers
-    file_handler.setFormatter(formatter)
-    stream_handler.setFormatter(formatter)
 
-    # Add the handlers to the logger
-    logger.addHandler(file_handler)
-    logger.addHandler(stream_handler)
-
-def initialize_pipeline (podcast_transcript):
+# --- Pipeline Config ---
+PIPELINE_MODE = getattr(config, "PIPELINE_MODE", "sequential")  # sequential | overlap
+FACT_CHECK_CHUNK_TOKENS = getattr(config, "PIPELINE_FACT_CHECK_CHUNK_TOKENS", 1500)
+FACT_CHECK_WORKERS = getattr(config, "PIPELINE_FACT_CHECK_WORKERS", 3)
+STAGE_TIMEOUT = getattr(config, "PIPELINE_STAGE_TIMEOUT", None)  # seconds per stage, None = no limit
+
+def _chunk_transcript(transcript):
+    return chunk_text(transcript, max_tokens=FACT_CHECK_CHUNK_TOKENS)
+
+def _merge_fact_checks(outputs):
+    return "\n".join(output.strip() for output in outputs if output and output.strip())
+
+class StageFailedError(RuntimeError):
+    pass
+
+def _raise_on_error(output):
+    # Agents report failures as "Error: ..." strings; checkpointed runs must not persist those
+    if isinstance(output, str) and output.startswith("Error:"):
+        raise StageFailedError(output)
+    return output
+
+def _strict(func):
+    def run(*args):
+        return _raise_on_error(func(*args))
+    return run
+
+def build_pipeline(mode=PIPELINE_MODE, strict=False, report=True):
+    """
+    `sequential`: summarize -> fact_check -> report.
+    `overlap`: fact-checks transcript chunks concurrently while the summary is being written, then
+    reports on the summary with the merged chunk verdicts.
+    With `strict`, an "Error: ..." fact-check result fails the stage instead of being reported on.
+    Without `report`, the graph ends at `summary` and `fact_check` (the streaming path writes the report).
+    """
+    fact_check_fn = _strict(fact_check) if strict else fact_check
+    if mode == "overlap":
+        nodes = [
+            Node("summarize", summarize_text, ["transcript"], ["summary"], timeout=STAGE_TIMEOUT),
+            Node("chunk", _chunk_transcript, ["transcript"], ["chunks"]),
+            Node("fact_check", fact_check_fn, ["chunks"], ["chunk_checks"], map_over="chunks",
+                 max_workers=FACT_CHECK_WORKERS, timeout=STAGE_TIMEOUT),
+            Node("merge", _merge_fact_checks, ["chunk_checks"], ["fact_check"]),
+        ]
+    elif mode == "sequential":
+        nodes = [
+            Node("summarize", summarize_text, ["transcript"], ["summary"], timeout=STAGE_TIMEOUT),
+            Node("fact_check", fact_check_fn, ["summary"], ["fact_check"], timeout=STAGE_TIMEOUT),
+        ]
+    else:
+        raise ValueError(f"Unknown pipeline mode: {mode}")
+    if report:
+        nodes.append(Node("report", generate_final_report, ["summary", "fact_check"], ["report"], timeout=STAGE_TIMEOUT))
+    return Pipeline(nodes)
+
+def trace_run(name, checkpoint=None, **attributes):
+    """Root span for one run; checkpointed runs keep their JSON trace next to the stage outputs."""
+    if checkpoint is None:
+        return tracing.trace(name, **attributes)
+    path = os.path.join(checkpoint.run_dir, "trace-{trace_id}.json")
+    return tracing.trace(name, path=path, run_id=checkpoint.run_id, **attributes)
+
+def is_valid_transcript(transcript):
+    return bool(transcript) and len(transcript.strip()) >= 10
+
+def _analysis_inputs(podcast_transcript, summary):
+    # A summary written alongside transcription (see `summarize_audio`) skips the summarize stage
+    inputs = {"transcript": podcast_transcript}
+    if summary is not None:
+        inputs["summary"] = summary
+    return inputs
+
+def initialize_pipeline (podcast_transcript, checkpoint=None, summary=None):
     start = time.time()
     logger.info("[START] Running analysis pipeline...")
 
-    if not podcast_transcript or len(podcast_transcript.strip()) < 10:
+    if not is_valid_transcript(podcast_transcript):
         logger.error("[ERROR] Transcript too short or missing.")
         return "Error: Transcript is empty or invalid."
 
-    # --- 1. Summarization ---
-    t1 = time.time()
-    summary = summarize_text(podcast_transcript)
-    t2 = time.time()
-    logger.info(f"[INFO] Summarization took {t2 - t1:.2f} seconds")
-
-
-    # --- Fact Checking ---
-    t3 = time.time()
-    fact_check_output = fact_check(summary)
-    t4 = time.time()
-    logger.info(f"[INFO] Fact Check took {t4 - t3:.2f} seconds")
-
+    # Nodes are bound when the pipeline is built, so it is rebuilt per run
+    pipeline = build_pipeline() if checkpoint is None else build_pipeline(strict=True)
+    with trace_run("analysis", checkpoint, mode=PIPELINE_MODE):
+        report = pipeline.run(checkpoint=checkpoint, **_analysis_inputs(podcast_transcript, summary))["report"]
+    _finish(report, start)
+    return report
 
-    # --- Report Generation ---
-    t5 = time.time()
-    report = generate_final_report(summary, fact_check_output)
-    t6 = time.time()
-    logger.info(f"[INFO] Report generation took {t6 - t5:.2f} seconds")
+def run_audio_pipeline(file_path, model_size="base", resume=True):
+    """
+    Transcribe and analyse an audio file with every stage checkpointed under a run keyed by the
+    audio hash; after a failure, rerunning resumes from the last finished stage. Returns (transcript, report).
+    """
+    checkpoint = RunCheckpoint.for_audio(file_path, model_size, resume=resume, mode=PIPELINE_MODE)
+    with trace_run("audio_pipeline", checkpoint, model=model_size):
+        transcript = prepare_transcript(file_path, checkpoint, model_size)
+        return transcript, initialize_pipeline(transcript, checkpoint=checkpoint)
+
+def prepare_transcript(file_path, checkpoint, model_size="base", overlap=False):
+    """
+    Checkpointed transcript for `file_path`. With `overlap`, the summary is produced while
+    transcribing (see `summarize_audio`) and checkpointed too, so the report stages can reuse it.
+    Invalid transcripts are returned but not checkpointed, so a retry transcribes again.
+    """
+    transcript = checkpoint.get("transcript")
+    if is_valid_transcript(transcript):
+        return transcript
 
+    t1 = time.time()
+    if overlap:
+        transcript, summary = summarize_audio(file_path, model_size=model_size)
+    else:
+        transcript = transcribe_audio(file_path, model_size=model_size)
+        logger.info(f"[INFO] Transcription took {time.time() - t1:.2f} seconds")
+    if is_valid_transcript(transcript):
+        checkpoint.save("transcript", transcript)
+        if overlap:
+            checkpoint.save("summary", summary)
+    return transcript
+
+def _finish(report, start):
     total = time.time() - start
     logger.info(f"[INFO] Total pipeline time: {total:.2f} seconds")
+    get_cache().log_stats()
     logger.info("[INFO] Report preview:\n" + report[:400] + "...\n")
     logger.info("[END] Report generated.")
 
-    return report
+def stream_pipeline(podcast_transcript, checkpoint=None, summary=None):
+    """
+    Streaming counterpart of `initialize_pipeline`: summarize and fact_check run through the same
+    pipeline (mode, stage timeouts, fact-check concurrency), then the report is yielded as it is
+    generated, so the caller can render the first tokens while the rest is still being written.
+    """
+    start = time.time()
+    logger.info("[START] Running streaming-report analysis pipeline...")
+
+    if not is_valid_transcript(podcast_transcript):
+        logger.error("[ERROR] Transcript too short or missing.")
+        yield "Error: Transcript is empty or invalid."
+        return
+
+    report = checkpoint.get("report") if checkpoint is not None else None
+    if report is not None:
+        yield report
+        return
+
+    pipeline = build_pipeline(report=False) if checkpoint is None else build_pipeline(strict=True, report=False)
+    with trace_run("analysis", checkpoint, mode=PIPELINE_MODE, streaming=True):
+        values = pipeline.run(checkpoint=checkpoint, **_analysis_inputs(podcast_transcript, summary))
+
+    # --- Report Generation (streamed) ---
+    t5 = time.time()
+    parts = []
+    for token in stream_final_report(values["summary"], values["fact_check"]):
+        parts.append(token)
+        yield token
+    logger.info(f"[INFO] Report generation took {time.time() - t5:.2f} seconds")
+    report = "".join(parts)
+    if checkpoint is not None:
+        checkpoint.save("report", report)
+    _finish(report, start)
+
+def summarize_audio(file_path, model_size="base"):
+    """
+    Transcribe and summarize concurrently: transcript segments are fed to the summarizer as they
+    are decoded, so wall-clock time is roughly max(transcription, summarization) rather than the sum.
+    Returns (transcript, summary).
+    """
+    texts = []
+
+    def transcript_stream():
+        for segment in iter_transcript(file_path, model_size=model_size):
+            texts.append(segment.text)
+            yield segment.text
+
+    t1 = time.time()
+    summary = summarize_stream(transcript_stream())
+    logger.info(f"[INFO] Transcription + summarization took {time.time() - t1:.2f} seconds")
+    return " ".join(texts), summary
+
+def initialize_streaming_pipeline(file_path, model_size="base"):
+    """
+    Overlapped transcription and summarization (see `summarize_audio`), then the remaining pipeline
+    stages on that summary. Returns (transcript, report).
+    """
+    logger.info("[START] Running streaming analysis pipeline...")
+    transcript, summary = summarize_audio(file_path, model_size=model_size)
+    return transcript, initialize_pipeline(transcript, summary=summary)
 
 if __name__ == "__main__":
     # 🔁 Test input: simulate transcript from app.py
@@ -0,0 +1,149 @@
+import time
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import tracing
+
+logger = logging.getLogger(__name__)
+
+class PipelineError(Exception):
+    def __init__(self, node: str, message: str):
+        super().__init__(f"[{node}] {message}")
+        self.node = node
+
+class PipelineTimeoutError(PipelineError):
+    pass
+
+class Node(NamedTuple):
+    """
+    One pipeline stage. `func` is called with the values named in `inputs` (positionally) and its
+    return value is stored under `outputs` (a tuple return is unpacked across several outputs).
+    With `map_over`, that input must be a list: `func` runs once per item, up to `max_workers` at a
+    time, and the output is the list of results in item order.
+    """
+    name: str
+    func: Callable
+    inputs: Sequence[str]
+    outputs: Sequence[str]
+    max_workers: int = 1
+    timeout: Optional[float] = None  # seconds, measured from when the node starts
+    map_over: Optional[str] = None
+
+class Pipeline:
+    """
+    Runs a DAG of nodes: every node starts as soon as all of its inputs exist, so independent
+    branches run concurrently. Values flow by name; `run` returns all of them.
+    """
+
+    def __init__(self, nodes: List[Node]):
+        names = [n.name for n in nodes]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate node names in {names}")
+        produced = [o for n in nodes for o in n.outputs]
+        if len(set(produced)) != len(produced):
+            raise ValueError(f"Each output must be produced by exactly one node: {produced}")
+        for n in nodes:
+            if n.map_over is not None and n.map_over not in n.inputs:
+                raise ValueError(f"Node `{n.name}` maps over `{n.map_over}`, which is not one of its inputs")
+        self.nodes = list(nodes)
+        self.timings: Dict[str, float] = {}
+
+    def _call(self, node: Node, values: dict):
+        with tracing.span(f"stage.{node.name}"):
+            return self._call_node(node, values)
+
+    def _call_node(self, node: Node, values: dict):
+        args = [values[i] for i in node.inputs]
+        if node.map_over is None:
+            return node.func(*args)
+
+        position = list(node.inputs).index(node.map_over)
+        items = list(values[node.map_over])
+
+        def call_item(item):
+            return node.func(*args[:position], item, *args[position + 1:])
+
+        if not items:
+            return []
+        with ThreadPoolExecutor(max_workers=min(node.max_workers, len(items)), thread_name_prefix=node.name) as executor:
+            return list(executor.map(tracing.bind(call_item), items))
+
+    def _store(self, node: Node, result, values: dict):
+        if len(node.outputs) == 1:
+            values[node.outputs[0]] = result
+        else:
+            values.update(zip(node.outputs, result))
+
+    def _restore(self, checkpoint, values: dict) -> List[Node]:
+        """Drop the nodes whose outputs were passed in or checkpointed (loading the latter), and their now unneeded upstreams."""
+        pending = []
+        for node in self.nodes:
+            if all(o in values for o in node.outputs):
+                logger.info(f"[PIPELINE] `{node.name}` skipped; its outputs were passed in")
+            elif checkpoint is not None and all(checkpoint.has(o) for o in node.outputs):
+                values.update((o, checkpoint.load(o)) for o in node.outputs)
+                logger.info(f"[PIPELINE] `{node.name}` restored from checkpoint")
+            else:
+                pending.append(node)
+
+        # Upstream nodes whose outputs only fed skipped or restored nodes are skipped as well
+        terminal = {o for n in self.nodes for o in n.outputs} - {i for n in self.nodes for i in n.inputs}
+        while True:
+            consumed = {i for n in pending for i in n.inputs}
+            needed = [n for n in pending if any(o in terminal or o in consumed for o in n.outputs if o not in values)]
+            if len(needed) == len(pending):
+                return pending
+            pending = needed
+
+    def run(self, checkpoint=None, **inputs) -> dict:
+        """
+        Execute the graph on `inputs`. Nodes whose outputs are passed in are skipped. With a
+        `checkpoint` (see checkpoints.RunCheckpoint), finished outputs are restored instead of
+        recomputed and every new output is saved as soon as it exists.
+        """
+        values = dict(inputs)
+        pending = self._restore(checkpoint, values)
+        running = {}  # future -> (node, start time)
+        self.timings = {}
+        executor = ThreadPoolExecutor(max_workers=max(1, len(self.nodes)), thread_name_prefix="pipeline")
+        try:
+            while pending or running:
+                for node in [n for n in pending if all(i in values for i in n.inputs)]:
+                    pending.remove(node)
+                    logger.info(f"[PIPELINE] Starting `{node.name}`")
+                    running[executor.submit(tracing.bind(self._call), node, values)] = (node, time.time())
+
+                if not running:
+                    missing = {n.name: [i for i in n.inputs if i not in values] for n in pending}
+                    raise PipelineError(pending[0].name, f"Inputs can never be satisfied: {missing}")
+
+                deadlines = [start + node.timeout for node, start in running.values() if node.timeout is not None]
+                wait_for = max(0.0, min(deadlines) - time.time()) if deadlines else None
+                done, _ = wait(running, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    node, start = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        if checkpoint is not None:
+                            checkpoint.fail(node.name, f"{type(e).__name__}: {e}")
+                        raise PipelineError(node.name, f"{type(e).__name__}: {e}") from e
+                    self.timings[node.name] = time.time() - start
+                    logger.info(f"[PIPELINE] `{node.name}` took {self.timings[node.name]:.2f} seconds")
+                    self._store(node, result, values)
+                    if checkpoint is not None:
+                        for output in node.outputs:
+                            checkpoint.save(output, values[output])
+
+                now = time.time()
+                for node, start in running.values():
+                    if node.timeout is not None and now - start >= node.timeout:
+                        if checkpoint is not None:
+                            checkpoint.fail(node.name, f"Timed out after {node.timeout:.1f}s")
+                        raise PipelineTimeoutError(node.name, f"Timed out after {node.timeout:.1f}s")
+        finally:
+            # Timed-out or failed runs do not wait for stragglers
+            executor.shutdown(wait=not running, cancel_futures=True)
+        return values
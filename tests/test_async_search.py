@@ -0,0 +1,136 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from agents.async_search import AsyncSearchEngine, AdaptiveLimiter
+from agents.llm_cache import LLMCache, MemoryBackend
+from agents.search_cache import SearchCache
+
+
+# --- Local stub of the Tavily search endpoint ---
+class StubTavily(BaseHTTPRequestHandler):
+    requests = []
+    throttle_first = set()
+    gate = None  # when set, responses wait for it
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        query = body["query"]
+        StubTavily.requests.append((query, self.headers.get("Authorization")))
+        if StubTavily.gate is not None:
+            StubTavily.gate.wait(timeout=5)
+
+        if query in StubTavily.throttle_first:
+            StubTavily.throttle_first.discard(query)
+            self.send_response(429)
+            self.end_headers()
+            return
+
+        payload = json.dumps({"answer": f"answer to {query}"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    StubTavily.requests = []
+    StubTavily.throttle_first = set()
+    StubTavily.gate = None
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubTavily)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/search"
+    server.shutdown()
+
+
+@pytest.fixture
+def engine(stub_server):
+    cache = SearchCache(LLMCache(MemoryBackend()))
+    engine = AsyncSearchEngine("test-key", url=stub_server, cache=cache, limiter=AdaptiveLimiter(initial=4), timeout=5)
+    yield engine
+    engine.close()
+
+
+# Test 1: Batch of queries answered in order through the pooled client
+def test_search_many_returns_answers(engine):
+    queries = [f"claim {i}" for i in range(6)]
+    results = engine.search_many(queries)
+
+    assert list(results) == queries
+    assert results["claim 3"] == "answer to claim 3"
+    assert all(auth == "Bearer test-key" for _, auth in StubTavily.requests)
+
+
+# Test 2: 429 is retried and shrinks the concurrency limit
+def test_throttled_query_is_retried(engine, monkeypatch):
+    monkeypatch.setattr("agents.async_search.BACKOFF_BASE", 0.01)
+    StubTavily.throttle_first = {"busy claim"}
+
+    results = engine.search_many(["busy claim"])
+
+    assert results["busy claim"] == "answer to busy claim"
+    assert [q for q, _ in StubTavily.requests].count("busy claim") == 2
+
+
+# Test 3: Cached and duplicate queries in a batch do not hit the network again
+def test_cached_and_duplicate_queries(engine):
+    engine.search_many(["Did Starship reach orbit?"])
+    engine.search_many(["did starship reach orbit", "New claim", "new claim!"])
+
+    fetched = [q for q, _ in StubTavily.requests]
+    assert fetched.count("Did Starship reach orbit?") == 1
+    assert len([q for q in fetched if q.lower().startswith("new claim")]) == 1
+
+
+# Test 4: Unreachable endpoint degrades to "Search error." after retries
+def test_unreachable_endpoint(monkeypatch):
+    monkeypatch.setattr("agents.async_search.BACKOFF_BASE", 0.01)
+    engine = AsyncSearchEngine("k", url="http://127.0.0.1:9/search", cache=None, timeout=1, retries=1)
+    try:
+        assert engine.search_many(["anything"]) == {"anything": "Search error."}
+    finally:
+        engine.close()
+
+
+# Test 5: AIMD limiter grows on fast successes and halves on throttling
+def test_adaptive_limiter_bounds():
+    limiter = AdaptiveLimiter(initial=4, min_limit=1, max_limit=6, target_latency=1.0)
+    for _ in range(5):
+        limiter.on_success(0.1)
+    assert limiter.limit == 6
+
+    limiter.on_throttle()
+    assert limiter.limit == 3
+    for _ in range(5):
+        limiter.on_throttle()
+    assert limiter.limit == 1
+
+
+# Test 6: The same query from concurrent callers is fetched once while it is in flight
+def test_concurrent_callers_share_in_flight_query(engine):
+    StubTavily.gate = threading.Event()
+    results = []
+    callers = [threading.Thread(target=lambda q=q: results.append(engine.search_many([q])))
+               for q in ["Did Starship reach orbit?", "did starship reach orbit", "Did Starship reach orbit!"]]
+    for caller in callers:
+        caller.start()
+    # Hold the first request open until the other two callers have joined it
+    deadline = time.time() + 5
+    while engine.coalesced < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    StubTavily.gate.set()
+    for caller in callers:
+        caller.join()
+
+    [(fetched, _)] = StubTavily.requests
+    assert engine.coalesced == 2
+    assert sorted(answer for r in results for answer in r.values()) == [f"answer to {fetched}"] * 3
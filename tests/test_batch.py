@@ -0,0 +1,98 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+import batch
+from batch import BatchRunner, collect_inputs, main
+
+
+class InlinePool(ThreadPoolExecutor):
+    """Stands in for the spawn process pool so patched functions are visible to the workers."""
+
+    def __init__(self, max_workers, mp_context=None, initializer=None, initargs=()):
+        super().__init__(max_workers=max_workers)
+
+
+@pytest.fixture
+def episodes(tmp_path, monkeypatch):
+    monkeypatch.setattr("checkpoints.RUNS_DIR", str(tmp_path / "runs"))
+    monkeypatch.setattr(batch, "ProcessPoolExecutor", InlinePool)
+    folder = tmp_path / "episodes"
+    (folder / "season1").mkdir(parents=True)
+    for name in ["a.mp3", "season1/b.wav", "notes.txt"]:
+        (folder / name).write_bytes(f"audio {name}".encode())
+    return folder
+
+
+def fake_transcribe(file_path, model_size):
+    if "broken" in file_path:
+        raise RuntimeError("decode failed")
+    return f"Transcript of {file_path} with plenty of words."
+
+
+# Test 1: Directories are walked for audio files; manifests resolve relative paths
+def test_collect_inputs(episodes, tmp_path):
+    assert [p.rsplit("/", 1)[-1] for p in collect_inputs(str(episodes))] == ["a.mp3", "b.wav"]
+    manifest = tmp_path / "manifest.jsonl"
+    manifest.write_text(json.dumps({"path": "episodes/a.mp3"}) + "\n\n")
+    assert collect_inputs(str(manifest)) == [str(tmp_path / "episodes" / "a.mp3")]
+
+
+# Test 2: Every file gets a report and an index line; a rerun skips finished files and logs them too
+def test_batch_run_and_skip(episodes, tmp_path):
+    out = tmp_path / "reports"
+    with patch.object(batch, "_transcribe", side_effect=fake_transcribe) as mock_transcribe, \
+         patch('main.summarize_text', return_value="Summary."), \
+         patch('main.fact_check', return_value="Fact check output"), \
+         patch('main.generate_final_report', side_effect=lambda s, f: "### Report") as mock_report:
+
+        results = BatchRunner(str(out), llm_workers=2).run(collect_inputs(str(episodes)))
+        assert [r["status"] for r in results] == ["ok", "ok"]
+        assert mock_transcribe.call_count == 2 and mock_report.call_count == 2
+
+        rerun = BatchRunner(str(out)).run(collect_inputs(str(episodes)))
+        assert [r["status"] for r in rerun] == ["skipped", "skipped"]
+        assert mock_transcribe.call_count == 2 and mock_report.call_count == 2
+
+    reports = sorted(p.name for p in out.glob("*.md"))
+    assert len(reports) == 2 and reports[0].startswith("a-")
+    index = [json.loads(line) for line in (out / "index.jsonl").read_text().splitlines()]
+    assert [e["status"] for e in index] == ["ok", "ok", "skipped", "skipped"]
+
+
+# Test 3: Failures are recorded without stopping the batch, and the exit code reflects them
+def test_batch_failures(episodes, tmp_path):
+    (episodes / "broken.mp3").write_bytes(b"not audio")
+    with patch.object(batch, "_transcribe", side_effect=fake_transcribe), \
+         patch('main.summarize_text', return_value="Summary."), \
+         patch('main.fact_check', return_value="Fact check output"), \
+         patch('main.generate_final_report', return_value="### Report"):
+
+        assert main([str(episodes), "--out", str(tmp_path / "reports")]) == 1
+
+    index = {e["file"].rsplit("/", 1)[-1]: e for e in map(json.loads, (tmp_path / "reports" / "index.jsonl").read_text().splitlines())}
+    assert index["broken.mp3"]["status"] == "failed" and "decode failed" in index["broken.mp3"]["error"]
+    assert index["a.mp3"]["status"] == "ok"
+
+
+# Test 4: Copies of the same audio are processed once; the rest are reported as skipped duplicates
+def test_batch_skips_duplicate_audio(episodes, tmp_path):
+    copy = episodes / "a-copy.mp3"
+    copy.write_bytes((episodes / "a.mp3").read_bytes())
+    out = tmp_path / "reports"
+    with patch.object(batch, "_transcribe", side_effect=fake_transcribe) as mock_transcribe, \
+         patch('main.summarize_text', return_value="Summary."), \
+         patch('main.fact_check', return_value="Fact check output"), \
+         patch('main.generate_final_report', return_value="### Report"):
+
+        results = BatchRunner(str(out)).run([str(episodes / "a.mp3"), str(copy)])
+
+    assert mock_transcribe.call_count == 1
+    by_file = {r["file"]: r for r in results}
+    assert by_file[str(episodes / "a.mp3")]["status"] == "ok"
+    assert by_file[str(copy)]["status"] == "skipped" and by_file[str(copy)]["duplicate_of"] == str(episodes / "a.mp3")
+    assert by_file[str(copy)]["run_id"] == by_file[str(episodes / "a.mp3")]["run_id"]
+    index = [json.loads(line) for line in (out / "index.jsonl").read_text().splitlines()]
+    assert sorted(e["status"] for e in index) == ["ok", "skipped"]
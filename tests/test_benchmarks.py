@@ -0,0 +1,34 @@
+import json
+
+from benchmarks import fakes
+from benchmarks.run import compare, main
+
+
+# Test 1: Simulated latency depends only on seed and request, not on call order
+def test_latency_model_is_deterministic():
+    latency = fakes.LatencyModel("lognormal:0.5:0.4", seed=3)
+    first = [latency.sample(q) for q in ["a", "b", "c"]]
+    assert [latency.sample(q) for q in ["c", "b", "a"]] == first[::-1]
+    assert fakes.LatencyModel("lognormal:0.5:0.4", seed=4).sample("a") != first[0]
+    assert fakes.LatencyModel("uniform:1:2", scale=0).sample("a") == 0
+
+
+# Test 2: Stages run offline against the fakes and write comparable results
+def test_benchmark_run_and_compare(tmp_path, capsys):
+    out = tmp_path / "results.json"
+    args = ["--stages", "chunk", "summarize", "fact_check[thread]", "pipeline[sequential]", "--repeat", "2",
+            "--latency-scale", "0", "--skip-transcription", "--in-process", "--out", str(out)]
+    assert main(args) == 0
+
+    results = json.loads(out.read_text())
+    stages = results["stages"]
+    # `summarize` selects the whole family, including the cache-hit variant
+    assert set(stages) == {"chunk", "summarize", "summarize[cached]", "fact_check[thread]", "pipeline[sequential]"}
+    assert all("error" not in s and len(s["samples"]) == 2 for s in stages.values())
+    assert stages["summarize[cached]"]["summary_chars"] == stages["summarize"]["summary_chars"]
+    assert stages["fact_check[thread]"]["verdicts"] > 0 and stages["pipeline[sequential]"]["report_chars"] > 0
+
+    # The same run against itself is clean; a second slower on every stage is flagged everywhere
+    assert not any(r["regression"] for r in compare(results, results))
+    slower = {"stages": {name: {**s, "wall_seconds": s["wall_seconds"] + 1.0} for name, s in stages.items()}}
+    assert {r["stage"] for r in compare(slower, results) if r["regression"]} == set(stages)
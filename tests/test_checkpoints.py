@@ -0,0 +1,96 @@
+from unittest.mock import patch
+
+import pytest
+
+import main
+from checkpoints import RunCheckpoint
+from pipeline import Node, Pipeline, PipelineError
+
+
+@pytest.fixture
+def audio(tmp_path):
+    path = tmp_path / "episode.mp3"
+    path.write_bytes(b"fake audio bytes")
+    return str(path)
+
+
+# Test 1: Stage outputs survive reopening the run; resume=False starts over
+def test_checkpoint_roundtrip(audio, tmp_path):
+    runs = str(tmp_path / "runs")
+    run = RunCheckpoint.for_audio(audio, "base", runs_dir=runs)
+    assert run.run_id.endswith("-base-sequential") and run.completed() == []
+    run.save("summary", "Starship reached space.")
+    run.fail("fact_check", "RuntimeError: Tavily error")
+
+    reopened = RunCheckpoint.for_audio(audio, "base", runs_dir=runs)
+    assert reopened.get("summary") == "Starship reached space."
+    assert reopened.completed() == ["summary"] and not reopened.has("fact_check")
+    assert reopened.manifest["stages"]["fact_check"]["status"] == "failed"
+    # The overlap DAG fact-checks transcript chunks, so it never reuses sequential stage outputs
+    assert RunCheckpoint.for_audio(audio, "base", runs_dir=runs, mode="overlap").completed() == []
+
+    assert RunCheckpoint.for_audio(audio, "base", resume=False, runs_dir=runs).completed() == []
+    assert RunCheckpoint.for_audio(audio, "small", runs_dir=runs).run_id != run.run_id
+
+
+# Test 2: The pipeline restores finished outputs and skips nodes that only fed them
+def test_pipeline_resumes_from_checkpoint(tmp_path):
+    calls = []
+
+    def stage(name, fail=False):
+        def run(*args):
+            calls.append(name)
+            if fail:
+                raise RuntimeError(f"{name} failed")
+            return f"{name}({', '.join(map(str, args))})"
+        return run
+
+    def nodes(fail_report):
+        return [
+            Node("summarize", stage("summarize"), ["transcript"], ["summary"]),
+            Node("fact_check", stage("fact_check"), ["summary"], ["fact_check"]),
+            Node("report", stage("report", fail_report), ["summary", "fact_check"], ["report"]),
+        ]
+
+    run = RunCheckpoint(str(tmp_path / "run"), "run")
+    with pytest.raises(PipelineError, match=r"\[report\]"):
+        Pipeline(nodes(fail_report=True)).run(checkpoint=run, transcript="t")
+    assert run.completed() == ["summary", "fact_check"]
+
+    calls.clear()
+    values = Pipeline(nodes(fail_report=False)).run(checkpoint=run, transcript="t")
+    assert calls == ["report"]
+    assert values["report"] == "report(summarize(t), fact_check(summarize(t)))"
+
+
+# Test 3: A fact-check failure keeps transcript and summary; the retry only redoes the failed stages
+def test_run_audio_pipeline_resume(audio, tmp_path, monkeypatch):
+    monkeypatch.setattr("checkpoints.RUNS_DIR", str(tmp_path / "runs"))
+    transcript = "SpaceX Starship test launch happened and reached space."
+
+    with patch('main.transcribe_audio', return_value=transcript) as mock_transcribe, \
+         patch('main.summarize_text', return_value="Summary.") as mock_summarize, \
+         patch('main.fact_check', side_effect=["Error: Tavily timeout", "Fact check output"]) as mock_fact_check, \
+         patch('main.generate_final_report', return_value="### Report") as mock_report:
+
+        with pytest.raises(PipelineError, match="Tavily timeout"):
+            main.run_audio_pipeline(audio)
+        mock_report.assert_not_called()
+
+        assert main.run_audio_pipeline(audio) == (transcript, "### Report")
+
+    assert mock_transcribe.call_count == 1
+    assert mock_summarize.call_count == 1
+    assert mock_fact_check.call_count == 2
+    mock_report.assert_called_once_with("Summary.", "Fact check output")
+
+
+# Test 4: Empty or too-short transcripts are not checkpointed, so the next run transcribes again
+def test_invalid_transcript_not_checkpointed(audio, tmp_path):
+    run = RunCheckpoint.for_audio(audio, "base", runs_dir=str(tmp_path / "runs"))
+    with patch('main.transcribe_audio', side_effect=["", "SpaceX Starship test launch happened."]) as mock_transcribe:
+        assert main.prepare_transcript(audio, run) == ""
+        assert not run.has("transcript")
+        assert main.prepare_transcript(audio, run) == "SpaceX Starship test launch happened."
+        assert main.prepare_transcript(audio, run) == "SpaceX Starship test launch happened."
+    assert mock_transcribe.call_count == 2
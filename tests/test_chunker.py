@@ -0,0 +1,72 @@
+import time
+
+import pytest
+
+from agents.chunker import SentencePacker, chunk_text, count_tokens, split_sentences
+
+SENTENCES = [f"Sentence number {i} talks about the Starship launch." for i in range(60)]
+TEXT = " ".join(SENTENCES)
+
+
+# Test 1: Chunks respect the token budget and never cut a sentence
+def test_chunks_are_sentence_aligned_and_within_budget():
+    chunks = chunk_text(TEXT, max_tokens=100)
+
+    assert len(chunks) > 1
+    assert all(count_tokens(c) <= 100 for c in chunks)
+    assert " ".join(chunks) == TEXT
+    for chunk in chunks:
+        assert chunk.endswith(".")
+        assert split_sentences(chunk)[0] in SENTENCES
+
+
+# Test 2: Overlap repeats trailing sentences at the start of the next chunk
+def test_overlap_repeats_trailing_sentences():
+    chunks = chunk_text(TEXT, max_tokens=100, overlap_tokens=30)
+
+    for prev, nxt in zip(chunks, chunks[1:]):
+        assert split_sentences(prev)[-1] in split_sentences(nxt)[:3]
+
+
+# Test 3: Incremental feeding (e.g. transcript segments) gives the same chunks
+def test_incremental_feed_matches_single_pass():
+    packer = SentencePacker(max_tokens=100)
+    words = TEXT.split()
+    chunks = []
+    for i in range(0, len(words), 5):  # segments end mid-sentence on purpose
+        chunks.extend(packer.feed(" ".join(words[i:i + 5])))
+    chunks.extend(packer.flush())
+
+    assert chunks == chunk_text(TEXT, max_tokens=100)
+
+
+# Test 4: A sentence longer than the budget is split on words
+def test_oversized_sentence_is_split():
+    long_sentence = " ".join(["word"] * 300) + "."
+    chunks = chunk_text(long_sentence, max_tokens=100)
+
+    assert len(chunks) >= 3
+    assert all(count_tokens(c) <= 100 for c in chunks)
+
+
+# Test 5: Long transcripts are chunked in linear time
+def test_long_transcript_is_fast():
+    big = TEXT * 200  # ~600k characters
+    start = time.time()
+    chunks = chunk_text(big, max_tokens=1000)
+    assert chunks
+    assert time.time() - start < 5
+
+
+# Test 6: Overlap must be smaller than the chunk budget
+def test_overlap_must_be_smaller_than_budget():
+    with pytest.raises(ValueError):
+        SentencePacker(max_tokens=100, overlap_tokens=100)
+
+
+# Test 7: Closing quotes and brackets stay with their sentence
+def test_quoted_and_bracketed_sentences_round_trip():
+    text = 'Usne kaha "hum udd gaye." Phir (plane crash hua.) Agla sawal?\') Theek hai!'
+    sentences = split_sentences(text)
+    assert sentences == ['Usne kaha "hum udd gaye."', "Phir (plane crash hua.)", "Agla sawal?')", "Theek hai!"]
+    assert " ".join(sentences) == text
@@ -0,0 +1,95 @@
+import json
+import threading
+import time
+from unittest.mock import MagicMock
+
+from agents.claims import Verdict, dedupe_claims, extract_claims, format_verdicts, verify_claim, verify_claims
+
+
+class FakeLLM:
+    """Returns canned JSON depending on which prompt it receives."""
+
+    def __init__(self, claims=None, delay=0.0):
+        self.claims = claims or []
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def invoke(self, prompt):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+
+        if prompt.startswith("Extract"):
+            return MagicMock(content="Here you go:\n" + json.dumps(self.claims))
+        claim = prompt.split("Claim: ", 1)[1].split("\n", 1)[0]
+        verdict = "Inaccurate" if "Mars" in claim else "Factually Accurate"
+        return MagicMock(content=json.dumps({"verdict": verdict, "evidence": f"Checked: {claim}", "sources": ["NASA.gov"]}))
+
+
+# Test 1: Claims are parsed from the LLM's JSON array
+def test_extract_claims_parses_json():
+    llm = FakeLLM(claims=["Starship reached space in 2023.", "NASA targets a 2027 moon landing."])
+    assert extract_claims("summary", llm) == ["Starship reached space in 2023.", "NASA targets a 2027 moon landing."]
+
+
+# Test 2: Non-JSON output falls back to summary sentences
+def test_extract_claims_fallback():
+    llm = MagicMock()
+    llm.invoke.return_value = MagicMock(content="Sorry, I cannot do that")
+    assert extract_claims("SpaceX launched Starship. It exploded.", llm) == ["SpaceX launched Starship.", "It exploded."]
+
+    # JSON that is not an array of claim strings also falls back instead of stringifying objects
+    llm.invoke.return_value = MagicMock(content='[{"claim": "SpaceX launched Starship."}]')
+    assert extract_claims("SpaceX launched Starship. It exploded.", llm) == ["SpaceX launched Starship.", "It exploded."]
+
+
+# Test 3: Near-identical claims are collapsed
+def test_dedupe_claims():
+    claims = [
+        "SpaceX launched Starship from Texas in 2023.",
+        "In 2023, SpaceX launched the Starship from Texas.",
+        "NASA wants to land people on the moon by 2027.",
+    ]
+    assert dedupe_claims(claims) == [claims[0], claims[2]]
+
+
+# Test 4: Claims are verified concurrently and keep their order
+def test_verify_claims_concurrent_and_ordered():
+    llm = FakeLLM(delay=0.1)
+    claims = ["Starship reached space.", "Starship will carry people to Mars next year.", "NASA funds Artemis.", "ISRO landed on the moon."]
+
+    start = time.time()
+    verdicts = verify_claims(claims, llm, search=lambda q: f"evidence for {q}", workers=4)
+    elapsed = time.time() - start
+
+    assert [v.claim for v in verdicts] == claims
+    assert verdicts[1].verdict == "Inaccurate"
+    assert llm.peak > 1
+    assert elapsed < 0.1 * len(claims)
+
+
+# Test 5: A failing search yields an Unverified verdict instead of aborting the batch
+def test_verify_claim_search_failure():
+    def broken_search(q):
+        raise RuntimeError("Tavily down")
+
+    verdict = verify_claim("Some claim.", FakeLLM(), broken_search)
+    assert verdict.verdict == "Unverified"
+    assert "Tavily down" in verdict.evidence
+
+
+def test_format_verdicts():
+    text = format_verdicts([Verdict("X happened.", "Factually Accurate", "Confirmed.", ["NASA.gov"])])
+    assert text == "Factually Accurate: X happened. — Confirmed. [Source: NASA.gov]"
+
+
+# Test 6: A single source returned as a plain string stays one source
+def test_verify_claim_string_source():
+    llm = MagicMock()
+    llm.invoke.return_value = MagicMock(content=json.dumps({"verdict": "Factually Accurate", "evidence": "Launch logs.", "sources": "NASA.gov"}))
+    assert verify_claim("Starship reached space.", llm, search=lambda q: "evidence").sources == ["NASA.gov"]
@@ -0,0 +1,150 @@
+import json
+import re
+import zlib
+
+import numpy as np
+import pytest
+
+from agents.evidence_index import EvidenceIndex, main
+
+DIM = 64
+
+
+def fake_embedder(texts):
+    # Bag-of-words hashing embedder: deterministic, no model download needed
+    vectors = np.zeros((len(texts), DIM), dtype=np.float32)
+    for i, text in enumerate(texts):
+        for word in re.findall(r"\w+", text.lower()):
+            vectors[i, zlib.crc32(word.encode()) % DIM] += 1.0
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-9)
+
+
+PASSAGES = [
+    {"text": "Chandrayaan 3 landed near the lunar south pole in August 2023.", "source": "ISRO"},
+    {"text": "The Artemis program aims to return astronauts to the Moon.", "source": "NASA"},
+    {"text": "Starship's first integrated flight test took place in April 2023.", "source": "SpaceX"},
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    idx = EvidenceIndex(str(tmp_path / "index"), embedder=fake_embedder)
+    idx.add(PASSAGES)
+    return idx
+
+
+# Test 1: Batched top-k returns the closest passage first
+def test_search_top_k(index):
+    results = index.search(["When did Chandrayaan 3 land on the lunar south pole?", "Artemis astronauts Moon"], k=2)
+
+    assert results[0][0][1]["source"] == "ISRO"
+    assert results[1][0][1]["source"] == "NASA"
+    assert len(results[0]) == 2
+    assert results[0][0][0] >= results[0][1][0]
+
+
+# Test 2: Incremental adds persist, skip duplicates and reopen as a memory map
+def test_incremental_add_and_reload(index, tmp_path):
+    assert index.add(PASSAGES) == 0
+    assert index.add([{"text": "Ray is a distributed computing framework.", "source": "docs"}]) == 1
+
+    reopened = EvidenceIndex(str(tmp_path / "index"), embedder=fake_embedder)
+    assert len(reopened) == 4
+    assert isinstance(reopened._matrix, np.memmap)
+    assert reopened.search(["distributed computing framework"], k=1)[0][0][1]["source"] == "docs"
+
+
+# Test 3: Only claims above the similarity threshold get local evidence
+def test_evidence_for_threshold(index):
+    claims = ["Chandrayaan 3 landed near the lunar south pole in August 2023.", "Tesla cars drive themselves."]
+    evidence = index.evidence_for(claims, threshold=0.8)
+
+    assert list(evidence) == [claims[0]]
+    assert "[Source: ISRO]" in evidence[claims[0]]
+
+
+# Test 4: Blocked scoring matches a single full matrix product
+def test_blocked_search_matches_exact(index, monkeypatch):
+    monkeypatch.setattr("agents.evidence_index.SEARCH_BLOCK_ROWS", 1)
+    blocked = index.search(["Starship flight test April 2023"], k=3)[0]
+    monkeypatch.setattr("agents.evidence_index.SEARCH_BLOCK_ROWS", 1000)
+    full = index.search(["Starship flight test April 2023"], k=3)[0]
+
+    assert [p["id"] for _, p in blocked] == [p["id"] for _, p in full]
+
+
+# Test 5: Ingestion CLI reads JSONL files
+def test_ingest_cli(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr("agents.evidence_index.embed_texts", fake_embedder)
+    source = tmp_path / "verified.jsonl"
+    source.write_text("\n".join(json.dumps(p) for p in PASSAGES))
+
+    main(["--index-dir", str(tmp_path / "cli_index"), "ingest", str(source)])
+
+    assert "3 new passages" in capsys.readouterr().out
+    assert len(EvidenceIndex(str(tmp_path / "cli_index"), embedder=fake_embedder)) == 3
+
+
+# Test 6: Readers ignore an uncommitted tail and leave it alone; the next writer drops it and stays aligned
+def test_reload_truncates_partial_append(index, tmp_path):
+    index_dir = tmp_path / "index"
+    with open(index_dir / "embeddings.f32", "ab") as f:
+        f.write(b"\0" * (DIM * 4 + 7))
+    with open(index_dir / "passages.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"text": "half writ')
+
+    reopened = EvidenceIndex(str(index_dir), embedder=fake_embedder)
+    assert len(reopened) == 3 and reopened._matrix.shape == (3, DIM)
+    assert (index_dir / "embeddings.f32").stat().st_size == 4 * DIM * 4 + 7
+    assert reopened.search(["Artemis astronauts Moon"], k=1)[0][0][1]["source"] == "NASA"
+
+    assert reopened.add([{"text": "Ray is a distributed computing framework.", "source": "docs"}]) == 1
+
+    again = EvidenceIndex(str(index_dir), embedder=fake_embedder)
+    assert again.search(["distributed computing framework"], k=1)[0][0][1]["source"] == "docs"
+    assert again.search(["Artemis astronauts Moon"], k=1)[0][0][1]["source"] == "NASA"
+
+
+# Test 7: A failed embedding leaves nothing registered, so retrying the same passages adds them
+def test_failed_add_can_be_retried(tmp_path):
+    calls = []
+
+    def flaky_embedder(texts):
+        calls.append(texts)
+        if len(calls) == 1:
+            raise RuntimeError("embedding model unavailable")
+        return fake_embedder(texts)
+
+    idx = EvidenceIndex(str(tmp_path / "index"), embedder=flaky_embedder)
+    with pytest.raises(RuntimeError):
+        idx.add(PASSAGES)
+    assert len(idx) == 0
+
+    assert idx.add(PASSAGES + PASSAGES[:1]) == 3
+    assert len(idx) == 3 and len(EvidenceIndex(str(tmp_path / "index"), embedder=fake_embedder)) == 3
+
+
+# Test 8: A writer opened earlier picks up rows another writer committed instead of overwriting them
+def test_writers_see_each_others_rows(index, tmp_path):
+    stale = EvidenceIndex(str(tmp_path / "index"), embedder=fake_embedder)
+    assert index.add([{"text": "Ray is a distributed computing framework.", "source": "docs"}]) == 1
+    assert stale.add([{"text": "ISRO launched Aditya-L1 to study the Sun.", "source": "ISRO"}]) == 1
+
+    reopened = EvidenceIndex(str(tmp_path / "index"), embedder=fake_embedder)
+    assert len(reopened) == 5
+    assert reopened.search(["distributed computing framework"], k=1)[0][0][1]["source"] == "docs"
+    assert reopened.search(["Aditya-L1 study the Sun"], k=1)[0][0][1]["source"] == "ISRO"
+
+
+# Test 9: An index that cannot be opened falls back to web search instead of failing the fact check
+def test_local_evidence_survives_corrupt_index(tmp_path, monkeypatch):
+    from agents import evidence_index
+
+    index_dir = tmp_path / "index"
+    index_dir.mkdir()
+    (index_dir / "info.json").write_text("{not json", encoding="utf-8")
+    monkeypatch.setattr(evidence_index, "INDEX_DIR", str(index_dir))
+    monkeypatch.setattr(evidence_index, "INDEX_ENABLED", True)
+    monkeypatch.setattr(evidence_index, "_index", None)
+    assert evidence_index.local_evidence(["Starship reached space."]) == {}
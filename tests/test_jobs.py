@@ -0,0 +1,137 @@
+import io
+import os
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from jobs import JobQueue, WorkerPool, run_job, save_upload
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    monkeypatch.setattr("checkpoints.RUNS_DIR", str(tmp_path / "runs"))
+    return JobQueue(str(tmp_path / "jobs.sqlite"))
+
+
+@pytest.fixture
+def upload(tmp_path):
+    path = tmp_path / "upload.mp3"
+    path.write_bytes(b"fake audio bytes")
+    return str(path)
+
+
+TRANSCRIPT = "SpaceX Starship test launch happened and reached space."
+
+
+# Test 1: Jobs are claimed in order, exactly once, even with competing workers
+def test_claim_is_exclusive(queue, upload):
+    ids = [queue.submit(upload) for _ in range(20)]
+    assert queue.get(ids[5])["position"] == 5
+
+    claimed, lock = [], threading.Lock()
+
+    def worker(name):
+        while (job := queue.claim(name)) is not None:
+            with lock:
+                claimed.append(job["id"])
+
+    threads = [threading.Thread(target=worker, args=(f"w{i}",)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(claimed) == sorted(ids)
+    assert queue.get(ids[0])["status"] == "running"
+
+
+# Test 2: Queued jobs cancel at once; running jobs only get a cancellation request
+def test_cancel(queue, upload):
+    first, second = queue.submit(upload), queue.submit(upload)
+    queue.claim("w1")
+    assert queue.cancel(second) and queue.get(second)["status"] == "cancelled"
+    assert queue.cancel(first) and queue.get(first)["status"] == "running"
+    assert queue.cancel_requested(first)
+    assert not queue.cancel(second)
+
+
+# Test 3: Jobs of dead workers go back to the queue
+def test_requeue_orphans(queue, upload):
+    job_id = queue.submit(upload)
+    queue.claim("123")
+    assert queue.requeue_orphans({"456"}) == 1
+    assert queue.get(job_id)["status"] == "queued"
+
+
+# Test 4: A worker run stores transcript and report and removes the upload
+def test_run_job_done(queue, upload):
+    job_id = queue.submit(upload)
+    with patch('main.transcribe_audio', return_value=TRANSCRIPT), \
+         patch('main.summarize_text', return_value="Summary."), \
+         patch('main.fact_check', return_value="Fact check output"), \
+         patch('main.stream_final_report', return_value=iter(["### Report", " body"])):
+        run_job(queue, queue.claim("w1"))
+
+    job = queue.get(job_id)
+    assert (job["status"], job["transcript"], job["report"]) == ("done", TRANSCRIPT, "### Report body")
+    assert not os.path.exists(upload)
+
+
+# Test 5: Cancellation stops the job at the next stage boundary; failed runs also remove the upload
+def test_run_job_cancel_and_fail(queue, upload):
+    job_id = queue.submit(upload)
+    job = queue.claim("w1")
+
+    def summarize(text):
+        queue.cancel(job_id)
+        return "Summary."
+
+    with patch('main.transcribe_audio', return_value=TRANSCRIPT), \
+         patch('main.summarize_text', side_effect=summarize), \
+         patch('main.fact_check') as mock_fact_check:
+        run_job(queue, job)
+    assert queue.get(job_id)["status"] == "cancelled"
+    mock_fact_check.assert_not_called()
+
+    with open(upload, "wb") as f:
+        f.write(b"fake audio bytes")
+    job_id = queue.submit(upload)
+    with patch('main.fact_check', return_value="Error: Tavily timeout"):
+        run_job(queue, queue.claim("w1"))
+    job = queue.get(job_id)
+    assert job["status"] == "failed" and "Tavily timeout" in job["error"]
+    assert not os.path.exists(upload)
+
+
+class ChunkedUpload(io.BytesIO):
+    """Upload stand-in that fails if it is read in one piece."""
+    name = "episode.mp3"
+
+    def read(self, size=-1):
+        assert 0 < size <= 1024 * 1024, "upload must be copied in chunks"
+        return super().read(size)
+
+
+# Test 6: Uploads are copied to disk in fixed-size chunks, from the start of the buffer
+def test_save_upload_is_chunked(tmp_path):
+    upload = ChunkedUpload(os.urandom(3 * 1024 * 1024 + 17))
+    upload.seek(100)
+    path = save_upload(upload, str(tmp_path / "uploads"))
+    assert path.endswith(".mp3")
+    with open(path, "rb") as f:
+        assert f.read() == upload.getvalue()
+
+
+# Test 7: Cancelling through the pool removes the upload of queued and force-stopped jobs
+def test_pool_cancel_removes_upload(tmp_path, upload):
+    pool = WorkerPool(str(tmp_path / "jobs.sqlite"), size=1)
+    second = tmp_path / "second.mp3"
+    second.write_bytes(b"more fake audio")
+    running, queued = pool.queue.submit(upload), pool.queue.submit(str(second))
+    pool.queue.claim("w1")
+
+    with patch.object(WorkerPool, "ensure_running"):
+        assert pool.cancel(queued) and not second.exists()
+        assert pool.cancel(running, force=True)
+    assert pool.queue.get(running)["status"] == "cancelled"
+    assert not os.path.exists(upload)
@@ -0,0 +1,90 @@
+from unittest.mock import patch
+
+from langchain_core.globals import get_llm_cache, set_llm_cache
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from agents.llm_cache import LLMCache, MemoryBackend, SQLiteBackend, make_key
+from agents.langchain_cache import LangChainLLMCache
+
+
+# Test 1: Key depends on model, sampling params and prompt
+def test_make_key_includes_settings():
+    base = make_key("command-r", 0.3, 300, "Summarize this")
+    assert base == make_key("command-r", 0.3, 300, "Summarize this")
+    assert base != make_key("command-light", 0.3, 300, "Summarize this")
+    assert base != make_key("command-r", 0.7, 300, "Summarize this")
+    assert base != make_key("command-r", 0.3, 500, "Summarize this")
+    assert base != make_key("command-r", 0.3, 300, "Summarize that")
+
+
+# Test 2: Memory backend evicts least recently used entries
+def test_memory_backend_lru():
+    backend = MemoryBackend(max_entries=2)
+    backend.set("a", "A", 1.0)
+    backend.set("b", "B", 1.0)
+    backend.get("a")
+    backend.set("c", "C", 1.0)
+
+    assert backend.get("b") is None
+    assert backend.get("a")[0] == "A"
+
+
+# Test 3: cached_call hits after the first call and reports saved latency
+def test_cached_call_stats():
+    cache = LLMCache(MemoryBackend())
+    calls = []
+
+    def call():
+        calls.append(1)
+        return "answer"
+
+    assert cache.cached_call("command-r", 0.3, 300, "prompt", call) == "answer"
+    assert cache.cached_call("command-r", 0.3, 300, "prompt", call) == "answer"
+
+    stats = cache.stats()
+    assert len(calls) == 1
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    assert stats["hit_rate"] == 0.5
+
+
+# Test 4: Entries older than the TTL are treated as misses
+def test_ttl_expiry():
+    cache = LLMCache(MemoryBackend(), ttl=60)
+    cache.set("k", "v", 0.5)
+    assert cache.get("k") == "v"
+
+    with patch("agents.llm_cache.time.time", return_value=10**12):
+        assert cache.get("k") is None
+
+
+# Test 5: SQLite backend persists across instances and bounds its size
+def test_sqlite_backend_persists(tmp_path):
+    path = str(tmp_path / "llm.sqlite")
+    LLMCache(SQLiteBackend(path)).set("k", "stored", 2.0)
+
+    reopened = LLMCache(SQLiteBackend(path))
+    assert reopened.get("k") == "stored"
+    assert reopened.stats()["saved_seconds"] == 2.0
+
+    small = SQLiteBackend(str(tmp_path / "small.sqlite"), max_entries=2)
+    for key in ["a", "b", "c"]:
+        small.set(key, key, 0.0)
+    assert small.get("a") is None
+    assert small.get("b") is not None and small.get("c") is not None
+    plan = small._conn.execute("EXPLAIN QUERY PLAN SELECT key FROM llm_cache ORDER BY accessed_at LIMIT 1").fetchall()
+    assert "llm_cache_accessed_at" in str(plan)
+
+
+# Test 6: LangChain chat models are served from the shared cache on repeat prompts
+def test_langchain_adapter_caches_chat_model():
+    cache = LLMCache(MemoryBackend())
+    previous = get_llm_cache()
+    set_llm_cache(LangChainLLMCache(cache))
+    try:
+        model = FakeListChatModel(responses=["first", "second"])
+        assert model.invoke("Is the moon made of cheese?").content == "first"
+        assert model.invoke("Is the moon made of cheese?").content == "first"
+    finally:
+        set_llm_cache(previous)
+
+    assert cache.stats()["hits"] == 1
@@ -0,0 +1,74 @@
+import json
+import logging
+import multiprocessing
+
+import pytest
+
+import logging_setup
+import tracing
+
+
+# Har test apna logging setup banata hai; main import hone par jo setup bana tha woh baad mein wapas aata hai
+@pytest.fixture
+def log_file(tmp_path):
+    logging_setup.shutdown_logging()
+    path = tmp_path / "podcast.jsonl"
+    yield path
+    logging_setup.shutdown_logging()
+    logging_setup.configure_logging()
+
+
+def _records(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def _worker(log_queue):
+    logging_setup.configure_logging(log_queue=log_queue)
+    logging.getLogger("worker").info("[WORKER] hello from the child")
+
+
+# Test 1: Records reach the file as JSON lines with extras, exceptions and the current trace ids
+def test_json_records_with_trace_ids(log_file):
+    logging_setup.configure_logging(path=str(log_file), console=False, sample_rates={})
+    logger = logging.getLogger("tests.logging")
+    with tracing.span("fact_check") as span:
+        logger.info("[CLAIM] %s verified", "Starship", extra={"claim_id": 7})
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("[ERROR] failed")
+    logging_setup.shutdown_logging()  # drains the queue
+
+    info, error = [r for r in _records(log_file) if r["logger"] == "tests.logging"]
+    assert info["message"] == "[CLAIM] Starship verified" and info["claim_id"] == 7
+    assert (info["trace_id"], info["span_id"]) == (span.trace_id, span.span_id)
+    assert error["level"] == "ERROR" and "ValueError: boom" in error["exception"]
+    assert logging_setup.read_recent(str(log_file), limit=1)[0]["message"] == "[ERROR] failed"
+
+
+# Test 2: Per-query messages are sampled by prefix; warnings and other messages are always kept
+def test_sampling(log_file):
+    logging_setup.configure_logging(path=str(log_file), console=False, sample_rates={"[SEARCH]": 0.25, "[RESULT]": 0})
+    logger = logging.getLogger("tests.logging")
+    for i in range(8):
+        logger.info(f"[SEARCH] Querying: q{i}")
+        logger.info(f"[RESULT] q{i} => yes")
+    logger.warning("[SEARCH] rate limited")
+    logger.info("[INFO] 8 searches")
+    logging_setup.shutdown_logging()
+
+    messages = [r["message"] for r in _records(log_file) if r["logger"] == "tests.logging"]
+    assert messages == ["[SEARCH] Querying: q0", "[SEARCH] Querying: q4", "[SEARCH] rate limited", "[INFO] 8 searches"]
+    assert _records(log_file)[0]["sample_rate"] == 0.25
+
+
+# Test 3: Spawned workers forward their records to the parent's listener
+def test_worker_records_are_written_by_parent(log_file):
+    logging_setup.configure_logging(path=str(log_file), console=False)
+    process = multiprocessing.get_context("spawn").Process(target=_worker, args=(logging_setup.worker_queue(),))
+    process.start()
+    process.join(timeout=60)
+    logging_setup.shutdown_logging()
+
+    [record] = [r for r in _records(log_file) if r["logger"] == "worker"]
+    assert record["message"] == "[WORKER] hello from the child" and record["process"] == process.pid
@@ -1,9 +1,9 @@
 import pytest
-import os
 import logging
 from unittest.mock import patch, MagicMock
 
-from main import initialize_pipeline, LOG_PATH
+from main import initialize_pipeline, initialize_streaming_pipeline, stream_pipeline
+from agents.transcription import TranscriptSegment
 
 # --- Fixtures ---
 # Yeh fixture har test se pehle aur baad mein run hoga
@@ -24,13 +24,8 @@ def setup_teardown_logging():
     yield
 
     # Test ke baad: original handlers ko wapas add kar do
+    # (shared log file ko delete nahi karte; app aur workers bhi usi mein likhte hain)
     root_logger.handlers = original_handlers
-    # Clear main.log file after each test run to keep it clean (optional)
-    if os.path.exists(LOG_PATH):
-        try:
-            os.remove(LOG_PATH)
-        except OSError as e:
-            print(f"Error removing log file {LOG_PATH}: {e}")
 
 # Sample transcript
 @pytest.fixture
@@ -74,3 +69,89 @@ def test_initialize_pipeline_success(sample_transcript):
         assert "Error" not in report # Ensure no error message
 
 
+# Test 2: Streaming mode feeds transcript segments to the summarizer as they arrive
+def test_initialize_streaming_pipeline(sample_transcript):
+    sentences = [s.strip() + "." for s in sample_transcript.split(".") if s.strip()]
+    segments = [TranscriptSegment(float(i), float(i + 1), text) for i, text in enumerate(sentences)]
+    consumed = []
+
+    def fake_summarize_stream(stream):
+        consumed.extend(stream)
+        return "This is a summarized text."
+
+    with patch('main.iter_transcript', return_value=iter(segments)), \
+         patch('main.summarize_stream', side_effect=fake_summarize_stream), \
+         patch('main.fact_check', return_value="Fact check output") as mock_fact_check, \
+         patch('main.generate_final_report', return_value="This is the final generated report."):
+
+        transcript, report = initialize_streaming_pipeline("episode.mp3")
+
+    assert consumed == sentences
+    assert transcript == " ".join(sentences)
+    mock_fact_check.assert_called_once_with("This is a summarized text.")
+    assert report == "This is the final generated report."
+
+
+# Test 3: The report is yielded token by token after summarizing and fact-checking
+def test_stream_pipeline(sample_transcript):
+    with patch('main.summarize_text', return_value="This is a summarized text."), \
+         patch('main.fact_check', return_value="Fact check output") as mock_fact_check, \
+         patch('main.stream_final_report', return_value=iter(["### Report", " part 2"])) as mock_stream:
+
+        tokens = list(stream_pipeline(sample_transcript))
+
+    mock_fact_check.assert_called_once_with("This is a summarized text.")
+    mock_stream.assert_called_once_with("This is a summarized text.", "Fact check output")
+    assert tokens == ["### Report", " part 2"]
+
+
+# Test 4: Invalid transcripts yield a single error message without calling any agent
+def test_stream_pipeline_invalid_transcript():
+    with patch('main.summarize_text') as mock_summarize:
+        assert list(stream_pipeline("  ")) == ["Error: Transcript is empty or invalid."]
+    mock_summarize.assert_not_called()
+
+
+# Test 5: Overlap mode fact-checks transcript chunks while the summary is being written
+def test_initialize_pipeline_overlap_mode(sample_transcript):
+    from main import build_pipeline
+    events = []
+
+    def fake_summarize(text):
+        events.append("summarize")
+        return "This is a summarized text."
+
+    def fake_fact_check(chunk):
+        events.append("fact_check")
+        return f"Checked {len(chunk)} chars"
+
+    with patch('main.summarize_text', side_effect=fake_summarize), \
+         patch('main.fact_check', side_effect=fake_fact_check), \
+         patch('main.generate_final_report', return_value="This is the final generated report.") as mock_report, \
+         patch('main.build_pipeline', lambda: build_pipeline("overlap")):
+
+        report = initialize_pipeline(sample_transcript)
+
+    assert report == "This is the final generated report."
+    assert sorted(events) == ["fact_check", "summarize"]
+    mock_report.assert_called_once_with("This is a summarized text.", f"Checked {len(sample_transcript)} chars")
+
+
+# Test 6: The streaming path runs the same pipeline (here overlap mode) and streams only the report
+def test_stream_pipeline_overlap_mode(sample_transcript):
+    import functools
+    from main import build_pipeline
+
+    with patch('main.summarize_text', return_value="This is a summarized text.") as mock_summarize, \
+         patch('main.fact_check', side_effect=lambda chunk: f"Checked {len(chunk)} chars") as mock_fact_check, \
+         patch('main.generate_final_report') as mock_report, \
+         patch('main.stream_final_report', return_value=iter(["### Report", " part 2"])) as mock_stream, \
+         patch('main.build_pipeline', functools.partial(build_pipeline, "overlap")):
+
+        tokens = list(stream_pipeline(sample_transcript, summary="Summary written while transcribing."))
+
+    assert tokens == ["### Report", " part 2"]
+    mock_summarize.assert_not_called()
+    mock_fact_check.assert_called_once_with(sample_transcript)
+    mock_report.assert_not_called()
+    mock_stream.assert_called_once_with("Summary written while transcribing.", f"Checked {len(sample_transcript)} chars")
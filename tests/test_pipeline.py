@@ -0,0 +1,88 @@
+import threading
+import time
+
+import pytest
+
+from pipeline import Node, Pipeline, PipelineError, PipelineTimeoutError
+
+
+def slow(value, delay=0.2):
+    time.sleep(delay)
+    return value
+
+
+# Test 1: Independent branches run concurrently and values flow by name
+def test_independent_nodes_overlap():
+    pipeline = Pipeline([
+        Node("a", lambda x: slow(x + 1), ["x"], ["a"]),
+        Node("b", lambda x: slow(x * 10), ["x"], ["b"]),
+        Node("sum", lambda a, b: a + b, ["a", "b"], ["total"]),
+    ])
+    start = time.time()
+    values = pipeline.run(x=1)
+    assert values["total"] == 12
+    assert time.time() - start < 0.35
+    assert set(pipeline.timings) == {"a", "b", "sum"}
+
+
+# Test 2: Mapped nodes keep item order and respect their worker limit
+def test_map_node_worker_limit():
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def square(offset, item):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return item * item + offset
+
+    pipeline = Pipeline([Node("square", square, ["offset", "items"], ["squares"], max_workers=2, map_over="items")])
+    assert pipeline.run(offset=1, items=list(range(6)))["squares"] == [1, 2, 5, 10, 17, 26]
+    assert peak[0] == 2
+
+
+# Test 3: Multiple outputs are unpacked from a tuple
+def test_multiple_outputs():
+    pipeline = Pipeline([Node("split", lambda s: tuple(s.split("|")), ["text"], ["left", "right"])])
+    values = pipeline.run(text="summary|facts")
+    assert (values["left"], values["right"]) == ("summary", "facts")
+
+
+# Test 4: Failures and timeouts name the node
+def test_errors_and_timeouts():
+    def boom(x):
+        raise RuntimeError("Cohere timeout")
+
+    with pytest.raises(PipelineError, match=r"\[boom\] RuntimeError: Cohere timeout") as err:
+        Pipeline([Node("boom", boom, ["x"], ["y"])]).run(x=1)
+    assert err.value.node == "boom"
+
+    start = time.time()
+    with pytest.raises(PipelineTimeoutError, match=r"\[sleepy\]"):
+        Pipeline([Node("sleepy", lambda x: slow(x, 1.0), ["x"], ["y"], timeout=0.1)]).run(x=1)
+    assert time.time() - start < 0.5
+
+
+# Test 5: Graphs are validated up front and missing inputs are reported
+def test_validation():
+    with pytest.raises(ValueError):
+        Pipeline([Node("a", str, ["x"], ["y"]), Node("b", str, ["x"], ["y"])])
+    with pytest.raises(ValueError):
+        Pipeline([Node("a", str, ["x"], ["y"], map_over="z")])
+    with pytest.raises(PipelineError, match="never be satisfied"):
+        Pipeline([Node("a", str, ["missing"], ["y"])]).run(x=1)
+
+
+# Test 6: Nodes whose outputs are passed in are skipped, along with upstreams that only fed them
+def test_supplied_outputs_skip_nodes():
+    calls = []
+    pipeline = Pipeline([
+        Node("clean", lambda x: calls.append("clean") or x.strip(), ["x"], ["clean"]),
+        Node("summary", lambda c: calls.append("summary") or c.upper(), ["clean"], ["summary"]),
+        Node("count", lambda x: calls.append("count") or len(x), ["x"], ["count"]),
+        Node("report", lambda s, n: f"{s} ({n})", ["summary", "count"], ["report"]),
+    ])
+    assert pipeline.run(x=" abc ", summary="GIVEN")["report"] == "GIVEN (5)"
+    assert calls == ["count"]
@@ -0,0 +1,68 @@
+import threading
+import time
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.prompts import FewShotPromptTemplate, PromptTemplate
+from langchain_core.runnables import RunnableLambda
+
+from agents.reporter import EXAMPLE_TEMPLATE, EXAMPLES, PREFIX, SUFFIX, ReportGenerator, build_prompt
+
+
+class FakeReportLLM:
+    """Echoes the summary back as a report and tracks how many calls overlap."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, prompt_value):
+        text = prompt_value.to_string()
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        summary = text.rsplit("Summary:\n", 1)[1].split("\n", 1)[0]
+        if "FAIL" in summary:
+            raise RuntimeError("Cohere timeout")
+        return f"### ✅ Fact Check Report\n{summary}"
+
+
+# Test 1: The precompiled prompt renders exactly like the original FewShotPromptTemplate
+def test_prompt_matches_fewshot_template():
+    fewshot = FewShotPromptTemplate(examples=EXAMPLES, example_prompt=PromptTemplate.from_template(EXAMPLE_TEMPLATE), prefix=PREFIX,
+                                    suffix=SUFFIX, input_variables=["summary", "fact_check"])
+    inputs = {"summary": "Starship reached space.", "fact_check": "Confirmed: {braces} stay literal."}
+    assert build_prompt().format(**inputs) == fewshot.format(**inputs)
+
+
+# Test 2: Single reports strip their inputs and reuse the same chain
+def test_generate():
+    generator = ReportGenerator(llm=RunnableLambda(FakeReportLLM()))
+    chain = generator.chain
+    assert generator.generate("  Starship reached space.  ", "Confirmed.") == "### ✅ Fact Check Report\nStarship reached space."
+    assert generator.chain is chain
+
+
+# Test 3: Batches run concurrently, keep input order and isolate failures
+def test_generate_reports_batch():
+    fake = FakeReportLLM(delay=0.1)
+    generator = ReportGenerator(llm=RunnableLambda(fake), max_concurrency=4)
+    pairs = [(f"Episode {i}", "Confirmed.") for i in range(6)] + [("FAIL episode", "Confirmed.")]
+
+    reports = generator.generate_reports(pairs)
+
+    assert reports[:6] == [f"### ✅ Fact Check Report\nEpisode {i}" for i in range(6)]
+    assert reports[6].startswith("Error:") and "Cohere timeout" in reports[6]
+    assert 1 < fake.peak <= 4
+
+
+# Test 4: Streaming yields the report incrementally from the same chain
+def test_stream():
+    generator = ReportGenerator(llm=FakeListChatModel(responses=["### ✅ Report"]))
+    tokens = list(generator.stream("Starship reached space.", "Confirmed."))
+    assert len(tokens) > 1
+    assert "".join(tokens) == "### ✅ Report"
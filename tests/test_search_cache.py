@@ -0,0 +1,85 @@
+import threading
+import time
+
+import pytest
+
+from agents.llm_cache import LLMCache, MemoryBackend, SQLiteBackend
+from agents import search_cache
+from agents.search_cache import SearchCache, normalize_query
+
+
+@pytest.fixture
+def cache():
+    return SearchCache(LLMCache(MemoryBackend(), ttl=3600))
+
+
+# Test 1: Case, whitespace and punctuation do not change the key
+def test_normalize_query():
+    assert normalize_query("  When did Starship   launch?") == normalize_query("when did starship launch")
+    assert normalize_query("NASA's Artemis-2 date") == "nasa s artemis 2 date"
+
+
+# Test 2: Reworded-but-equivalent queries share one fetch
+def test_repeat_queries_hit_cache(cache):
+    calls = []
+
+    def fetch(query):
+        calls.append(query)
+        return "April 2023"
+
+    assert cache.get_or_fetch("When did Starship launch?", fetch) == "April 2023"
+    assert cache.get_or_fetch("when did starship launch", fetch) == "April 2023"
+    assert len(calls) == 1
+
+
+# Test 3: Concurrent identical queries are coalesced into one HTTP call
+def test_concurrent_queries_are_coalesced(cache):
+    calls = []
+    results = []
+
+    def slow_fetch(query):
+        calls.append(query)
+        time.sleep(0.2)
+        return "answer"
+
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_fetch("Same query", slow_fetch))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == ["answer"] * 5
+    assert cache.stats()["coalesced"] >= 1
+
+
+# Test 4: Failures propagate and are not cached
+def test_errors_are_not_cached(cache):
+    def failing(query):
+        raise RuntimeError("429 Too Many Requests")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_fetch("flaky", failing)
+    assert cache.get_or_fetch("flaky", lambda q: "recovered") == "recovered"
+
+
+# Test 5: Answers persist on disk across instances
+def test_disk_persistence(tmp_path):
+    path = str(tmp_path / "search.sqlite")
+    SearchCache(LLMCache(SQLiteBackend(path, table="search_cache"))).get_or_fetch("Artemis II", lambda q: "2026")
+
+    reopened = SearchCache(LLMCache(SQLiteBackend(path, table="search_cache")))
+    assert reopened.get_or_fetch("artemis ii", lambda q: "should not be called") == "2026"
+
+
+# Test 6: The process-wide cache is built on first use, not on import
+def test_get_search_cache_is_lazy(tmp_path, monkeypatch):
+    path = tmp_path / "search_cache.sqlite"
+    monkeypatch.setattr(search_cache, "SEARCH_CACHE_PATH", str(path))
+    monkeypatch.setattr(search_cache, "SEARCH_CACHE_ENABLED", True)
+    monkeypatch.setattr(search_cache, "_cache", None)
+    assert not path.exists()
+
+    cache = search_cache.get_search_cache()
+    assert search_cache.get_search_cache() is cache
+    assert path.exists()
@@ -0,0 +1,43 @@
+import json
+import os
+import subprocess
+import sys
+
+from agents import factchecker, reporter
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_BUDGET_SECONDS = 1.0
+HEAVY_MODULES = ["ray", "cohere", "langchain_cohere", "langchain.agents", "langchain_core", "tavily"]
+
+PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def _probe_import():
+    # Fresh interpreter, so modules already imported by other tests don't hide the cost
+    out = subprocess.run([sys.executable, "-c", PROBE], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+# Test 1: `import main` stays within budget and loads no LLM, search or Ray client libraries
+def test_import_main_is_fast():
+    result = min((_probe_import() for _ in range(2)), key=lambda r: r["seconds"])
+    assert result["loaded"] == []
+    assert result["seconds"] < IMPORT_BUDGET_SECONDS, f"import main took {result['seconds']:.2f}s"
+
+
+# Test 2: Clients are built once on first use and shared afterwards
+def test_clients_are_built_lazily(monkeypatch):
+    monkeypatch.setattr(factchecker, "_tavily", None)
+    monkeypatch.setattr(reporter, "_generator", None)
+
+    tavily = factchecker.get_tavily()
+    assert factchecker.get_tavily() is tavily
+    generator = reporter.get_report_generator()
+    assert reporter.get_report_generator() is generator
+    assert generator.llm.model == reporter.REPORT_MODEL
@@ -0,0 +1,141 @@
+import threading
+from concurrent.futures import CancelledError
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from agents.cohere_summarizer import SummarizerPool, get_pool, summarize_text, reduce_summaries
+from agents.chunker import count_tokens
+from agents.llm_cache import LLMCache, MemoryBackend
+
+
+SEEN_PROMPTS = []
+
+
+def fake_chat(message, **kwargs):
+    SEEN_PROMPTS.append(message)
+    return MagicMock(text=f" summary of {len(message)} chars ")
+
+
+def fake_cohere_client(*args, **kwargs):
+    client = MagicMock()
+    client.chat.side_effect = fake_chat
+    return client
+
+
+# Har test ke liye fresh LLM cache, taaki pichle test ke responses reuse na hon
+@pytest.fixture(autouse=True)
+def fresh_llm_cache():
+    cache = LLMCache(MemoryBackend())
+    with patch("agents.cohere_summarizer.get_cache", return_value=cache):
+        yield cache
+
+
+@pytest.fixture
+def thread_pool():
+    with patch("cohere.Client", side_effect=fake_cohere_client) as mock_client:
+        pool = SummarizerPool(backend="thread", size=2)
+        yield pool, mock_client
+        pool.shutdown()
+
+
+# Test 1: Workers start lazily and are reused across calls
+def test_pool_is_lazy_and_reused(thread_pool):
+    pool, mock_client = thread_pool
+    assert mock_client.call_count == 0
+    assert pool.metrics()["started"] is False
+
+    with patch("agents.cohere_summarizer.get_pool", return_value=pool):
+        first = summarize_text("Starship launched today. " * 200)
+        second = summarize_text("NASA plans a moon landing. " * 200)
+
+    assert first and second
+    assert mock_client.call_count == 2  # one client per worker, created once
+
+
+# Test 2: Results keep chunk order and metrics record per-worker latency
+def test_pool_map_order_and_metrics(thread_pool):
+    pool, _ = thread_pool
+    chunks = ["a" * 10, "b" * 20, "c" * 30]
+
+    summaries = pool.map(chunks)
+    metrics = pool.metrics()
+
+    assert len(summaries) == 3
+    assert summaries[0] != summaries[2]
+    assert metrics["queue_depth"] == 0
+    assert sum(w["completed"] for w in metrics["workers"]) == 3
+
+
+# Test 3: Unknown backend is rejected up front
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        SummarizerPool(backend="celery")
+
+
+# Test 4: Chunk summaries are merged level by level until they fit the target
+def test_reduce_summaries_bounds_output(thread_pool):
+    pool, _ = thread_pool
+    SEEN_PROMPTS.clear()
+    summaries = [f"Part {i}: " + "Starship flew and the booster crashed into the Gulf. " * 5 for i in range(16)]
+
+    final = reduce_summaries(summaries, pool, target_tokens=200, batch_tokens=250)
+
+    assert count_tokens(final) <= 200
+    reduce_prompts = [p for p in SEEN_PROMPTS if p.endswith("Merged Summary:")]
+    assert len(reduce_prompts) >= 2
+
+
+# Test 5: Already-short summaries are returned without extra LLM calls
+def test_reduce_summaries_noop_when_small(thread_pool):
+    pool, _ = thread_pool
+    assert reduce_summaries(["Short one.", "Short two."], pool, target_tokens=200) == "Short one.\n\nShort two."
+    assert pool.metrics()["started"] is False
+
+
+# Test 6: Repeated chunks are served from the LLM cache without a worker call
+def test_repeated_chunks_hit_llm_cache(thread_pool, fresh_llm_cache):
+    pool, _ = thread_pool
+    pool.map(["Same intro ad read.", "Same intro ad read."])
+    pool.map(["Same intro ad read."])
+
+    completed = sum(w["completed"] for w in pool.metrics()["workers"])
+    assert completed <= 2
+    assert fresh_llm_cache.stats()["hits"] >= 1
+
+
+# Test 7: get_pool is rebuilt when a different worker count is asked for
+def test_get_pool_resizes():
+    with patch("agents.cohere_summarizer._pool", None):
+        first = get_pool(2)
+        assert get_pool(2) is first
+        resized = get_pool(3)
+        assert resized is not first and resized.size == 3
+
+
+# Test 8: Chunks cancelled at shutdown cancel the caller's future instead of raising
+def test_cancelled_chunk_cancels_result():
+    started, release = threading.Event(), threading.Event()
+
+    def slow_chat(message, **kwargs):
+        started.set()
+        release.wait(5)
+        return MagicMock(text="late summary")
+
+    def slow_client(*args, **kwargs):
+        client = MagicMock()
+        client.chat.side_effect = slow_chat
+        return client
+
+    with patch("cohere.Client", side_effect=slow_client):
+        pool = SummarizerPool(backend="thread", size=1)
+        running = pool.submit("Pehla chunk.")
+        queued = pool.submit("Doosra chunk.")
+        assert started.wait(5)
+        pool.shutdown()
+        release.set()
+
+    assert running.result(timeout=5) == "late summary"
+    with pytest.raises(CancelledError):
+        queued.result(timeout=5)
+    assert pool.metrics()["queue_depth"] == 0
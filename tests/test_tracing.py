@@ -0,0 +1,94 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+from langchain_core.globals import get_llm_cache, set_llm_cache
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+import main
+import tracing
+from agents.langchain_cache import LangChainLLMCache
+from agents.llm_cache import LLMCache, MemoryBackend
+
+
+# Har test ke liye alag metrics registry
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    fresh = tracing.MetricsRegistry()
+    monkeypatch.setattr(tracing, "metrics", fresh)
+    return fresh
+
+
+# Test 1: Spans nest across thread pools and the trace file records the whole tree
+def test_trace_nests_spans_across_threads(tmp_path):
+    path = tmp_path / "trace-{trace_id}.json"
+
+    def work(i):
+        with tracing.span("search.query", cache_hit=i == 0):
+            pass
+
+    with tracing.trace("run", path=str(path)) as root:
+        with tracing.span("fact_check") as parent, ThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(tracing.bind(work), range(3)))
+
+    trace = json.loads((tmp_path / f"trace-{root.trace_id}.json").read_text())
+    spans = {s["span_id"]: s for s in trace["spans"]}
+    queries = [s for s in spans.values() if s["name"] == "search.query"]
+    assert len(queries) == 3 and all(s["parent_id"] == parent.span_id for s in queries)
+    assert spans[parent.span_id]["parent_id"] == root.span_id
+    assert trace["summary"]["search.query"]["count"] == 3
+    assert tracing.current_span() is None
+
+
+# Test 2: Span attributes become Prometheus counters next to the duration histogram
+def test_prometheus_export(registry):
+    with pytest.raises(ValueError):
+        with tracing.span("llm", model='command "r"', input_tokens=120, output_tokens=30, cache_hit=False, bytes=400):
+            raise ValueError("boom")
+    tracing.start_span("llm", model='command "r"', cache_hit=True).end()
+
+    text = tracing.render_prometheus()
+    assert '# TYPE podcast_span_duration_seconds histogram' in text
+    assert 'podcast_span_duration_seconds_count{span="llm",status="error"} 1' in text
+    assert 'podcast_span_duration_seconds_bucket{span="llm",status="ok",le="+Inf"} 1' in text
+    assert 'podcast_tokens_total{direction="input",model="command \\"r\\"",span="llm"} 120' in text
+    assert registry.counter("podcast_cache_requests_total").value(span="llm", result="hit") == 1
+    assert registry.counter("podcast_bytes_total").value(span="llm") == 400
+
+
+# Test 3: Chat model calls get an `llm` span that knows whether the LLM cache answered
+def test_llm_span_handler_records_cache_hits(registry):
+    previous = get_llm_cache()
+    set_llm_cache(LangChainLLMCache(LLMCache(MemoryBackend())))
+    try:
+        model = FakeListChatModel(responses=["first"], callbacks=[tracing.llm_span_handler()])
+        with tracing.trace("run") as root:
+            model.invoke("Did Starship reach orbit?")
+            model.invoke("Did Starship reach orbit?")
+    finally:
+        set_llm_cache(previous)
+
+    results = registry.counter("podcast_cache_requests_total")
+    assert (results.value(span="llm", result="miss"), results.value(span="llm", result="hit")) == (1, 1)
+    assert registry.histogram("podcast_span_duration_seconds").count(span="llm", status="ok") == 2
+    assert root.duration is not None
+
+
+# Test 4: A checkpointed run writes its trace, with one span per pipeline stage, into the run directory
+def test_run_audio_pipeline_writes_trace(tmp_path, monkeypatch):
+    monkeypatch.setattr("checkpoints.RUNS_DIR", str(tmp_path / "runs"))
+    audio = tmp_path / "episode.mp3"
+    audio.write_bytes(b"fake audio bytes")
+
+    with patch('main.transcribe_audio', return_value="SpaceX Starship test launch happened and reached space."), \
+         patch('main.summarize_text', return_value="Summary."), \
+         patch('main.fact_check', return_value="Fact check output"), \
+         patch('main.generate_final_report', return_value="### Report"):
+        main.run_audio_pipeline(str(audio))
+
+    [trace_file] = (tmp_path / "runs").glob("*/trace-*.json")
+    trace = json.loads(trace_file.read_text())
+    assert trace["name"] == "audio_pipeline" and trace["attributes"]["run_id"]
+    names = {s["name"] for s in trace["spans"]}
+    assert {"analysis", "stage.summarize", "stage.fact_check", "stage.report"} <= names
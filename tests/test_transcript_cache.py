@@ -0,0 +1,52 @@
+import os
+
+from agents.transcript_cache import TranscriptCache, hash_audio, make_key
+
+
+# Test 1: Same bytes hash identically, settings and decode mode change the key
+def test_keys_depend_on_audio_and_settings(tmp_path):
+    a = tmp_path / "a.mp3"
+    b = tmp_path / "b.mp3"
+    a.write_bytes(b"x" * 3_000_000)
+    b.write_bytes(b"x" * 3_000_000)
+
+    assert hash_audio(str(a)) == hash_audio(str(b))
+
+    audio_hash = hash_audio(str(a))
+    base_key = make_key(audio_hash, "base", "int8", 5, "en")
+    assert base_key == make_key(audio_hash, "base", "int8", 5, "en")
+    assert base_key != make_key(audio_hash, "small", "int8", 5, "en")
+    assert base_key != make_key(audio_hash, "base", "int8", 1, "en")
+    # Parallel windows, streamed windows and whole-file decoding segment differently
+    assert base_key == make_key(audio_hash, "base", "int8", 5, "en", decode_mode="whole")
+    assert len({base_key, make_key(audio_hash, "base", "int8", 5, "en", decode_mode="stream"),
+                make_key(audio_hash, "base", "int8", 5, "en", decode_mode="parallel")}) == 3
+
+
+# Test 2: Round trip stores transcript and segment timestamps
+def test_put_and_get_round_trip(tmp_path):
+    cache = TranscriptCache(cache_dir=str(tmp_path))
+
+    assert cache.get("missing") is None
+    cache.put("k1", "Hello there.", [(0.0, 1.5, "Hello there.")])
+    entry = cache.get("k1")
+
+    assert entry["transcript"] == "Hello there."
+    assert entry["segments"] == [[0.0, 1.5, "Hello there."]]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+# Test 3: Least recently used entries are evicted past the size bound
+def test_size_bounded_eviction(tmp_path):
+    cache = TranscriptCache(cache_dir=str(tmp_path), max_bytes=2500)
+    text = "word " * 200  # ~1 KB per entry
+
+    cache.put("old", text, [])
+    os.utime(tmp_path / "old.json", (1, 1))
+    cache.put("newer", text, [])
+    os.utime(tmp_path / "newer.json", (2, 2))
+    cache.put("newest", text, [])
+
+    assert cache.get("old") is None
+    assert cache.get("newer") is not None
+    assert cache.get("newest") is not None
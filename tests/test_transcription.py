@@ -0,0 +1,258 @@
+import threading
+import wave
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from agents.transcription import (
+    WhisperModelRegistry, transcribe_audio, model_registry, plan_windows, stitch_segments, SAMPLE_RATE,
+    TranscriptSegment, iter_transcript, iter_audio_windows,
+)
+from agents.transcript_cache import TranscriptCache
+
+
+# Har test ko apna temporary transcript cache milta hai
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path):
+    cache = TranscriptCache(cache_dir=str(tmp_path / "cache"))
+    with patch("agents.transcription.transcript_cache", cache):
+        yield cache
+
+
+def fake_loader():
+    return MagicMock(side_effect=lambda size, device, compute_type: MagicMock(name=f"{size}-{device}-{compute_type}"))
+
+
+# Test 1: Same key reuses the warm model
+def test_registry_reuses_loaded_model():
+    loader = fake_loader()
+    registry = WhisperModelRegistry(max_models=2, memory_limit_mb=10_000, loader=loader)
+
+    first = registry.get("base", "cpu", "int8")
+    second = registry.get("base", "cpu", "int8")
+
+    assert first is second
+    loader.assert_called_once_with("base", device="cpu", compute_type="int8")
+
+
+# Test 2: Least recently used model is evicted past max_models
+def test_registry_lru_eviction():
+    registry = WhisperModelRegistry(max_models=2, memory_limit_mb=10_000, loader=fake_loader())
+
+    registry.get("tiny", "cpu", "int8")
+    registry.get("base", "cpu", "int8")
+    registry.get("tiny", "cpu", "int8")  # tiny becomes most recently used
+    registry.get("small", "cpu", "int8")
+
+    assert registry.loaded() == [("tiny", "cpu", "int8"), ("small", "cpu", "int8")]
+
+
+# Test 3: Memory ceiling evicts older models but never the one just requested
+def test_registry_memory_ceiling():
+    registry = WhisperModelRegistry(max_models=5, memory_limit_mb=1000, loader=fake_loader())
+
+    registry.get("small", "cpu", "int8")
+    registry.get("medium", "cpu", "int8")
+
+    assert registry.loaded() == [("medium", "cpu", "int8")]
+
+
+# Test 4: Concurrent requests for the same model share one load
+def test_registry_concurrent_single_load():
+    loader = fake_loader()
+    registry = WhisperModelRegistry(max_models=2, memory_limit_mb=10_000, loader=loader)
+
+    threads = [threading.Thread(target=registry.get, args=("base", "cpu", "int8")) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert loader.call_count == 1
+
+
+# Test 5: transcribe_audio honours the model_size argument
+def test_transcribe_audio_uses_requested_size(tmp_path):
+    audio = tmp_path / "episode.wav"
+    audio.write_bytes(b"RIFF")
+
+    model = MagicMock()
+    segment = MagicMock(start=0.0, end=1.0, text=" Hello world. ")
+    model.transcribe.return_value = ([segment], MagicMock(duration=1.0, language="en"))
+
+    with patch.object(model_registry, "get", return_value=model) as mock_get:
+        transcript = transcribe_audio(str(audio), model_size="small")
+
+    assert mock_get.call_args[0][0] == "small"
+    assert transcript == "Hello world."
+
+
+# Test 6: Speech regions are grouped at silences and padded with overlap
+def test_plan_windows_cuts_at_silence():
+    sr = SAMPLE_RATE
+    speech = [
+        {"start": 0, "end": 4 * sr},
+        {"start": 5 * sr, "end": 9 * sr},
+        {"start": 12 * sr, "end": 18 * sr},
+    ]
+
+    windows = plan_windows(speech, total_samples=20 * sr, window_samples=10 * sr, overlap_samples=sr)
+
+    assert len(windows) == 2
+    assert (windows[0]["start"], windows[0]["end"]) == (0, 10 * sr)
+    assert (windows[1]["start"], windows[1]["end"]) == (11 * sr, 19 * sr)
+    # Core spans meet in the middle of the 9s-12s silence
+    assert windows[0]["core_end"] == windows[1]["core_start"] == int(10.5 * sr)
+
+
+# Test 7: Segments repeated in the overlap are kept only once, in order
+def test_stitch_segments_deduplicates_overlap():
+    sr = SAMPLE_RATE
+    first = {"core_start": 0, "core_end": 10 * sr}
+    second = {"core_start": 10 * sr, "core_end": 20 * sr}
+
+    stitched = stitch_segments([
+        (first, [TranscriptSegment(0.0, 4.0, "One."), TranscriptSegment(8.5, 10.8, "Two.")]),
+        (second, [TranscriptSegment(8.6, 10.9, "Two."), TranscriptSegment(11.0, 15.0, "Three.")]),
+    ])
+
+    assert [seg.text for seg in stitched] == ["One.", "Two.", "Three."]
+
+
+# Test 8: iter_transcript yields timestamped segments lazily
+def test_iter_transcript_yields_segments(tmp_path):
+    audio = tmp_path / "episode.wav"
+    audio.write_bytes(b"RIFF")
+
+    model = MagicMock()
+    raw = [MagicMock(start=0.0, end=2.5, text=" First. "), MagicMock(start=2.5, end=4.0, text=" Second.")]
+    model.transcribe.return_value = (iter(raw), MagicMock(duration=4.0, language="en"))
+
+    with patch.object(model_registry, "get", return_value=model):
+        segments = list(iter_transcript(str(audio)))
+
+    assert segments == [TranscriptSegment(0.0, 2.5, "First."), TranscriptSegment(2.5, 4.0, "Second.")]
+
+
+# Test 9: A cache hit skips model loading entirely
+def test_transcribe_audio_cache_hit_skips_model(tmp_path, isolated_cache):
+    audio = tmp_path / "episode.wav"
+    audio.write_bytes(b"RIFF-same-bytes")
+
+    model = MagicMock()
+    segment = MagicMock(start=0.0, end=1.0, text=" Cached words. ")
+    model.transcribe.return_value = ([segment], MagicMock(duration=1.0, language="en"))
+
+    with patch.object(model_registry, "get", return_value=model) as mock_get:
+        first = transcribe_audio(str(audio))
+        second = transcribe_audio(str(audio))
+
+    assert first == second == "Cached words."
+    mock_get.assert_called_once()
+    assert (isolated_cache.hits, isolated_cache.misses) == (1, 1)
+
+
+def write_wav(path, seconds):
+    samples = (np.sin(np.arange(int(seconds * SAMPLE_RATE)) / 10) * 8000).astype(np.int16)
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(samples.tobytes())
+
+
+# Test 10: Incremental decoding cuts windows where the last utterance starts and loses no samples
+def test_iter_audio_windows_cuts_at_silence(tmp_path):
+    audio = tmp_path / "episode.wav"
+    write_wav(audio, 25)
+    # Speech runs up to the end of every 10s window; the last utterance starts 7s in
+    speech = [{"start": 0, "end": 6 * SAMPLE_RATE}, {"start": 7 * SAMPLE_RATE, "end": 10 * SAMPLE_RATE}]
+
+    with patch("agents.transcription.get_speech_timestamps", return_value=speech):
+        windows = list(iter_audio_windows(str(audio), window_seconds=10))
+
+    assert [offset for offset, _ in windows] == [0.0, 7.0, 14.0, 21.0]
+    assert all(len(samples) <= 10 * SAMPLE_RATE for _, samples in windows)
+    assert sum(len(samples) for _, samples in windows) == 25 * SAMPLE_RATE
+
+
+# Test 11: Long files are transcribed window by window with timestamps shifted to the episode
+def test_iter_transcript_streams_long_audio(tmp_path):
+    audio = tmp_path / "episode.wav"
+    write_wav(audio, 3)
+
+    model = MagicMock()
+    model.transcribe.side_effect = lambda *args, **kwargs: ([MagicMock(start=1.0, end=2.0, text=" Words. ")], None)
+    windows = iter([(0.0, np.zeros(SAMPLE_RATE)), (120.0, np.zeros(SAMPLE_RATE))])
+
+    with patch.object(model_registry, "get", return_value=model), \
+         patch("agents.transcription.STREAM_DECODE_MIN_SECONDS", 1), \
+         patch("agents.transcription.iter_audio_windows", return_value=windows):
+        segments = list(iter_transcript(str(audio)))
+
+    assert segments == [TranscriptSegment(1.0, 2.0, "Words."), TranscriptSegment(121.0, 122.0, "Words.")]
+
+
+# Test 12: A batch size routes decoding through the batched pipeline and gets its own cache entry
+def test_batched_transcription(tmp_path, isolated_cache):
+    audio = tmp_path / "episode.wav"
+    audio.write_bytes(b"RIFF")
+
+    model = MagicMock()
+    model.transcribe.return_value = ([MagicMock(start=0.0, end=1.0, text=" Unbatched. ")], MagicMock(duration=1.0, language="en"))
+    pipeline = MagicMock()
+    pipeline.return_value.transcribe.return_value = ([MagicMock(start=0.0, end=1.0, text=" Batched. ")], MagicMock(duration=1.0, language="en"))
+
+    with patch.object(model_registry, "get", return_value=model), \
+         patch("agents.transcription.BatchedInferencePipeline", pipeline):
+        unbatched = transcribe_audio(str(audio))
+        with patch("agents.transcription.BATCH_SIZE", 4):
+            batched = transcribe_audio(str(audio))
+
+    assert (unbatched, batched) == ("Unbatched.", "Batched.")
+    pipeline.assert_called_once_with(model)
+    assert pipeline.return_value.transcribe.call_args.kwargs["batch_size"] == 4
+    assert isolated_cache.misses == 2
+
+
+# Test 13: Tuned settings apply only to the model size they were measured for
+def test_tuning_is_per_model_size(tmp_path):
+    from agents.transcription import whisper_settings
+
+    audio = tmp_path / "episode.wav"
+    audio.write_bytes(b"RIFF")
+    tuned = {"small": {"compute_type": "int8_float32", "cpu_threads": 8, "beam_size": 1, "batch_size": 8}}
+    model = MagicMock()
+    model.transcribe.return_value = ([MagicMock(start=0.0, end=1.0, text=" Words. ")], MagicMock(duration=1.0, language="en"))
+
+    with patch("agents.transcription.load_tuning", side_effect=lambda size: tuned.get(size, {})), \
+         patch.object(model_registry, "get", return_value=model) as get:
+        assert whisper_settings("small") == (*tuned["small"].values(),)
+        assert whisper_settings("base") == ("int8", 0, 5, 0)
+        transcribe_audio(str(audio), model_size="base")
+
+    get.assert_called_once_with("base", "cpu", "int8")
+    assert model.transcribe.call_args.kwargs["beam_size"] == 5
+
+
+# Test 14: Parallel workers fit the memory limit and only one pool stays alive
+def test_parallel_pool_is_capped_and_replaced():
+    from agents import transcription
+    from agents.transcription import WhisperSettings, parallel_workers, _get_pool, shutdown_pools
+
+    assert parallel_workers("large-v2", 8) == 1
+    assert parallel_workers("base", 4) == 4
+
+    settings = WhisperSettings("int8", 2, 5, 0)
+    with patch("agents.transcription.ProcessPoolExecutor", side_effect=lambda **kwargs: MagicMock()) as executor:
+        first = _get_pool("base", settings, 2)
+        assert _get_pool("base", settings, 2) is first
+        second = _get_pool("small", settings, 2)
+        shutdown_pools()
+
+    assert executor.call_count == 2
+    assert executor.call_args_list[0].kwargs["initargs"][3] == 2  # cpu_threads from the settings
+    first.shutdown.assert_called_once_with(wait=False)
+    second.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+    assert transcription._pool is None
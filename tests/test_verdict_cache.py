@@ -0,0 +1,103 @@
+import json
+import re
+import time
+import zlib
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+import agents.factchecker as factchecker
+import agents.verdict_cache as verdict_cache
+from agents.claims import Verdict
+from agents.verdict_cache import VerdictCache, fingerprint, is_time_sensitive
+
+DIM = 64
+
+
+def fake_embedder(texts):
+    vectors = np.zeros((len(texts), DIM), dtype=np.float32)
+    for i, text in enumerate(texts):
+        for word in re.findall(r"\w+", text.lower()):
+            vectors[i, zlib.crc32(word.encode()) % DIM] += 1.0
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-9)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return VerdictCache(str(tmp_path / "verdicts.sqlite"))
+
+
+STARSHIP = Verdict("SpaceX launched Starship in 2023.", "Factually Accurate", "First flight was April 2023.", ["SpaceX.com"])
+
+
+# Test 1: Fingerprints ignore case, punctuation, whitespace and stopwords but not word order
+def test_fingerprint_normalises():
+    assert fingerprint("SpaceX launched Starship in 2023.") == fingerprint("spacex  launched the Starship, in 2023")
+    assert fingerprint("SpaceX launched Starship in 2023.") != fingerprint("SpaceX launched Starship in 2024.")
+    # Swapped subject and object (or numbers) say something else and must not share a verdict
+    assert fingerprint("SpaceX acquired Tesla.") != fingerprint("Tesla acquired SpaceX.")
+    assert fingerprint("Revenue rose from 10 to 20 billion.") != fingerprint("Revenue rose from 20 to 10 billion.")
+
+
+# Test 2: Present/future wording and current years are time-sensitive
+def test_time_sensitive_claims():
+    this_year = time.localtime().tm_year
+    assert is_time_sensitive("NASA currently plans a crewed landing.")
+    assert is_time_sensitive(f"Artemis III launches in {this_year + 1}.")
+    assert not is_time_sensitive("Apollo 11 landed on the Moon in 1969.")
+
+
+# Test 3: Stored verdicts are returned for re-punctuated claims and survive reopening
+def test_store_and_lookup(cache, tmp_path):
+    cache.store_many([STARSHIP])
+    hit = cache.lookup_many(["spacex launched the Starship in 2023"])[0]
+    assert hit.verdict == "Factually Accurate" and hit.sources == ["SpaceX.com"]
+    assert hit.claim == "spacex launched the Starship in 2023" and hit.checked_at > 0
+    assert cache.lookup_many(["In 2023 Starship launched SpaceX"])[0] is None
+
+    reopened = VerdictCache(str(tmp_path / "verdicts.sqlite"))
+    assert reopened.lookup_many([STARSHIP.claim, "Unrelated claim."])[1] is None
+    assert reopened.stats() == {"hits": 1, "misses": 1}
+
+
+# Test 4: Time-sensitive verdicts expire on the short TTL; failures are never stored
+def test_expiry_and_unverified(cache, monkeypatch):
+    monkeypatch.setattr(verdict_cache, "VOLATILE_TTL", -1)
+    volatile = Verdict("NASA currently plans a Moon landing.", "Partially Accurate", "Dates slipped.", [])
+    failed = Verdict("Chandrayaan 3 landed in 2023.", "Unverified", "Verification failed: timeout", [])
+    cache.store_many([volatile, failed, STARSHIP])
+    assert cache.lookup_many([volatile.claim, failed.claim, STARSHIP.claim])[:2] == [None, None]
+
+
+# Test 5: With an embedder, near-duplicate wording also hits
+def test_near_duplicate_match(tmp_path):
+    cache = VerdictCache(str(tmp_path / "verdicts.sqlite"), embedder=fake_embedder, near_threshold=0.8)
+    cache.store_many([STARSHIP])
+    assert cache.lookup_many(["SpaceX launched its Starship rocket in 2023."])[0].verdict == "Factually Accurate"
+    assert cache.lookup_many(["ISRO landed Chandrayaan 3 near the south pole."])[0] is None
+
+
+# Test 6: check_claims only verifies (and stores) the claims missing from the cache
+def test_check_claims_uses_cache(cache, monkeypatch):
+    cache.store_many([STARSHIP])
+    prompts = []
+
+    def invoke(prompt):
+        prompts.append(prompt)
+        if prompt.startswith("Extract"):
+            return MagicMock(content=json.dumps([STARSHIP.claim, "Chandrayaan 3 landed in 2023."]))
+        return MagicMock(content=json.dumps({"verdict": "Factually Accurate", "evidence": "ISRO confirmed it.", "sources": ["ISRO"]}))
+
+    monkeypatch.setattr(factchecker, "_llm", MagicMock(invoke=invoke))
+    monkeypatch.setattr(factchecker, "get_verdict_cache", lambda: cache)
+    monkeypatch.setattr(factchecker, "local_evidence", lambda claims: {})
+    searched = []
+    monkeypatch.setattr(factchecker, "search_answer", lambda q: searched.append(q) or "Yes.")
+
+    verdicts = factchecker.check_claims("summary")
+    assert [v.claim for v in verdicts] == [STARSHIP.claim, "Chandrayaan 3 landed in 2023."]
+    assert verdicts[0].checked_at > 0 and "(verified " in verdicts[0].to_line()
+    assert searched == ["Chandrayaan 3 landed in 2023."]
+    assert sum(p.startswith("You are") for p in prompts) == 1
+    assert cache.lookup_many(["Chandrayaan 3 landed in 2023."])[0].sources == ["ISRO"]
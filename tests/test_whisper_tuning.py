@@ -0,0 +1,67 @@
+import time
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from agents import whisper_tuning
+from agents.transcription import SAMPLE_RATE
+
+
+def fake_loader(compute_types_failing=()):
+    # More threads and smaller beams decode faster; some compute types are unsupported on this "host"
+    def load(size, device, compute_type, cpu_threads):
+        if compute_type in compute_types_failing:
+            raise ValueError(f"{compute_type} is not supported")
+        model = MagicMock()
+
+        def transcribe(audio, beam_size, language):
+            time.sleep(0.001 * beam_size / cpu_threads)
+            return iter([]), MagicMock(duration=len(audio) / SAMPLE_RATE)
+
+        model.transcribe.side_effect = transcribe
+        return model
+    return load
+
+
+# Test 1: The sweep covers every combination, skips unsupported ones and picks the fastest at the target beam size
+def test_autotune_picks_fastest_at_target_beam():
+    with patch("faster_whisper.decode_audio", return_value=np.zeros(30 * SAMPLE_RATE, dtype=np.float32)):
+        report = whisper_tuning.autotune("sample.mp3", "base", compute_types=["int8", "int8_float32"], threads=[1, 4],
+                                         beam_sizes=[1, 5], batch_sizes=[0], target_beam_size=5,
+                                         loader=fake_loader(compute_types_failing={"int8_float32"}))
+
+    assert len(report["results"]) == 2 * 2 * 2
+    assert all("error" in r for r in report["results"] if r["compute_type"] == "int8_float32")
+    assert report["best"] == {"compute_type": "int8", "cpu_threads": 4, "beam_size": 5, "batch_size": 0}
+    assert report["audio_seconds"] == 30
+
+
+# Test 2: Stored results are keyed by host and model size
+def test_tuning_round_trip(tmp_path):
+    path = str(tmp_path / "tuning.json")
+    best = {"compute_type": "int8_float32", "cpu_threads": 8, "beam_size": 5, "batch_size": 8}
+
+    whisper_tuning.save_tuning("base", {"best": best, "results": []}, path=path, host="cpu-a")
+    whisper_tuning.save_tuning("base", {"best": {**best, "cpu_threads": 2}, "results": []}, path=path, host="cpu-b")
+
+    assert whisper_tuning.load_tuning("base", path=path, host="cpu-a") == best
+    assert whisper_tuning.load_tuning("small", path=path, host="cpu-a") == {}
+    assert whisper_tuning.load_tuning("base", path=str(tmp_path / "missing.json")) == {}
+    assert whisper_tuning.thread_counts(6) == [1, 2, 4, 6]
+
+
+# Test 3: Without a working run at the target beam size nothing is picked, and the CLI stores nothing
+def test_no_result_at_target_beam(tmp_path):
+    results = [{"compute_type": "int8", "cpu_threads": 4, "beam_size": 1, "batch_size": 0, "throughput": 9.0},
+               {"compute_type": "int8", "cpu_threads": 4, "beam_size": 5, "batch_size": 0, "error": "out of memory"}]
+    assert whisper_tuning.select_best(results, beam_size=5) is None
+    assert whisper_tuning.select_best(results, beam_size=1) == results[0]
+
+    out = tmp_path / "tuning.json"
+    with patch("faster_whisper.decode_audio", return_value=np.zeros(10 * SAMPLE_RATE, dtype=np.float32)), \
+         patch("faster_whisper.WhisperModel", fake_loader()), \
+         patch("logging_setup.configure_logging"):
+        argv = ["sample.mp3", "--compute-types", "int8", "--threads", "1", "--beam-sizes", "1", "--batch-sizes", "0",
+                "--target-beam-size", "5", "--out", str(out)]
+        assert whisper_tuning.main(argv) == 1
+    assert not out.exists()
@@ -0,0 +1,391 @@
+"""
+Spans and metrics shared by every stage.
+
+    with tracing.trace("audio_pipeline", path="runs/<id>/trace.json"):   # one JSON trace per run
+        with tracing.span("summarize", model="command-light") as s:
+            ...
+            s.set(output_tokens=812, cache_hit=False)
+
+Spans nest through a context variable, so a span opened inside another one becomes its child
+without passing anything around; `bind` carries the current span into thread pools. Every
+finished span feeds the process-wide metrics registry (a duration histogram per span name plus
+token, byte and cache-hit counters taken from its attributes), which renders in the Prometheus
+text format.
+"""
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# --- Tracing Config ---
+TRACING_ENABLED = getattr(config, "TRACING_ENABLED", True)
+TRACE_DIR = getattr(config, "TRACE_DIR", None)  # trace files for runs without a run directory; None = not written
+METRICS_PATH = getattr(config, "TRACING_METRICS_PATH", None)  # Prometheus textfile, rewritten after each trace; "{pid}" is expanded
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+NAMESPACE = "podcast"
+
+# --- Metrics ---
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(key: tuple, extra: tuple = ()) -> str:
+    pairs = [*key, *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(_label_key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            lines += [f"{self.name}{_format_labels(key)} {_format_value(v)}" for key, v in sorted(self._values.items())]
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets=DURATION_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._series: Dict[tuple, list] = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            series = self._series.get(_label_key(labels))
+            return series[-1] if series else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    lines.append(f"{self.name}_bucket{_format_labels(key, (('le', _format_value(bound)),))} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(series[-2])}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {series[-1]}")
+        return lines
+
+class MetricsRegistry:
+    """Process-wide counters and histograms, rendered together in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name: str, help: str, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as a {type(metric).__name__}")
+            return metric
+
+    def counter(self, name: str, help: str = "") -> Counter:
+        return self._get(Counter, name, help)
+
+    def histogram(self, name: str, help: str = "", buckets=DURATION_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, buckets=buckets)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = [self._metrics[name] for name in sorted(self._metrics)]
+        return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+    def write(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+    def clear(self):
+        with self._lock:
+            self._metrics.clear()
+
+metrics = MetricsRegistry()
+
+def render_prometheus() -> str:
+    return metrics.render()
+
+# --- Spans ---
+class _Trace:
+    """Collects the finished spans below one root."""
+
+    def __init__(self):
+        self.spans: List["Span"] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: "Span"):
+        with self._lock:
+            self.spans.append(span)
+
+class Span:
+    def __init__(self, name: str, parent: Optional["Span"] = None, **attributes):
+        self.name = name
+        self.parent_id = parent.span_id if parent is not None else None
+        self.trace_id = parent.trace_id if parent is not None else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.attributes = dict(attributes)
+        self.started_at = time.time()
+        self.duration: Optional[float] = None
+        self.status = "ok"
+        self.error: Optional[str] = None
+        self._trace = parent._trace if parent is not None else None
+        self._t0 = time.perf_counter()
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def record_error(self, error):
+        """Mark the span failed, e.g. when the error is handled and turned into a fallback value."""
+        self.status = "error"
+        self.error = f"{type(error).__name__}: {error}" if isinstance(error, BaseException) else str(error)
+
+    def end(self, error: Optional[BaseException] = None):
+        if self.duration is not None:
+            return
+        self.duration = time.perf_counter() - self._t0
+        if error is not None:
+            self.record_error(error)
+        if TRACING_ENABLED:
+            _record(self)
+            if self._trace is not None:
+                self._trace.add(self)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "started_at": self.started_at,
+            "duration": self.duration,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+def _record(span: Span):
+    labels = {"span": span.name}
+    metrics.histogram(f"{NAMESPACE}_span_duration_seconds", "Span wall time by span name and status.").observe(
+        span.duration, status=span.status, **labels)
+    attrs = span.attributes
+    if "model" in attrs:
+        labels["model"] = attrs["model"]
+    tokens = metrics.counter(f"{NAMESPACE}_tokens_total", "LLM tokens by span, model and direction.")
+    for direction in ("input", "output"):
+        if isinstance(attrs.get(f"{direction}_tokens"), (int, float)):
+            tokens.inc(attrs[f"{direction}_tokens"], direction=direction, **labels)
+    if isinstance(attrs.get("bytes"), (int, float)):
+        metrics.counter(f"{NAMESPACE}_bytes_total", "Payload bytes processed by span.").inc(attrs["bytes"], span=span.name)
+    if isinstance(attrs.get("cache_hit"), bool):
+        metrics.counter(f"{NAMESPACE}_cache_requests_total", "Cache lookups by span and result.").inc(
+            span=span.name, result="hit" if attrs["cache_hit"] else "miss")
+
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+def set_attributes(**attributes):
+    """Annotate the current span, if there is one."""
+    span = _current.get()
+    if span is not None:
+        span.set(**attributes)
+
+def start_span(name: str, parent: Optional[Span] = None, **attributes) -> Span:
+    """
+    Child of `parent` (default: the current span) that is not made current; call `end()` when
+    done. For work that finishes on another thread, e.g. a future's done-callback.
+    """
+    return Span(name, parent if parent is not None else _current.get(), **attributes)
+
+@contextmanager
+def span(name: str, parent: Optional[Span] = None, **attributes):
+    """Open a span as the current one; spans opened inside it become its children."""
+    s = start_span(name, parent, **attributes)
+    token = _current.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.end(e)
+        raise
+    finally:
+        _current.reset(token)
+        s.end()
+
+@contextmanager
+def trace(name: str, path: Optional[str] = None, **attributes):
+    """
+    Root span of one run. On exit every span finished below it is written to `path` as JSON (or
+    to TRACE_DIR when no path is given; "{trace_id}" in the path is filled in), and the metrics
+    file is refreshed if one is configured.
+    Inside another trace this is an ordinary child span, so entry points can nest.
+    """
+    if _current.get() is not None:
+        with span(name, **attributes) as child:
+            yield child
+        return
+
+    root = Span(name, None, **attributes)
+    root._trace = _Trace()
+    token = _current.set(root)
+    try:
+        yield root
+    except BaseException as e:
+        root.end(e)
+        raise
+    finally:
+        _current.reset(token)
+        root.end()
+        if TRACING_ENABLED:
+            _export(root, path)
+
+def _summary(spans: List[Span]) -> dict:
+    by_name: Dict[str, List[float]] = {}
+    for s in spans:
+        by_name.setdefault(s.name, []).append(s.duration)
+    summary = {}
+    for name, durations in sorted(by_name.items()):
+        durations.sort()
+        summary[name] = {
+            "count": len(durations),
+            "total": sum(durations),
+            "p50": durations[(len(durations) - 1) // 2],
+            "p95": durations[min(len(durations) - 1, int(round(0.95 * (len(durations) - 1))))],
+            "max": durations[-1],
+        }
+    return summary
+
+def _export(root: Span, path: Optional[str]):
+    if path is None and TRACE_DIR:
+        path = os.path.join(TRACE_DIR, f"{root.name}-{{trace_id}}.json")
+    try:
+        if path is not None:
+            path = path.replace("{trace_id}", root.trace_id)
+            spans = sorted(root._trace.spans, key=lambda s: s.started_at)
+            document = {"trace_id": root.trace_id, **root.to_dict(), "summary": _summary(spans), "spans": [s.to_dict() for s in spans]}
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(document, f, ensure_ascii=False, indent=2, default=str)
+            logger.info(f"[TRACE] {root.name} took {root.duration:.2f}s; trace written to {path}")
+        if METRICS_PATH:
+            metrics.write(METRICS_PATH.format(pid=os.getpid()))
+    except OSError as e:
+        logger.warning(f"[TRACE] Could not export trace {root.trace_id}: {e}")
+
+def bind(func: Callable) -> Callable:
+    """
+    Wrap `func` to run in the caller's context, so spans it opens on an executor thread are
+    children of the span that was current when it was submitted.
+    """
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return context.copy().run(func, *args, **kwargs)
+    return run
+
+# --- LangChain LLM calls ---
+def _usage(response) -> dict:
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return {"input_tokens": usage.get("input_tokens"), "output_tokens": usage.get("output_tokens")}
+    counts = (response.llm_output or {}).get("token_count") or {}
+    return {k: counts[k] for k in ("input_tokens", "output_tokens") if isinstance(counts.get(k), (int, float))}
+
+class _LLMSpans:
+    """
+    LangChain callback methods that wrap each chat model call in an `llm` span with model, prompt
+    bytes, token usage and (through the shared LLM cache) whether the call was a cache hit.
+    """
+
+    name = "llm"
+
+    def __init__(self):
+        self._open = {}  # run_id -> (span, context token)
+
+    def _start(self, run_id, model, prompt_bytes):
+        s = start_span(self.name, model=model, bytes=prompt_bytes)
+        self._open[run_id] = (s, _current.set(s))
+
+    def _end(self, run_id, error=None, **attributes):
+        s, token = self._open.pop(run_id, (None, None))
+        if s is None:
+            return
+        try:
+            _current.reset(token)
+        except ValueError:
+            pass  # ended from another context (e.g. a stream consumed on a different thread)
+        s.set(**attributes)
+        s.end(error)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        params = kwargs.get("invocation_params") or {}
+        prompt_bytes = sum(len(str(m.content).encode("utf-8")) for batch in messages for m in batch)
+        self._start(run_id, params.get("model") or params.get("model_name") or "unknown", prompt_bytes)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        params = kwargs.get("invocation_params") or {}
+        self._start(run_id, params.get("model") or params.get("model_name") or "unknown", sum(len(p.encode("utf-8")) for p in prompts))
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._end(run_id, **_usage(response))
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error=error)
+
+_llm_handler = None
+
+def llm_span_handler():
+    """Shared callback handler for `callbacks=[...]` on chat models; langchain_core is imported on first use."""
+    global _llm_handler
+    if _llm_handler is None:
+        from langchain_core.callbacks import BaseCallbackHandler
+
+        class LLMSpanHandler(_LLMSpans, BaseCallbackHandler):
+            pass
+        _llm_handler = LLMSpanHandler()
+    return _llm_handler